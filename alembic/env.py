@@ -1,3 +1,5 @@
+import os
+import sys
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -5,6 +7,14 @@ from sqlalchemy import pool
 
 from alembic import context
 
+# app packages (db, settings) live in ../app
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from settings import TestDBSettings  # noqa: E402
+from db.tables import metadata  # noqa: E402
+from db.stat_tables import publication_stats  # noqa: E402, F401
+from db.indexes import HOT_INDEXES  # noqa: E402, F401
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +24,15 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+# tables + indexes of the app (for 'autogenerate' support)
+target_metadata = metadata
+
+# url from .ini wins, else build it from app db settings (sync driver)
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option(
+            "sqlalchemy.url",
+            TestDBSettings().get_db_url().replace("%", "%%"),
+            )
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
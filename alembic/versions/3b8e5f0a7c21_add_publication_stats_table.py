@@ -0,0 +1,53 @@
+"""add publication stats table
+
+Revision ID: 3b8e5f0a7c21
+Revises: d2dcea4455d8
+Create Date: 2026-10-17 12:04:31.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e5f0a7c21'
+down_revision: Union[str, None] = 'd2dcea4455d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+            "publication_stats",
+            sa.Column("pub_id", sa.String(32), primary_key=True),
+            sa.Column(
+                "likes",
+                sa.BigInteger,
+                nullable=False,
+                server_default="0",
+                ),
+            sa.Column(
+                "dislikes",
+                sa.BigInteger,
+                nullable=False,
+                server_default="0",
+                ),
+            sa.Column(
+                "watches",
+                sa.BigInteger,
+                nullable=False,
+                server_default="0",
+                ),
+            sa.Column(
+                "upd_dt",
+                sa.DateTime,
+                nullable=False,
+                server_default=sa.func.now(),
+                ),
+            )
+
+
+def downgrade() -> None:
+    op.drop_table("publication_stats")
@@ -0,0 +1,53 @@
+"""index content hot predicates
+
+Revision ID: 7a4c9d2e6f13
+Revises: 3b8e5f0a7c21
+Create Date: 2026-10-17 12:09:12.540771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c9d2e6f13'
+down_revision: Union[str, None] = '3b8e5f0a7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CONCURRENTLY can`t run inside transaction -> autocommit_block.
+# If it fails, index stays INVALID: drop it and run upgrade again.
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+                "ix_content_pub_id_role",
+                "content",
+                ["pub_id", "_role"],
+                postgresql_concurrently=True,
+                )
+        op.create_index(
+                "ix_content_uid_locked",
+                "content",
+                ["uid"],
+                postgresql_include=["locked"],
+                postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+                "ix_content_uid_locked",
+                table_name="content",
+                postgresql_concurrently=True,
+                )
+        op.drop_index(
+                "ix_content_pub_id_role",
+                table_name="content",
+                postgresql_concurrently=True,
+                )
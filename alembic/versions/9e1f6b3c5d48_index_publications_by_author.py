@@ -0,0 +1,58 @@
+"""index publications by author
+
+Revision ID: 9e1f6b3c5d48
+Revises: 7a4c9d2e6f13
+Create Date: 2026-10-17 12:15:47.902356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1f6b3c5d48'
+down_revision: Union[str, None] = '7a4c9d2e6f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keyset pages go (creation_dt, uid) desc
+    with op.get_context().autocommit_block():
+        op.create_index(
+                "ix_publications_author_dt_uid",
+                "publications",
+                [
+                    "author_id",
+                    sa.text("creation_dt DESC"),
+                    sa.text("uid DESC"),
+                    ],
+                postgresql_concurrently=True,
+                )
+        op.create_index(
+                "ix_publications_author_state_dt_uid",
+                "publications",
+                [
+                    "author_id",
+                    "_state",
+                    sa.text("creation_dt DESC"),
+                    sa.text("uid DESC"),
+                    ],
+                postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+                "ix_publications_author_state_dt_uid",
+                table_name="publications",
+                postgresql_concurrently=True,
+                )
+        op.drop_index(
+                "ix_publications_author_dt_uid",
+                table_name="publications",
+                postgresql_concurrently=True,
+                )
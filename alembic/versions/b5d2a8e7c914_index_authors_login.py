@@ -0,0 +1,37 @@
+"""index authors login
+
+Revision ID: b5d2a8e7c914
+Revises: 9e1f6b3c5d48
+Create Date: 2026-10-17 12:18:03.226419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2a8e7c914'
+down_revision: Union[str, None] = '9e1f6b3c5d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+                "ix_authors_login",
+                "authors",
+                ["login"],
+                postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+                "ix_authors_login",
+                table_name="authors",
+                postgresql_concurrently=True,
+                )
@@ -0,0 +1,53 @@
+"""add comments table and comments counter
+
+Revision ID: e4a7c2f9b816
+Revises: b5d2a8e7c914
+Create Date: 2026-10-17 14:02:47.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2f9b816'
+down_revision: Union[str, None] = 'b5d2a8e7c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+            "comments",
+            sa.Column("uid", sa.String(32), primary_key=True),
+            sa.Column("pub_id", sa.String(32), nullable=False),
+            sa.Column("parent_id", sa.String(32), nullable=True),
+            sa.Column("author_id", sa.String(32), nullable=False),
+            sa.Column("body", sa.Text, nullable=False),
+            sa.Column("creation_dt", sa.DateTime, nullable=False),
+            sa.Column("_state", sa.Integer, nullable=False),
+            )
+    # new table is empty -> plain create, no CONCURRENTLY needed
+    op.create_index(
+            "ix_comments_pub_state_dt_uid",
+            "comments",
+            ["pub_id", "_state", "creation_dt", "uid"],
+            )
+    # server default -> no table rewrite on pg >= 11
+    op.add_column(
+            "publication_stats",
+            sa.Column(
+                "comments",
+                sa.BigInteger,
+                nullable=False,
+                server_default="0",
+                ),
+            )
+
+
+def downgrade() -> None:
+    op.drop_column("publication_stats", "comments")
+    op.drop_index("ix_comments_pub_state_dt_uid", table_name="comments")
+    op.drop_table("comments")
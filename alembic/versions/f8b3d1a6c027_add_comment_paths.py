@@ -0,0 +1,93 @@
+"""add materialized path and depth to comments
+
+Revision ID: f8b3d1a6c027
+Revises: e4a7c2f9b816
+Create Date: 2026-10-17 15:11:09.482630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from settings import CommentSettings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8b3d1a6c027'
+down_revision: Union[str, None] = 'e4a7c2f9b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PATH_SEG = 16  # blog.storage.models.COMMENT_PATH_SEG at this revision
+
+# same placement as BlogComment.place: answers deeper than
+# COMMENT_MAX_DEPTH become siblings of parent (parent_id kept).
+BACKFILL = """
+WITH RECURSIVE tree (uid, path, depth) AS (
+    SELECT uid, uid::text, 0 FROM comments WHERE parent_id IS NULL
+    UNION ALL
+    SELECT
+        c.uid,
+        CASE WHEN tree.depth + 1 < :max_depth
+            THEN tree.path || c.uid
+            ELSE left(tree.path, length(tree.path) - :seg) || c.uid
+        END,
+        CASE WHEN tree.depth + 1 < :max_depth
+            THEN tree.depth + 1
+            ELSE tree.depth
+        END
+    FROM comments c JOIN tree ON c.parent_id = tree.uid
+)
+UPDATE comments SET path = tree.path, depth = tree.depth
+FROM tree WHERE comments.uid = tree.uid
+"""
+
+# CONCURRENTLY can`t run inside transaction -> autocommit_block.
+# If it fails, index stays INVALID: drop it and run upgrade again.
+
+
+def upgrade() -> None:
+    op.add_column(
+            "comments",
+            sa.Column(
+                "path",
+                sa.String(512, collation="C"),
+                nullable=True,
+                ),
+            )
+    op.add_column(
+            "comments",
+            sa.Column(
+                "depth",
+                sa.Integer,
+                nullable=False,
+                server_default="0",
+                ),
+            )
+    op.execute(
+            sa.text(BACKFILL).bindparams(
+                max_depth=CommentSettings().COMMENT_MAX_DEPTH,
+                seg=PATH_SEG,
+                ),
+            )
+    op.alter_column("comments", "path", nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index(
+                "ix_comments_pub_path",
+                "comments",
+                ["pub_id", "path"],
+                postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+                "ix_comments_pub_path",
+                table_name="comments",
+                postgresql_concurrently=True,
+                )
+    op.drop_column("comments", "depth")
+    op.drop_column("comments", "path")
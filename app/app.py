@@ -6,6 +6,9 @@ from db.sessions import bootstrap_db, engine
 from db.tables import metadata
 from blog.api import main, author
 from authors.api import users
+from cache import AsyncCacheSession
+from config.config import stat_flusher, comment_batcher, notify_batcher
+from authors.handlers import crypt
 
 
 app = FastAPI()
@@ -18,11 +21,20 @@ app_set = TestSettings()
 @app.on_event("startup")
 async def build_db_tables() -> None:
     await bootstrap_db(engine, metadata)
+    stat_flusher.start()
+    comment_batcher.start()
+    notify_batcher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_app() -> None:
-    """no impl."""
+    """flush pending counters, comments and emails, release shared
+    cache pools."""
+    await stat_flusher.stop()
+    await comment_batcher.stop()
+    await notify_batcher.stop()
+    await AsyncCacheSession.disconnect()
+    crypt.close()
     return None
 
 
@@ -11,10 +11,12 @@ from fastapi.responses import RedirectResponse
 
 from .auth.auth import create_access_token, get_uid_from_token
 from .schemas.request_models import NewAuthor
-from .security.passwd_hashing import PasslibCrypt
+from .handlers import crypt as passwd_crypt
 from config.config import authors_uow, get_bus
+from .storage.authors_uow import AuthorsUOW
 from base_tools.bus import MsgBus
 from base_tools.base_moderation import generate_mcode
+from base_tools.exceptions import CryptBusyError
 from .messages import (
         RegisterNewAuthor,
         ActivateAuthor,
@@ -26,7 +28,6 @@ __all__ = (
         )
 
 
-passwd_crypt = PasslibCrypt()
 users = APIRouter(prefix="/users")
 logger = logging.getLogger(__name__)
 
@@ -73,17 +74,41 @@ async def activate_author(
 @users.post("/token")
 async def login(
         form: OAuth2PasswordRequestForm = Depends(),
+        uow: AuthorsUOW = Depends(authors_uow),
         ) -> dict[str, str]:
-    async with authors_uow as operator:
-        authors = operator.storage
-        author = await authors.get_author_by_login(form.username)
-        if author is None:
-            raise HTTPException(status_code=400, detail="login or password")
-        if not passwd_crypt.verify(form.password, author.hpasswd):
-            raise HTTPException(status_code=400, detail="login or password")
-        token_exp = timedelta(minutes=30)
-        token = create_access_token(
-                data={"sub": author.uid, "login": author.login},
-                exp_time=token_exp,
+    async with uow as operator:
+        author = await operator.storage.get_author_by_login(form.username)
+    # no db session is held while hash waits in crypt pool
+    if author is None:
+        raise HTTPException(status_code=400, detail="login or password")
+    try:
+        ok, new_hash = await passwd_crypt.averify_and_update(
+                form.password,
+                author.hpasswd,
+                )
+    except CryptBusyError as err:
+        logger.warning(err)  # login storm -> shed load
+        raise HTTPException(
+                status_code=503,
+                detail="Try later.",
+                headers={"Retry-After": "1"},
                 )
-        return {"access_token": token, "token_type": "bearer"}
+    if not ok:
+        raise HTTPException(status_code=400, detail="login or password")
+    if new_hash is not None:
+        async with authors_uow() as operator:
+            try:
+                await operator.storage.update_author_passwd(
+                        author.uid,
+                        new_hash,
+                        )
+                await operator.commit()
+            except Exception as err:
+                logger.error(err)  # old hash still valid
+                await operator.rollback()
+    token_exp = timedelta(minutes=30)
+    token = create_access_token(
+            data={"sub": author.uid, "login": author.login},
+            exp_time=token_exp,
+            )
+    return {"access_token": token, "token_type": "bearer"}
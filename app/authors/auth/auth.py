@@ -2,6 +2,7 @@ import logging
 from datetime import timedelta
 from datetime import datetime
 from typing import Any
+from typing import Optional
 
 from jose import jwt
 from jose import JWTError
@@ -9,11 +10,22 @@ from fastapi import Depends
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
-from settings import TestSettings
+from settings import TestSettings, TokenCacheSettings
+from .token_cache import TokenCache
 
 
 settings = TestSettings()
+cache_setup = TokenCacheSettings()
+# hot path of every authorized request -> dict lookup
+verified_tokens = TokenCache(
+        cache_setup.TOKEN_CACHE_SIZE,
+        cache_setup.TOKEN_CACHE_TTL_SEC,
+        )
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
+optional_oauth2 = OAuth2PasswordBearer(
+        tokenUrl="/users/token",
+        auto_error=False,
+        )
 logger = logging.getLogger(__name__)
 
 
@@ -31,7 +43,15 @@ def create_access_token(
     return jwt_token
 
 
+def revoke_tokens(uid: str) -> int:
+    """invalidation hook: drop cached tokens of user."""
+    return verified_tokens.invalidate_sub(uid)
+
+
 async def get_uid_from_token(token: str = Depends(oauth2_scheme)) -> str:
+    uid = verified_tokens.get(token)
+    if uid is not None:
+        return uid
     exp = HTTPException(
             status_code=401,
             detail="User unauthorized.",
@@ -45,7 +65,20 @@ async def get_uid_from_token(token: str = Depends(oauth2_scheme)) -> str:
         uid = payload.get("sub", None)
         if not uid:
             raise exp
+        verified_tokens.put(token, uid, payload.get("exp", None))
         return uid
     except JWTError as err:
         logger.error(f"Expected {err=}")
         raise exp
+
+
+async def get_optional_uid(
+        token: Optional[str] = Depends(optional_oauth2),
+        ) -> Optional[str]:
+    """uid for public endpoints: None -> guest or invalid token."""
+    if not token:
+        return None
+    try:
+        return await get_uid_from_token(token)
+    except HTTPException:
+        return None
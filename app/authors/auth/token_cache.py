@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Optional
+from typing import NamedTuple
+
+
+__all__ = (
+        "TokenCache",
+        )
+
+
+class _Verified(NamedTuple):
+    sub: str
+    expires: float  # epoch sec, min(token exp, cached + ttl)
+
+
+class TokenCache:
+    """LRU of verified tokens: digest -> (sub, expires).
+    Entry never outlives token exp. Used from one event loop
+    (no locks)."""
+
+    def __init__(self, max_size: int, ttl_sec: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl_sec
+        self._items: OrderedDict[bytes, _Verified] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        """keep digests, not tokens, in memory."""
+        return blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> Optional[str]:
+        """sub of verified token or None (miss / expired)."""
+        key = self._digest(token)
+        item = self._items.get(key, None)
+        if item is None:
+            self.misses += 1
+            return None
+        if item.expires <= time.time():
+            del self._items[key]
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item.sub
+
+    def put(self, token: str, sub: str, exp: Optional[float]) -> None:
+        expires = time.time() + self._ttl
+        if exp is not None:
+            expires = min(expires, float(exp))
+        key = self._digest(token)
+        self._items[key] = _Verified(sub, expires)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+        return None
+
+    def invalidate(self, token: str) -> None:
+        """drop one token (logout / revocation)."""
+        self._items.pop(self._digest(token), None)
+
+    def invalidate_sub(self, sub: str) -> int:
+        """drop all tokens of subject (ban, passwd change)."""
+        keys = [k for k, v in self._items.items() if v.sub == sub]
+        for k in keys:
+            del self._items[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            }
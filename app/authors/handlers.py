@@ -3,8 +3,10 @@ import logging
 
 from db.base_uow import BaseCmdHandler
 from .storage.models import Author
-from .security.passwd_hashing import PasslibCrypt
-from tasks.email import LOGIN, send_email
+from .security.passwd_hashing import PasslibCrypt, CryptPool
+from settings import CryptSettings
+from tasks.email import LOGIN, send_emails
+from cache import get_async_cache_engine
 from .messages import (
         RegisterNewAuthor,
         ActivateAuthor,
@@ -16,7 +18,14 @@ from base_tools.sys_messages import (
         )
 
 
-crypt = PasslibCrypt()
+crypt_setup = CryptSettings()
+# shared by registration and login (authors.api)
+crypt = PasslibCrypt(
+        pool=CryptPool(crypt_setup.CRYPT_POOL),
+        workers=crypt_setup.CRYPT_WORKERS,
+        max_queue=crypt_setup.CRYPT_MAX_QUEUE,
+        rounds_cnt=crypt_setup.CRYPT_ROUNDS or None,
+        )
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 str_handler = logging.StreamHandler()
@@ -26,15 +35,16 @@ logger.addHandler(str_handler)
 
 
 class NotifyAuthorsHandler(BaseCmdHandler):
-    """let`s move it to notification service later."""
+    """email waits in cache queue for NotifyBatcher."""
 
     async def handle(self, cmd: NotifyAuthor) -> None:
-        """for bus test only."""
         try:
-            send_email.delay(LOGIN, cmd.email, cmd.msg)
+            redis = get_async_cache_engine()
+            await redis.notify_enqueue(LOGIN, cmd.email, cmd.msg)
         except Exception as err:
             logger.error(err)
-            pass
+            # no queue -> send alone, notification is not lost
+            send_emails.delay([[LOGIN, cmd.email, cmd.msg]])
         return None
 
 
@@ -89,13 +99,14 @@ class PostRejectedHandler(BaseCmdHandler):
 class CreateNewAuthorHandler(BaseCmdHandler):
 
     async def handle(self, cmd: RegisterNewAuthor) -> None:
+        hpasswd = await crypt.ahash(cmd.passwd)
         async with self._uow as operator:
             authors = operator.storage
             author = Author(
                     uid=cmd.uid,
                     login=cmd.login,
                     email=cmd.email,
-                    hpasswd=crypt.hash(cmd.passwd),
+                    hpasswd=hpasswd,
                     )
             task = self._task(authors.create_new_author(author))
             try:
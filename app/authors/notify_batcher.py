@@ -0,0 +1,39 @@
+from cache import get_async_cache_engine
+from base_tools.periodic import PeriodicWorker
+from tasks.email import send_emails
+
+
+__all__ = (
+        "NotifyBatcher",
+        )
+
+
+class NotifyBatcher(PeriodicWorker):
+    """micro-batching of author emails: queued emails (cache list)
+    go to notification worker by batch in one send_emails task
+    (one smtp session) every period_sec. Queue is popped
+    atomically, so several app processes can send at once."""
+
+    _report: str = "{} emails sent to notification"
+
+    def __init__(self, *, period_sec: float, batch: int) -> None:
+        super().__init__(period_sec=period_sec)
+        self._batch = batch
+
+    async def drain(self) -> int:
+        """send all queued emails, return sent count.
+        Failed batch is returned to queue."""
+        redis = get_async_cache_engine()
+        sent = 0
+        while True:
+            taken = await redis.notify_take(self._batch)
+            if not taken:
+                return sent
+            try:
+                send_emails.apply_async((taken, ))
+            except Exception:
+                await redis.notify_restore(taken)
+                raise
+            sent += len(taken)
+            if len(taken) < self._batch:
+                return sent
@@ -1,6 +1,7 @@
-from .passwd_hashing import PasslibCrypt
+from .passwd_hashing import PasslibCrypt, CryptPool
 
 
 __all__ = (
         "PasslibCrypt",
+        "CryptPool",
         )
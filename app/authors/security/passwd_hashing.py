@@ -1,17 +1,59 @@
+import asyncio
 import logging
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from enum import Enum
 from typing import Optional
+from typing import Callable
+from typing import Any
 from pathlib import Path
 
 from passlib.context import CryptContext
 
 from base_tools.hashing import AbcCryptographer, CryptSchema
 from base_tools.hashing import HashedStr, PlainStr
+from base_tools.exceptions import CryptBusyError
+
+
+__all__ = (
+        "PasslibCrypt",
+        "CryptPool",
+        )
 
 
 logger = logging.getLogger("PASS_CRYPT")
 
+# context of process-pool worker (built once by initializer)
+_worker_ctx: Optional[CryptContext] = None
+
+
+class CryptPool(str, Enum):
+    """where hash / verify run in async api."""
+    THREAD: str = "thread"
+    PROCESS: str = "process"
+
+
+def _init_worker(ctx_cfg: str) -> None:
+    global _worker_ctx
+    _worker_ctx = CryptContext.from_string(ctx_cfg)
+
+
+def _worker_hash(passwd: str, scheme: Optional[str]) -> str:
+    return _worker_ctx.hash(passwd, scheme=scheme)
+
+
+def _worker_verify_and_update(
+        passwd: str,
+        hashed: str,
+        ) -> tuple[bool, Optional[str]]:
+    return _worker_ctx.verify_and_update(passwd, hashed)
+
 
 class PasslibCrypt(AbcCryptographer):
+    """sync api runs on caller thread. Async api (ahash, averify,
+    averify_and_update) runs in own bounded pool, so event loop
+    isn`t blocked by hash rounds. More than max_queue calls in
+    flight -> CryptBusyError."""
 
     def __init__(
             self,
@@ -19,6 +61,10 @@ class PasslibCrypt(AbcCryptographer):
             schemes: Optional[list[CryptSchema]] = None,
             deprecated: Optional[list[CryptSchema]] = None,
             build_from_path: Optional[Path] = None,
+            pool: CryptPool = CryptPool.THREAD,
+            workers: int = 2,
+            max_queue: int = 64,
+            rounds_cnt: Optional[int] = None,
             ) -> None:
         if build_from_path:
             # remember how to Path()...
@@ -31,6 +77,13 @@ class PasslibCrypt(AbcCryptographer):
                     schemes=_schm,
                     deprecated=_dpr,
                     )
+        self._pool_t = pool
+        self._workers = workers
+        self._max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        if rounds_cnt:
+            self.update_alg_schema(rounds_cnt=rounds_cnt)
 
     def hash(
             self,
@@ -59,8 +112,85 @@ class PasslibCrypt(AbcCryptographer):
             rounds_cnt: Optional[int] = None,
             salt_size: Optional[int] = None,
             ) -> None:
-        """NotImplemented."""
-        ...
+        """set rounds (and salt size) of default scheme.
+        Hashes with other rounds become needs_update -> rehashed
+        on next successful login."""
+        scheme = self._ctx.default_scheme()
+        opts: dict[str, Any] = {}
+        if rounds_cnt:
+            for key in ("default_rounds", "min_rounds", "max_rounds"):
+                opts[f"{scheme}__{key}"] = rounds_cnt
+        if salt_size:
+            opts[f"{scheme}__salt_size"] = salt_size
+        if not opts:
+            return None
+        self._ctx.update(**opts)
+        if self._pool_t is CryptPool.PROCESS:
+            self.close()  # workers hold copy of old context
+        return None
 
     def needs_update(self, hashed: HashedStr) -> bool:
         return self._ctx.needs_update(hashed)
+
+    def _get_executor(self) -> Executor:
+        """built lazily (after worker fork)."""
+        if self._executor is None:
+            if self._pool_t is CryptPool.PROCESS:
+                self._executor = ProcessPoolExecutor(
+                        max_workers=self._workers,
+                        initializer=_init_worker,
+                        initargs=(self._ctx.to_string(), ),
+                        )
+            else:
+                self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers,
+                        thread_name_prefix="crypt",
+                        )
+        return self._executor
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        if self._in_flight >= self._max_queue:
+            raise CryptBusyError(f"{self._in_flight} crypt calls in flight")
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def ahash(
+            self,
+            passwd: PlainStr,
+            *,
+            scheme: Optional[CryptSchema] = None,
+            ) -> HashedStr:
+        """hash in pool."""
+        if self._pool_t is CryptPool.PROCESS:
+            return await self._run(_worker_hash, passwd, scheme)
+        return await self._run(lambda: self.hash(passwd, scheme=scheme))
+
+    async def averify(self, passwd: PlainStr, hashed: HashedStr) -> bool:
+        ok, _ = await self.averify_and_update(passwd, hashed)
+        return ok
+
+    async def averify_and_update(
+            self,
+            passwd: PlainStr,
+            hashed: HashedStr,
+            ) -> tuple[bool, Optional[HashedStr]]:
+        """verify in pool. New hash is returned if old one
+        needs update (rounds or scheme changed), else None."""
+        if not (passwd and hashed):
+            raise Exception("Empty credentials: {passwd=} | {hashed=}")
+        if self._pool_t is CryptPool.PROCESS:
+            return await self._run(_worker_verify_and_update, passwd, hashed)
+        return await self._run(self._ctx.verify_and_update, passwd, hashed)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
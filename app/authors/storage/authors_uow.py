@@ -30,14 +30,11 @@ class AuthorsUOW(BaseUOW):
                 exc_type is not None
                 and self._state is type(self)._work_state.TRANSACTION
                 ):
-            self._curr_ses.rollback()
-            self._state = type(self)._work_state.ROLLEDBACK
+            await self.rollback()
             logger.error(f"{exc_type=}, {exc_value=}")
             logger.error(traceback)
         else:
-            if self._state is type(self)._work_state.TRANSACTION:
-                self._curr_ses.commit()
-                self._state = type(self)._work_state.COMMITED
+            await self.commit()
         return await super().__aexit__(
                 exc_type,
                 exc_value,
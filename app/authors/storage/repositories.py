@@ -33,7 +33,19 @@ class AuthorsRepository(BaseRepository):
                 .values(_state=author.state)
                 .execution_options(syncronize_session=False)
                 )
-        self._session.execute(upd_state)
+        await self._execute(upd_state)
+        return None
+
+    async def update_author_passwd(self, uid: str, hpasswd: str) -> None:
+        """store rehashed passwd (rounds / scheme changed)."""
+        self._check_session_attached()
+        upd_passwd = (
+                update(Author)
+                .where(Author.uid == uid)
+                .values(_hpasswd=hpasswd)
+                .execution_options(syncronize_session=False)
+                )
+        await self._execute(upd_passwd)
         return None
 
     async def get_author_by_id(self, uid: str) -> Author:
@@ -42,7 +54,7 @@ class AuthorsRepository(BaseRepository):
                 select(Author)
                 .where(Author.uid == uid)
                 )
-        return self._session.execute(author).scalar()
+        return (await self._execute(author)).scalar()
 
     async def get_author_by_login(self, login: str) -> Author:
         self._check_session_attached()
@@ -50,4 +62,4 @@ class AuthorsRepository(BaseRepository):
                 select(Author)
                 .where(Author.login == login)
                 )
-        return self._session.execute(author).scalar()
+        return (await self._execute(author)).scalar()
@@ -1,19 +1,19 @@
 from dataclasses import dataclass, field
-from string import ascii_letters, digits
-from random import choice
 from enum import Enum
 from typing import Union
 
 from .actions import ModerationRes, Serializable
+from .ids import ALPHABET, random_code, sortable_code
 
 
-SYMBOLS: list[str] = [*ascii_letters, *digits, "-", "_"]
+SYMBOLS: list[str] = list(ALPHABET.decode())
 
 
 __all__ = (
         "_ContentBlock",
         "ModerationControlRecord",
         "McodeSize",
+        "MCRVerdict",
         "generate_mcode",
         )
 
@@ -27,11 +27,29 @@ class McodeSize(int, Enum):
     MAX_128S: int = 128
 
 
-def generate_mcode(*, symblos_cnt: int = McodeSize.MIN_8S) -> str:
-    """generate unique random code for moderated block."""
+class MCRVerdict(str, Enum):
+    """result of applying one block result to cached MCR.
+    ACCEPTED / REJECTED are terminal and returned exactly once."""
+    PENDING: str = "pending"
+    ACCEPTED: str = "accepted"
+    REJECTED: str = "rejected"
+    DUPLICATE: str = "duplicate"
+    UNKNOWN: str = "unknown"
+    MISSING: str = "missing"
+
+
+def generate_mcode(
+        *,
+        symblos_cnt: int = McodeSize.MIN_8S,
+        sortable: bool = False,
+        ) -> str:
+    """generate unique random code (CSPRNG) for moderated block.
+    sortable -> time-ordered code (ids, min 16 symbols)."""
     if symblos_cnt < 0 or symblos_cnt > McodeSize.MAX_128S:
         symblos_cnt = McodeSize.MIN_8S
-    return "".join([choice(SYMBOLS) for _ in range(symblos_cnt)])
+    if sortable:
+        return sortable_code(symblos_cnt)
+    return random_code(symblos_cnt)
 
 
 @dataclass
@@ -50,7 +68,8 @@ class _ContentBlock(Serializable):
 @dataclass
 class ModerationControlRecord(Serializable):
     """MCR implementation. class that controlled
-    moderation process."""
+    moderation process. Cached MCR runs the same transitions
+    server-side (see cache.redis_cache.APPLY_MCR_RESULT_LUA)."""
     pub_id: str
     act_dt: str
     exp_after_sec: int
@@ -40,6 +40,8 @@ class _PublicationStatistic:
     pub_id: str
     likes: int = field(default_factory=int)
     dislikes: int = field(default_factory=int)
+    watches: int = field(default_factory=int)
+    comments: int = field(default_factory=int)
 
     def __post_init__(self) -> None:
         """auto set NULL on __init__ for all numeric attrs."""
@@ -2,10 +2,13 @@ import asyncio
 import logging
 from typing import MutableMapping as MMap
 from typing import Generator
+from typing import Iterable
+from typing import Optional
 from typing import Type
 from typing import TypeVar
 from typing import Protocol
 from collections import deque
+from enum import Enum
 
 from .exceptions import BusError
 from .base_types import SysMsgT
@@ -26,12 +29,57 @@ class HandlerProto(Protocol):
     @property
     def events(self) -> Generator: pass
 
+    def scoped(self) -> "HandlerProto": pass
+
     async def handle(self, cmd: SysMsgT) -> None: pass
 
 
+class DispatchMode(int, Enum):
+    """how bus runs each generation of queued messages."""
+    SERIAL: int = 0
+    FANOUT: int = 1
+
+
+DEF_CONCURRENCY: int = 16
+
+
 class MsgBus:
 
     _map: MMap[str, HandlerT] = {}
+    # {later_msg_key: {msg_keys that have to be handled before}}
+    _after: MMap[str, set[str]] = {}
+    _mode: DispatchMode = DispatchMode.SERIAL
+    _limit: int = DEF_CONCURRENCY
+
+    @classmethod
+    def set_dispatch_mode(
+            cls,
+            mode: DispatchMode,
+            *,
+            limit: Optional[int] = None,
+            ) -> None:
+        """switch dispatch mode. FANOUT runs independent
+        messages of one generation concurrently (up to limit)."""
+        if limit is not None:
+            if limit < 1:
+                raise BusError(f"Invalid concurrency limit: {limit}.")
+            cls._limit = limit
+        cls._mode = mode
+        bus_logger.debug(f"dispatch MODE: {mode.name} LIMIT: {cls._limit}")
+
+    @classmethod
+    def add_ordering(
+            cls,
+            first: Type[SysMsgT],
+            then: Type[SysMsgT],
+            ) -> None:
+        """<then> messages wait for <first> messages
+        if both are in the same generation (any dispatch mode)."""
+        first_key, then_key = cls.make_key(first), cls.make_key(then)
+        if first_key == then_key:
+            raise BusError(f"Can`t order {first_key} after itself.")
+        cls._after.setdefault(then_key, set()).add(first_key)
+        bus_logger.debug(f"ordered KEY: {then_key:<24} AFTER: {first_key}")
 
     @classmethod
     def subscribe(cls, item: Type[SysMsgT], handler: HandlerT) -> None:
@@ -55,11 +103,26 @@ class MsgBus:
     @classmethod
     def get_bus(cls: BT) -> BT:
         if cls._map:
-            return cls(cls._map)
+            return cls(
+                    cls._map,
+                    mode=cls._mode,
+                    limit=cls._limit,
+                    after=cls._after,
+                    )
         raise Exception("Can`t create empty bus.")
 
-    def __init__(self, h_map: MMap[str, HandlerT]) -> None:
+    def __init__(
+            self,
+            h_map: MMap[str, HandlerT],
+            *,
+            mode: DispatchMode = DispatchMode.SERIAL,
+            limit: int = DEF_CONCURRENCY,
+            after: Optional[MMap[str, set[str]]] = None,
+            ) -> None:
         self._h_map = h_map
+        self._mode = mode
+        self._limit = limit
+        self._after = after or {}
 
     @staticmethod
     def make_key(item: Type[SysMsgT]) -> str:
@@ -76,7 +139,64 @@ class MsgBus:
                 tasks.append(t)
         return None
 
+    def _get_handler(self, item: SysMsgT) -> HandlerT:
+        handler = self._h_map.get(type(item).__name__, None)
+        if handler is None:
+            bus_logger.error(f"Detached key: {type(item).__name__}:{item}")
+            raise BusError("Unexpected handler.")
+        # each message gets own handler scope (uow, session, events)
+        if hasattr(handler, "scoped"):
+            return handler.scoped()
+        return handler
+
+    def _split_waves(self, generation: Iterable[SysMsgT]) -> list[list]:
+        """split one generation into waves, so that each message
+        runs after all messages it was ordered after."""
+        pending = list(generation)
+        waves: list[list[SysMsgT]] = []
+        while pending:
+            keys = {self.make_key(type(t)) for t in pending}
+            wave, rest = [], []
+            for t in pending:
+                key = self.make_key(type(t))
+                if self._after.get(key, set()) & (keys - {key}):
+                    rest.append(t)
+                else:
+                    wave.append(t)
+            if not wave:
+                raise BusError(f"Cyclic ordering between: {keys}.")
+            waves.append(wave)
+            pending = rest
+        return waves
+
+    async def _handle_fanout(self, item: SysMsgT) -> None:
+        """run each generation of messages concurrently."""
+        sem = asyncio.Semaphore(self._limit)
+        generation: deque[SysMsgT] = deque([item])
+
+        async def _run(handler: HandlerT, t: SysMsgT) -> None:
+            async with sem:
+                await handler.handle(t)
+
+        while generation:
+            handlers: deque[HandlerT] = deque()
+            for wave in self._split_waves(generation):
+                runs = []
+                for t in wave:
+                    handler = self._get_handler(t)
+                    handlers.append(handler)
+                    runs.append(asyncio.create_task(_run(handler, t)))
+                results = await asyncio.gather(*runs, return_exceptions=True)
+                for res in results:
+                    if isinstance(res, BaseException):
+                        raise res
+            generation = deque()
+            await self.fetch_events(handlers, generation)
+        return None
+
     async def handle(self, item: SysMsgT) -> None:
+        if self._mode is DispatchMode.FANOUT:
+            return await self._handle_fanout(item)
         tasks: deque[SysMsgT] = deque()
         handlers: deque[HandlerT] = deque()
         tasks.append(item)
@@ -85,15 +205,17 @@ class MsgBus:
             handler = None
             while tasks:
                 t = tasks.popleft()
-                handler = self._h_map.get(type(t).__name__, None)
-                if handler is None:
-                    bus_logger.error(f"Detached key: {type(t).__name__}:{t}")
-                    raise BusError("Unexpected handler.")
+                handler = self._get_handler(t)
                 handlers.append(handler)
                 task = asyncio.create_task(handler.handle(t))
                 await asyncio.gather(task)
             ft = asyncio.create_task(self.fetch_events(handlers, tasks))
             await asyncio.gather(ft)
+            if self._after:
+                # serial too: ordered messages go after their <first>
+                tasks = deque(
+                        t for wave in self._split_waves(tasks) for t in wave
+                        )
             if not tasks:
                 is_active = False
         return None
@@ -46,3 +46,13 @@ class BodyFetchingError(Exception):
 class InvalidCredentials(Exception):
     """invalid api_secret or api_num."""
     pass
+
+
+class CursorError(Exception):
+    """invalid pagination cursor."""
+    pass
+
+
+class CryptBusyError(Exception):
+    """too many hash / verify calls in flight."""
+    pass
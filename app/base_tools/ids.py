@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from string import ascii_letters, digits
+
+
+__all__ = (
+        "ALPHABET",
+        "IdPool",
+        "random_code",
+        "sortable_code",
+        )
+
+
+# 64 symbols -> byte & 63 maps urandom bytes without bias
+ALPHABET: bytes = (ascii_letters + digits + "-_").encode()
+_TRANSLATE: bytes = bytes(ALPHABET[b & 63] for b in range(256))
+# time prefix: digits + lowercase only, sorts the same in any collation
+_TIME_SYMBOLS: str = "0123456789abcdefghijklmnopqrstuv"
+_TIME_LEN: int = 10  # 50 bits of ms, enough till year 37648
+SORTABLE_MIN: int = 16
+
+
+class IdPool:
+    """buffer of CSPRNG symbols, refilled in bulk from os.urandom.
+    Buffer is dropped in forked child, so processes never share codes."""
+
+    def __init__(self, chunk: int = 1 << 16) -> None:
+        self._chunk = chunk
+        self._buf = b""
+        self._pos = 0
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._buf = b""
+        self._pos = 0
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> str:
+        with self._lock:
+            end = self._pos + size
+            if end > len(self._buf):
+                self._buf = os.urandom(max(self._chunk, size)).translate(
+                        _TRANSLATE,
+                        )
+                self._pos, end = 0, size
+            code = self._buf[self._pos:end]
+            self._pos = end
+        return code.decode("ascii")
+
+
+_pool = IdPool()
+_last_prefix: tuple[int, str] = (-1, "")
+
+
+def _time_prefix(ms: int) -> str:
+    global _last_prefix
+    if _last_prefix[0] == ms:
+        return _last_prefix[1]  # burst in one ms
+    key = ms
+    out = []
+    for _ in range(_TIME_LEN):
+        out.append(_TIME_SYMBOLS[ms & 31])
+        ms >>= 5
+    _last_prefix = (key, "".join(reversed(out)))
+    return _last_prefix[1]
+
+
+def random_code(size: int) -> str:
+    """size random symbols of ALPHABET."""
+    return _pool.take(size)
+
+
+def sortable_code(size: int) -> str:
+    """ms timestamp prefix + random tail: new codes sort after
+    older ones (append to right end of b-tree index)."""
+    size = max(size, SORTABLE_MIN)
+    prefix = _time_prefix(time.time_ns() // 1_000_000)
+    return prefix + _pool.take(size - _TIME_LEN)
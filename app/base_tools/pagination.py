@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple
+from typing import Optional
+
+from .exceptions import CursorError
+
+
+__all__ = (
+        "Cursor",
+        "encode_cursor",
+        "decode_cursor",
+        "encode_path_cursor",
+        "decode_path_cursor",
+        )
+
+
+class Cursor(NamedTuple):
+    """keyset position -> last seen (creation_dt, uid)."""
+    creation_dt: datetime
+    uid: str
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """opaque url-safe token."""
+    raw = json.dumps([cursor.creation_dt.isoformat(), cursor.uid])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Cursor]:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        dt, uid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(dt), str(uid))
+    except (ValueError, TypeError) as err:
+        raise CursorError(f"Invalid cursor: {token}") from err
+
+
+def encode_path_cursor(path: str) -> str:
+    """opaque token of last seen thread path."""
+    return base64.urlsafe_b64encode(path.encode()).decode().rstrip("=")
+
+
+def decode_path_cursor(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        path = base64.urlsafe_b64decode(padded.encode()).decode()
+    except (ValueError, TypeError) as err:
+        raise CursorError(f"Invalid cursor: {token}") from err
+    if not path:
+        raise CursorError(f"Invalid cursor: {token}")
+    return path
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+__all__ = (
+        "PeriodicWorker",
+        )
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+str_handler = logging.StreamHandler()
+formatter = logging.Formatter("%(name)s %(levelname)s %(asctime)s %(message)s")
+str_handler.setFormatter(formatter)
+logger.addHandler(str_handler)
+
+
+class PeriodicWorker(ABC):
+    """app background loop: drain() every period_sec,
+    once more on stop. Errors are logged, loop goes on."""
+
+    # debug line after non-empty drain, {} -> drained count
+    _report: str = "{} items drained"
+
+    def __init__(self, *, period_sec: float) -> None:
+        self._period = period_sec
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def drain(self) -> int:
+        """handle all queued items, return handled count."""
+        pass
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._period)
+            try:
+                done = await self.drain()
+                if done:
+                    logger.debug(self._report.format(done))
+            except Exception as err:
+                logger.error(err)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return None
+
+    async def stop(self) -> None:
+        """stop loop and drain the rest."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.drain()
+        except Exception as err:
+            logger.error(err)
+        return None
@@ -22,6 +22,8 @@ class PostRolledToDraft(Event):
 
 class PostPublished(Event):
     pub_id: str
+    author_id: str = ""
+    title: str = ""
 
 
 class ActivateLater(Command):
@@ -4,22 +4,39 @@ from datetime import datetime
 from typing import Optional
 from typing import Union
 from fastapi import APIRouter, HTTPException
-from fastapi import Depends, Response
+from fastapi import Depends, Response, Query, Request
 from fastapi.responses import RedirectResponse
 
 from .messages import CreateNewPost, UpdateHeader, UpdateBody
 from .messages import StartModeration, SetModerationResult
+from .messages import SetModerationResults
+from .messages import ActivatePost, LikeThisPost, DislikeThisPost, WatchPost
+from .messages import CommentPost, SetCommentResults
 from base_tools.base_moderation import generate_mcode, McodeSize
-from base_tools.base_moderation import ModerationControlRecord as MCR
 from base_tools.bus import MsgBus
 from .schemas.response_models import PublicationCreated, PublicatedPost
 from .schemas.response_models import ContentSchema, set_schema
+from .schemas.response_models import FeedPreview, PublicationStat
+from .schemas.response_models import PostsPage, PublicatedContent
+from .schemas.response_models import CommentItem, CommentsPage
 from .schemas.request_models import UpdateHeaderRequest, UpdateBodyRequest
 from .schemas.request_models import StartModerationRequest
 from .schemas.request_models import SetContentCheckResult
-from config.config import get_bus, mod_uow, cont_uow
-from cache import CacheEngine, get_cache_engine
-from authors.auth.auth import get_uid_from_token
+from .schemas.request_models import SetContentCheckResults
+from .schemas.request_models import FetchContentBatch
+from .schemas.request_models import NewCommentRequest, SetCommentCheckResults
+from config.config import get_bus, mod_uow, stat_uow, comment_uow
+from blog.storage.uow_units import ModerationUOW
+from blog.storage.models import BlogComment
+from cache import AsyncCacheEngine, get_async_cache_engine
+from settings import CacheSettings
+from authors.auth.auth import get_uid_from_token, get_optional_uid
+from base_tools.exceptions import CursorError
+from base_tools.base_content import ContentRoles, PostStatus
+from base_tools.pagination import Cursor, encode_cursor, decode_cursor
+from base_tools.pagination import encode_path_cursor, decode_path_cursor
+from settings import PageSettings, ViewSettings
+from .services import ViewCounter
 
 
 __all__ = [
@@ -28,6 +45,13 @@ __all__ = [
         ]
 
 
+page_setup = PageSettings()
+cache_setup = CacheSettings()
+view_setup = ViewSettings()
+views = ViewCounter(
+        daily=view_setup.VIEW_DAILY,
+        keep_days=view_setup.VIEW_KEEP_DAYS,
+        )
 main = APIRouter(prefix="/main")
 author = APIRouter(prefix="/main/{user_id}")
 
@@ -45,7 +69,7 @@ async def create_new_post(
         user_id: str = Depends(get_uid_from_token),
         bus: MsgBus = Depends(get_bus),
         ) -> RedirectResponse:
-    pub_id = generate_mcode(symblos_cnt=McodeSize.MIN_16S)
+    pub_id = generate_mcode(symblos_cnt=McodeSize.MIN_16S, sortable=True)
     # check user permissions here
     int_cmd = CreateNewPost(
             uid=pub_id,
@@ -68,26 +92,34 @@ async def create_new_post(
 async def get_post_by_id(
         pub_id: str,
         user_id: str = Depends(get_uid_from_token),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        posts: ModerationUOW = Depends(mod_uow),
         ) -> Union[PublicationCreated, Response]:
-    """get author`s post by post_id."""
-    d_schema: Optional[ContentSchema] = None
-    async with mod_uow as uow:
-        post = await uow.storage.get_post_by_uid(pub_id)
-        if post is None:
-            raise HTTPException(status_code=404, detail="Not found...")
-        async with cont_uow as cont_provider:
-            repo = cont_provider.storage
-            content = await repo.get_all_post_content(pub_id)
-            if content is None:
-                raise HTTPException(status_code=404, detail="Try later")
-            d_schema = ContentSchema()
-            set_schema(d_schema, content)
-        return PublicationCreated(
-                uid=post.uid,
-                author_id=post.author_id,
-                content=d_schema,
-                title=post.title,
-                )
+    """get author`s post by post_id.
+    Read-through: cached json is dropped by bus on post changes."""
+    cached, version = await redis.get_post_cache(pub_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    async with posts as uow:
+        post = await uow.storage.get_post_with_content(pub_id)
+    if post is None:
+        raise HTTPException(status_code=404, detail="Not found...")
+    d_schema = ContentSchema()
+    set_schema(d_schema, post.content)
+    payload = PublicationCreated(
+            uid=post.uid,
+            author_id=post.author_id,
+            content=d_schema,
+            title=post.title,
+            ).model_dump_json()
+    # skipped if post was changed (cache dropped) while we read db
+    await redis.set_post_cache(
+            pub_id,
+            version,
+            payload,
+            cache_setup.POST_CACHE_SEC,
+            )
+    return Response(content=payload, media_type="application/json")
 
 
 @author.patch("/edit/update_header")
@@ -156,9 +188,19 @@ async def pub(
 
 
 @author.patch("/moderated/activate")
-async def activate_moderated_post() -> None:
+async def activate_moderated_post(
+        pub_id: str,
+        user_id: str = Depends(get_uid_from_token),
+        bus: MsgBus = Depends(get_bus),
+        ) -> Response:
     """activate post if it was successfully moderated."""
-    ...
+    cmd = ActivatePost(pub_id=pub_id, author_id=user_id)
+    try:
+        await bus.handle(cmd)
+        return Response(status_code=200)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Not found.")
 
 
 @author.get("/rejected")
@@ -189,23 +231,165 @@ async def correct_rejected_post(
 
 
 @main.get("/")
-async def show_rated_main_previews() -> None:
+async def show_rated_main_previews(
+        page: int = Query(default=0, ge=0),
+        size: int = Query(default=20, ge=1, le=100),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        ) -> list[FeedPreview]:
     """show all rated main previews.
-    From most common watched."""
-    return Response(status_code=201)
+    From most common watched (served from cache only)."""
+    previews = await redis.feed_page(page * size, size)
+    return [FeedPreview(**p) for p in previews]
 
 
 @main.get("/{auth_id}/all")
-async def get_all_authors_main(auth_id: str) -> list[PublicatedPost]:
-    """get all main, created by current user."""
-    ...
-    raise HTTPException(status_code=404, detail="No author found.")
+async def get_all_authors_main(
+        auth_id: str,
+        cursor: Optional[str] = None,
+        size: int = Query(
+            default=page_setup.PAGE_SIZE,
+            ge=1,
+            le=page_setup.PAGE_MAX_SIZE,
+            ),
+        user_id: Optional[str] = Depends(get_optional_uid),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        posts: ModerationUOW = Depends(mod_uow),
+        ) -> PostsPage:
+    """get published posts of author, newest first.
+    Pass next_cursor from previous page to continue."""
+    try:
+        after = decode_cursor(cursor)
+    except CursorError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    async with posts as post_provider:
+        rows = await post_provider.storage.get_published_page(
+                auth_id,
+                limit=size + 1,
+                after=after,
+                )
+    rows, rest = rows[:size], rows[size:]
+    pending = await redis.stat_pending_many([r.uid for r in rows])
+    viewers = await redis.view_count_many([r.uid for r in rows])
+    grades = [""] * len(rows)
+    if user_id is not None:
+        grades = await redis.stat_grade_many([r.uid for r in rows], user_id)
+    items = [
+        PublicatedPost(
+            pub_id=r.uid,
+            author_id=r.author_id,
+            my_grade=g,
+            pub_dt=r.creation_dt,
+            content=PublicatedContent(
+                header=r.header or "",
+                body=r.body or "",
+                ),
+            stat=PublicationStat(
+                likes=r.likes + p.get("likes", 0),
+                dislikes=r.dislikes + p.get("dislikes", 0),
+                watches=max(v, r.watches + p.get("watches", 0)),
+                reposts=0,
+                comments=r.comments,
+                ),
+            )
+        for r, p, v, g in zip(rows, pending, viewers, grades)
+        ]
+    next_cursor = None
+    if rest:
+        next_cursor = encode_cursor(Cursor(rows[-1].creation_dt, rows[-1].uid))
+    return PostsPage(items=items, next_cursor=next_cursor)
 
 
 @main.get("/{pub_id}")
-async def get_selected_post(pub_id: str) -> PublicatedPost:
-    """get selected post (on main page) by id. Redirect (watch action)"""
-    ...
+async def get_selected_post(
+        pub_id: str,
+        request: Request,
+        user_id: Optional[str] = Depends(get_optional_uid),
+        bus: MsgBus = Depends(get_bus),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        posts: ModerationUOW = Depends(mod_uow),
+        ) -> PublicatedPost:
+    """get selected post (on main page) by id. Redirect (watch action).
+    watches -> approximate unique viewers."""
+    async with posts as post_provider:
+        post = await post_provider.storage.get_post_with_content(pub_id)
+    if post is None or post.state is not PostStatus.PUBLISHED:
+        raise HTTPException(status_code=404, detail="Not found.")
+    try:
+        viewer = views.viewer(
+                user_id,
+                request.client.host if request.client else "",
+                request.headers.get("user-agent", ""),
+                )
+        await bus.handle(WatchPost(uid=pub_id, viewer=viewer))
+    except Exception as err:
+        logger.error(err)  # watch isn`t critical for reader
+    pending = await redis.stat_pending(pub_id)
+    viewers = await redis.view_count(pub_id)
+    grade = ""
+    if user_id is not None:
+        grade = await redis.stat_grade(pub_id, user_id)
+    header = post.by_role(ContentRoles.HEADER)
+    body = post.by_role(ContentRoles.BODY)
+    return PublicatedPost(
+            pub_id=post.uid,
+            author_id=post.author_id,
+            my_grade=grade,
+            pub_dt=post.creation_dt,
+            content=PublicatedContent(
+                header=header.body if header else "",
+                body=body.body if body else "",
+                ),
+            stat=PublicationStat(
+                likes=post.likes + pending.get("likes", 0),
+                dislikes=post.dislikes + pending.get("dislikes", 0),
+                watches=max(viewers, post.watches + pending.get("watches", 0)),
+                reposts=0,
+                comments=post.comments,
+                ),
+            )
+
+
+@main.get("/{pub_id}/stat")
+async def get_post_stat(
+        pub_id: str,
+        days: Optional[int] = Query(
+            default=None,
+            ge=1,
+            le=view_setup.VIEW_KEEP_DAYS,
+            ),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        stats: ModerationUOW = Depends(stat_uow),
+        ) -> PublicationStat:
+    """persisted counters + pending (not flushed yet) deltas.
+    watches -> unique viewers, of last days if days is set
+    (needs day buckets, VIEW_DAILY)."""
+    if days is not None and not view_setup.VIEW_DAILY:
+        raise HTTPException(
+                status_code=400,
+                detail="Daily views are disabled, days is not supported.",
+                )
+    async with stats as stat_provider:
+        stored = await stat_provider.storage.get_stat(pub_id)
+    pending = await redis.stat_pending(pub_id)
+    counters = {
+        c: getattr(stored, c, 0) + pending.get(c, 0)
+        for c in ("likes", "dislikes", "watches")
+        }
+    if days is not None:
+        counters["watches"] = await redis.view_window(
+                pub_id,
+                views.window(days),
+                )
+    else:
+        counters["watches"] = max(
+                counters["watches"],
+                await redis.view_count(pub_id),
+                )
+    return PublicationStat(
+            **counters,
+            reposts=0,
+            comments=getattr(stored, "comments", 0),
+            )
 
 
 @main.patch("/like")
@@ -216,11 +400,12 @@ async def like(
         ) -> None:
 
     """like current post (from main or inside a post)."""
-    # cmd = LikeThisPost(uid=pub_id, produser=user_id)
-    # like_task = asyncio.create_task(bus.handle(cmd))
-    # ch_cache = asyncio.create_task(cache_keeper.get_post_stat(pub_id))
-    # await asyncio.gather(like_task, ch_cache)
-    # return ch_cache.result()
+    cmd = LikeThisPost(uid=pub_id, produser=user_id)
+    try:
+        await bus.handle(cmd)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Not found.")
     return None
 
 
@@ -231,13 +416,143 @@ async def dislike(
         bus: MsgBus = Depends(get_bus),
         ) -> None:
     """the same as like."""
-    ...
+    cmd = DislikeThisPost(uid=pub_id, produser=user_id)
+    try:
+        await bus.handle(cmd)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Not found.")
+    return None
 
 
-@main.post("/new_comment")
-async def comment_current_post() -> None:
-    """comment current post (inside, not from main)."""
-    ...
+def _comment_item(comment: BlogComment) -> CommentItem:
+    return CommentItem(
+            uid=comment.uid,
+            author_id=comment.author_id,
+            parent_id=comment.parent_id,
+            depth=comment.depth,
+            body=comment.body,
+            pub_dt=comment.creation_dt,
+            )
+
+
+@main.post("/{pub_id}/comments")
+async def comment_current_post(
+        pub_id: str,
+        request: NewCommentRequest,
+        user_id: str = Depends(get_uid_from_token),
+        bus: MsgBus = Depends(get_bus),
+        ) -> dict[str, str]:
+    """comment current post (inside, not from main).
+    Comment is shown after moderation."""
+    uid = generate_mcode(symblos_cnt=McodeSize.MIN_16S, sortable=True)
+    cmd = CommentPost(
+            uid=uid,
+            pub_id=pub_id,
+            author_id=user_id,
+            body=request.body,
+            parent_id=request.parent_id,
+            )
+    try:
+        await bus.handle(cmd)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Not found.")
+    return {"uid": uid}
+
+
+@main.get("/{pub_id}/comments")
+async def get_post_comments(
+        pub_id: str,
+        cursor: Optional[str] = None,
+        size: int = Query(
+            default=page_setup.PAGE_SIZE,
+            ge=1,
+            le=page_setup.PAGE_MAX_SIZE,
+            ),
+        comments: ModerationUOW = Depends(comment_uow),
+        ) -> CommentsPage:
+    """published comments, oldest first.
+    Pass next_cursor from previous page to continue."""
+    try:
+        after = decode_cursor(cursor)
+    except CursorError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    async with comments as comment_provider:
+        storage = comment_provider.storage
+        rows = await storage.get_comments_page(
+                pub_id,
+                limit=size + 1,
+                after=after,
+                )
+        total = await storage.get_comments_count(pub_id)
+    rows, rest = rows[:size], rows[size:]
+    next_cursor = None
+    if rest:
+        next_cursor = encode_cursor(Cursor(rows[-1].creation_dt, rows[-1].uid))
+    return CommentsPage(
+            items=[_comment_item(c) for c in rows],
+            next_cursor=next_cursor,
+            total=total,
+            )
+
+
+@main.get("/{pub_id}/comments/thread")
+async def get_post_thread(
+        pub_id: str,
+        cursor: Optional[str] = None,
+        size: int = Query(
+            default=page_setup.PAGE_SIZE,
+            ge=1,
+            le=page_setup.PAGE_MAX_SIZE,
+            ),
+        comments: ModerationUOW = Depends(comment_uow),
+        ) -> CommentsPage:
+    """published comments in thread order (answers right after
+    parent, use depth for indent). Pass next_cursor to continue."""
+    try:
+        after = decode_path_cursor(cursor)
+    except CursorError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    async with comments as comment_provider:
+        storage = comment_provider.storage
+        rows = await storage.get_thread(pub_id, limit=size + 1, after=after)
+        total = await storage.get_comments_count(pub_id)
+    rows, rest = rows[:size], rows[size:]
+    next_cursor = encode_path_cursor(rows[-1].path) if rest else None
+    return CommentsPage(
+            items=[_comment_item(c) for c in rows],
+            next_cursor=next_cursor,
+            total=total,
+            )
+
+
+@main.get("/{pub_id}/comments/{uid}/replies")
+async def get_comment_replies(
+        pub_id: str,
+        uid: str,
+        size: int = Query(
+            default=page_setup.PAGE_SIZE,
+            ge=1,
+            le=page_setup.PAGE_MAX_SIZE,
+            ),
+        levels: Optional[int] = Query(default=None, ge=1),
+        comments: ModerationUOW = Depends(comment_uow),
+        ) -> list[CommentItem]:
+    """first answers under comment in thread order,
+    levels -> how deep under comment to go (all by default)."""
+    async with comments as comment_provider:
+        storage = comment_provider.storage
+        root = await storage.get_comment(uid)
+        if root is None or root.pub_id != pub_id:
+            raise HTTPException(status_code=404, detail="Not found.")
+        rows = await storage.get_replies(
+                pub_id,
+                root.path,
+                limit=size,
+                max_depth=None if levels is None else root.depth + levels,
+                )
+    return [_comment_item(c) for c in rows]
 
 
 @main.get("/moderation/posts", include_in_schema=False)
@@ -245,24 +560,39 @@ async def get_content_for_moderation(
         pub_id: str,
         rkey: str,
         c_uid: str,
-        redis: CacheEngine = Depends(get_cache_engine),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        posts: ModerationUOW = Depends(mod_uow),
         ) -> dict[str, str]:
-    mcr = redis.get_ht_obj(pub_id)
-    logger.debug(mcr)
-    if mcr is None:
-        raise HTTPException(status_code=404, detail="MCR not found.")
-    mcr = MCR.from_json(mcr["mcr"])
-    if not mcr.mcode_registered(rkey):
+    if not await redis.mcode_registered(pub_id, rkey):
         raise HTTPException(status_code=403, detail="Forbidden.")
-    async with cont_uow as content_provider:
-        storage = content_provider.storage
-        try:
-            content = await storage.get_content_by_id(c_uid)
-            return {rkey: content.body}
-        except Exception as err:
-            logger.error(err)
-            raise HTTPException(status_code=404, detail="Not found.")
-        return None
+    async with posts as post_provider:
+        post = await post_provider.storage.get_post_with_content(pub_id)
+    content = post.by_uid().get(c_uid) if post is not None else None
+    if content is None:
+        raise HTTPException(status_code=404, detail="Not found.")
+    return {rkey: content.body}
+
+
+@main.post("/moderation/posts/batch", include_in_schema=False)
+async def get_contents_for_moderation(
+        request: FetchContentBatch,
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        posts: ModerationUOW = Depends(mod_uow),
+        ) -> dict[str, str]:
+    """return {mcode: body} for all blocks of publication."""
+    mcodes = list(request.blocks)
+    if not await redis.mcodes_registered(request.pub_id, mcodes):
+        raise HTTPException(status_code=403, detail="Forbidden.")
+    async with posts as post_provider:
+        post = await post_provider.storage.get_post_with_content(
+                request.pub_id,
+                )
+    bodies = post.by_uid() if post is not None else {}
+    try:
+        return {m: bodies[c_uid].body for m, c_uid in request.blocks.items()}
+    except KeyError as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Not found.")
 
 
 @main.post("/moderation/posts/set", include_in_schema=False)
@@ -283,3 +613,45 @@ async def set_moderation_result(
     except Exception as err:
         logger.error(err)
         raise HTTPException(status_code=404, detail="Ups! Sth went wrong...")
+
+
+@main.post("/moderation/posts/set/batch", include_in_schema=False)
+async def set_moderation_results(
+        request: SetContentCheckResults,
+        bus: MsgBus = Depends(get_bus),
+        ) -> Response:
+    results = SetModerationResults(
+            mcr_id=request.mcr_id,
+            results=[r.model_dump() for r in request.results],
+            )
+    task = asyncio.create_task(bus.handle(results))
+    try:
+        await asyncio.gather(task)
+        return Response(status_code=200)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Ups! Sth went wrong...")
+
+
+@main.post("/moderation/comments/set", include_in_schema=False)
+async def set_comments_moderation_results(
+        request: SetCommentCheckResults,
+        bus: MsgBus = Depends(get_bus),
+        redis: AsyncCacheEngine = Depends(get_async_cache_engine),
+        ) -> Response:
+    """verdicts only for uids of batch sent with this token."""
+    uids = await redis.comment_batch_uids(request.batch)
+    if not uids:
+        raise HTTPException(status_code=403, detail="Unknown batch.")
+    results = SetCommentResults(
+            results=[
+                r.model_dump() for r in request.results if r.uid in uids
+                ],
+            )
+    try:
+        await bus.handle(results)
+    except Exception as err:
+        logger.error(err)
+        raise HTTPException(status_code=404, detail="Ups! Sth went wrong...")
+    await redis.comment_batch_close(request.batch)
+    return Response(status_code=200)
@@ -0,0 +1,57 @@
+from cache import get_async_cache_engine
+from base_tools.periodic import PeriodicWorker
+from tasks.moderation import moderate_comments
+from base_tools.base_moderation import generate_mcode, McodeSize
+
+
+__all__ = (
+        "CommentBatcher",
+        )
+
+
+class CommentBatcher(PeriodicWorker):
+    """micro-batching of comment moderation: queued comments
+    (cache list) go to worker by batch comments in one task
+    every period_sec. Queue is popped atomically, so several
+    app processes can send at once. Each batch gets secret token,
+    callback is accepted only with it and only for batch uids."""
+
+    _report: str = "{} comments sent to moderation"
+
+    def __init__(
+            self,
+            *,
+            period_sec: float,
+            batch: int,
+            token_ttl_sec: int,
+            ) -> None:
+        super().__init__(period_sec=period_sec)
+        self._batch = batch
+        self._token_ttl = token_ttl_sec
+
+    async def drain(self) -> int:
+        """send all queued comments, return sent count.
+        Failed batch is returned to queue."""
+        redis = get_async_cache_engine()
+        sent = 0
+        while True:
+            taken = await redis.comment_take(self._batch)
+            if not taken:
+                return sent
+            token = generate_mcode(symblos_cnt=McodeSize.MID_32S)
+            try:
+                await redis.comment_batch_open(
+                        token,
+                        [c["uid"] for c in taken],
+                        self._token_ttl,
+                        )
+                moderate_comments.apply_async(
+                        ([[c["uid"], c["body"]] for c in taken], token),
+                        )
+            except Exception:
+                await redis.comment_batch_close(token)
+                await redis.comment_restore(taken)
+                raise
+            sent += len(taken)
+            if len(taken) < self._batch:
+                return sent
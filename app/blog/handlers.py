@@ -4,15 +4,22 @@ from datetime import datetime
 
 from db.base_uow import BaseCmdHandler
 from base_tools.exceptions import HandlerError, ModerationError
-from .storage.models import BlogPost
-from tasks.moderation import fetch_content
+from .storage.models import BlogPost, BlogComment
+from tasks.moderation import fetch_content, moderate_publication
 from base_tools.base_moderation import generate_mcode, McodeSize
+from base_tools.base_moderation import MCRVerdict
 from base_tools.base_content import ContentRoles
+from base_tools.base_content import PostStatus, CommentStatus
+from base_tools.actions import ModerationRes
 from .content_types import TextContent
 from .schemas.response_models import PublicationCreated
 from .schemas.response_models import ContentSchema, set_schema
-from .services import PublicationModerator
-from cache import get_cache_engine
+from .services import PublicationModerator, FeedRanker, ViewCounter
+from cache import get_async_cache_engine
+from cache.redis_cache import HANDOFF_KEY, STAT_LIKE, STAT_DISLIKE
+from settings import HandoffSettings, FeedSettings, PostSettings
+from settings import CommentSettings, ViewSettings
+from base_tools.sys_messages import PostPublished
 from .messages import (
         StartModeration,
         SetModerationResult,
@@ -31,10 +38,34 @@ from .messages import (
         DeleteMCR,
         CheckModerationResult,
         LockContent,
+        ModeratePublication,
+        SetModerationResults,
+        ActivatePost,
+        LikeThisPost,
+        DislikeThisPost,
+        WatchPost,
+        DropPostCache,
+        StartCommentModeration,
+        CommentPost,
+        SetCommentResults,
         )
 
 
 ctime = datetime.now
+handoff_setup = HandoffSettings()
+feed_setup = FeedSettings()
+post_setup = PostSettings()
+comment_setup = CommentSettings()
+view_setup = ViewSettings()
+views = ViewCounter(
+        daily=view_setup.VIEW_DAILY,
+        keep_days=view_setup.VIEW_KEEP_DAYS,
+        )
+ranker = FeedRanker(
+        feed_setup.FEED_TAU_SEC,
+        feed_setup.FEED_EPOCH,
+        excerpt_len=feed_setup.FEED_EXCERPT_LEN,
+        )
 
 h_logger = logging.getLogger(__name__)
 h_logger.setLevel(logging.DEBUG)
@@ -60,10 +91,22 @@ class StartModerationNotifyHandler(BaseCmdHandler):
                 raise HandlerError(err)
             ct = await content.get_all_post_content(cmd.content[0]["c_uid"])
             h_logger.debug(ct)
-            return None
+        if cmd.pub_id:
+            self._uow.fetch_event(DropPostCache(pub_id=cmd.pub_id))
+        return None
+
+
+def _new_text(pub_id: str, role: ContentRoles) -> TextContent:
+    uid = generate_mcode(symblos_cnt=McodeSize.MIN_16S, sortable=True)
+    content = TextContent(uid=uid, pub_id=pub_id, creation_dt=ctime())
+    content.set_role(role)
+    return content
 
 
 class CreateNewPostHandler(BaseCmdHandler):
+    """fast path: post, header and body in one transaction.
+    Else only post is saved and content goes through
+    AddHeaderForPost -> AddBodyForPost -> SaveAllNewPostContent."""
 
     async def handle(self, cmd: CreateNewPost) -> None:
         new_post = BlogPost(
@@ -72,10 +115,15 @@ class CreateNewPostHandler(BaseCmdHandler):
                 title=cmd.title,
                 creation_dt=ctime(),
                 )
+        fast = post_setup.POST_FAST_CREATE
+        content = [
+            _new_text(cmd.uid, ContentRoles.HEADER),
+            _new_text(cmd.uid, ContentRoles.BODY),
+            ] if fast else []
         async with self._uow as operator:
             storage = operator.storage
             try:
-                storage.create_new_post(new_post)
+                await storage.create_post_with_content(new_post, content)
                 await operator.commit()
             except Exception as err:
                 await operator.rollback()
@@ -85,6 +133,8 @@ class CreateNewPostHandler(BaseCmdHandler):
                         f"fetched error from repo: {err}. FAILED\n"
                         )
                 raise HandlerError(msg)
+        if fast:
+            return None
         schema = ContentSchema()
         post_preview = PublicationCreated(
                 uid=cmd.uid,
@@ -102,9 +152,7 @@ class CreateNewPostHandler(BaseCmdHandler):
 class AddHeaderForPostHandler(BaseCmdHandler):
 
     async def handle(self, cmd: AddHeaderForPost) -> None:
-        uid = generate_mcode(symblos_cnt=McodeSize.MIN_16S)
-        header = TextContent(uid=uid, pub_id=cmd.post.uid, creation_dt=ctime())
-        header.set_role(ContentRoles.HEADER)
+        header = _new_text(cmd.post.uid, ContentRoles.HEADER)
         set_schema(cmd.post.content, [header, ])
         next_pipe_cmd = AddBodyForPost(post=cmd.post)
         next_pipe_cmd.content.append(header)
@@ -117,9 +165,7 @@ class AddHeaderForPostHandler(BaseCmdHandler):
 class AddBodyForPostHandler(BaseCmdHandler):
 
     async def handle(self, cmd: AddBodyForPost) -> None:
-        uid = generate_mcode(symblos_cnt=McodeSize.MIN_16S)
-        body = TextContent(uid=uid, pub_id=cmd.post.uid, creation_dt=ctime())
-        body.set_role(ContentRoles.BODY)
+        body = _new_text(cmd.post.uid, ContentRoles.BODY)
         set_schema(cmd.post.content, [body, ])
         next_pipe_cmd = SaveAllNewPostContent(post=cmd.post)
         for c in cmd.content:
@@ -136,9 +182,7 @@ class SaveAllContentHandler(BaseCmdHandler):
 
     async def handle(self, cmd: SaveAllNewPostContent) -> None:
         async with self._uow as operator:
-            await operator.storage.create_many_content_trans(
-                    cont=cmd.content,
-                    )
+            await operator.storage.bulk_insert(cmd.content)
             try:
                 await operator.commit()
             except Exception as err:
@@ -148,12 +192,25 @@ class SaveAllContentHandler(BaseCmdHandler):
         return None
 
 
+class DropPostCacheHandler(BaseCmdHandler):
+    """next editor read rebuilds payload from db."""
+
+    async def handle(self, cmd: DropPostCache) -> None:
+        try:
+            redis = get_async_cache_engine()
+            await redis.drop_post_cache(cmd.pub_id)
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError(err)
+        return None
+
+
 class AddToCacheHandler(BaseCmdHandler):
 
     async def handle(self, cmd: AddToCache) -> None:
         try:
-            redis = get_cache_engine()
-            redis.set_temp_obj(
+            redis = get_async_cache_engine()
+            await redis.set_temp_obj(
                     key=cmd.skey,
                     obj=cmd.obj,
                     exp_sec=600,
@@ -167,13 +224,14 @@ class AddToCacheHandler(BaseCmdHandler):
 class RegisterMCRHandler(BaseCmdHandler):
 
     async def handle(self, cmd: RegisterMCR) -> None:
-        cached = {
-                "mcr": cmd.obj,
-                **cmd.blocks,
-                }
         try:
-            redis = get_cache_engine()
-            redis.set_ht_obj(hkey=cmd.skey, payload=cached)
+            redis = get_async_cache_engine()
+            await redis.register_mcr(
+                    hkey=cmd.skey,
+                    mcr=cmd.obj,
+                    blocks=cmd.blocks,
+                    exp_sec=cmd.exp_sec,
+                    )
         except Exception as err:
             h_logger.error(err)
             raise HandlerError(err)
@@ -183,9 +241,13 @@ class RegisterMCRHandler(BaseCmdHandler):
 class UpdateMCRHandler(BaseCmdHandler):
 
     async def handle(self, cmd: UpdateMCR) -> None:
-        redis = get_cache_engine()
+        redis = get_async_cache_engine()
         try:
-            redis.set_ht_field(hkey=cmd.skey, field="mcr", payload=cmd.obj)
+            await redis.set_ht_field(
+                    hkey=cmd.skey,
+                    field="mcr",
+                    payload=cmd.obj,
+                    )
         except Exception as err:
             h_logger.error(err)
             raise HandlerError(err)
@@ -195,9 +257,9 @@ class UpdateMCRHandler(BaseCmdHandler):
 class DeleteMCRHandler(BaseCmdHandler):
 
     async def handle(self, cmd: DeleteMCR) -> None:
-        redis = get_cache_engine()
+        redis = get_async_cache_engine()
         try:
-            redis.del_ht_obj(hkey=cmd.pub_id)
+            await redis.del_mcr(hkey=cmd.pub_id)
         except Exception as err:
             h_logger.error(err)
             raise HandlerError(err)
@@ -208,41 +270,74 @@ class SetResultToCacheHandler(BaseCmdHandler):
 
     async def handle(self, cmd: SetModerationResult) -> None:
         try:
-            redis = get_cache_engine()
-            redis.set_ht_field(cmd.mcr_id, cmd.block_id, cmd.state)
-            redis.set_temp_obj(cmd.block_id, cmd.report, 600)
+            redis = get_async_cache_engine()
+            verdict, reports = await redis.apply_mcr_result(
+                    cmd.mcr_id,
+                    cmd.block_id,
+                    cmd.state,
+                    cmd.report,
+                    )
         except Exception as err:
             h_logger.error(err)
             raise HandlerError(err)
-        self._uow.fetch_event(
-                CheckModerationResult(
-                    pub_id=cmd.mcr_id,
-                    ),
-                )
+        self._check_verdict(cmd.mcr_id, cmd.block_id, verdict, reports)
+        return None
+
+    def _check_verdict(
+            self,
+            mcr_id: str,
+            block_id: str,
+            verdict: MCRVerdict,
+            reports: list[str],
+            ) -> None:
+        """fetch CheckModerationResult on terminal verdict only."""
+        match verdict:
+            case MCRVerdict.PENDING:
+                return None
+            case MCRVerdict.ACCEPTED | MCRVerdict.REJECTED:
+                self._uow.fetch_event(
+                        CheckModerationResult(
+                            pub_id=mcr_id,
+                            verdict=verdict,
+                            reports=reports,
+                            ),
+                        )
+            case _:
+                h_logger.error(
+                    f"Result for block {block_id} skipped: {verdict}.",
+                    )
+        return None
+
+
+class SetResultsToCacheHandler(SetResultToCacheHandler):
+    """apply batch of block results in one cache trip."""
+
+    async def handle(self, cmd: SetModerationResults) -> None:
+        results = [
+                (r["mcode"], r["state"], r["report"]) for r in cmd.results
+                ]
+        try:
+            redis = get_async_cache_engine()
+            verdicts = await redis.apply_mcr_results(cmd.mcr_id, results)
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError(err)
+        for (mcode, _, _), (verdict, reports) in zip(results, verdicts):
+            self._check_verdict(cmd.mcr_id, mcode, verdict, reports)
         return None
 
 
 class SetPostModerationResHandler(BaseCmdHandler):
 
     async def handle(self, cmd: CheckModerationResult) -> None:
-        """Set block moderation result"""
+        """Set post moderation result by MCR verdict."""
         moderator = PublicationModerator()
-        cache = get_cache_engine()
-        fetched_mcr = cache.get_ht_obj(cmd.pub_id)
-        if fetched_mcr is None:
-            h_logger.error("MCR expired or wasn`t created.")
-            return None
         try:
-            h_logger.debug(fetched_mcr)
-            mcr = await moderator.mcr_from_json(fetched_mcr["mcr"])
-            for k in mcr.blocks:
-                report = cache.get_temp_obj(k)
-                if report:
-                    await moderator.set_mcr(k, fetched_mcr[k], report, mcr)
-            await moderator.set_moderation_result(mcr)
-        except ModerationError as err:
-            h_logger.error(err)
-            raise HandlerError from err
+            await moderator.set_moderation_verdict(
+                    cmd.pub_id,
+                    cmd.verdict,
+                    cmd.reports,
+                    )
         except Exception as exp:
             h_logger.error(exp)
             raise HandlerError from exp
@@ -268,6 +363,8 @@ class UpdateHeaderHandler(BaseCmdHandler):
             except Exception as err:
                 h_logger.error(err)
                 raise HandlerError(err)
+        self._uow.fetch_event(DropPostCache(pub_id=cmd.pub_id))
+        return None
 
 
 class UpdateBodyHandler(BaseCmdHandler):
@@ -287,6 +384,8 @@ class UpdateBodyHandler(BaseCmdHandler):
             except Exception as err:
                 h_logger.error(err)
                 raise HandlerError(err)
+        self._uow.fetch_event(DropPostCache(pub_id=cmd.pub_id))
+        return None
 
 
 class BeginPostModerationHandler(BaseCmdHandler):
@@ -340,6 +439,42 @@ class SendToModerationHandler(BaseCmdHandler):
             raise HandlerError from err
 
 
+class SendPublicationToModerationHandler(BaseCmdHandler):
+    """one moderation task for all blocks of publication.
+    Bodies are handed to worker directly: inline in task
+    payload if small enough, else via short-lived redis key."""
+
+    async def _handoff(self, cmd: ModeratePublication) -> dict:
+        """return task kwargs. Empty -> worker fetch bodies via API."""
+        async with self._uow as operator:
+            items = await operator.storage.get_post_content_by_ids(
+                    cmd.pub_id,
+                    list(cmd.blocks.values()),
+                    )
+        by_uid = {c.uid: c.body for c in items}
+        if not all(c_uid in by_uid for c_uid in cmd.blocks.values()):
+            return {}
+        bodies = {m: by_uid[c_uid] for m, c_uid in cmd.blocks.items()}
+        size = sum(len(b.encode()) for b in bodies.values())
+        if size <= handoff_setup.HANDOFF_INLINE_MAX:
+            return {"bodies": bodies}
+        key = HANDOFF_KEY.format(cmd.pub_id)
+        redis = get_async_cache_engine()
+        await redis.set_handoff(key, bodies, handoff_setup.HANDOFF_TTL_SEC)
+        return {"bodies_key": key}
+
+    async def handle(self, cmd: ModeratePublication) -> None:
+        try:
+            kwargs = {}
+            if handoff_setup.HANDOFF_ENABLED:
+                kwargs = await self._handoff(cmd)
+            moderate_publication.apply_async((cmd.pub_id, cmd.blocks), kwargs)
+            return None
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError from err
+
+
 class ModerationSuccessHandler(BaseCmdHandler):
     """react if PostAccepted event was produced."""
 
@@ -355,6 +490,7 @@ class ModerationSuccessHandler(BaseCmdHandler):
                 h_logger.error(err)
                 await operator.rollback()
                 raise HandlerError from err
+        self._uow.fetch_event(DropPostCache(pub_id=event.pub_id))
         for _ in range(moderator.events):
             self._uow.fetch_event(moderator.dump_event())
         h_logger.debug(self._uow._events)
@@ -376,6 +512,217 @@ class ModerationFailedHandler(BaseCmdHandler):
                 h_logger.error(err)
                 await operator.rollback()
                 raise HandlerError from err
+        self._uow.fetch_event(DropPostCache(pub_id=event.pub_id))
         for _ in range(moderator.events):
             self._uow.fetch_event(moderator.dump_event())
         return None
+
+
+class ActivatePostHandler(BaseCmdHandler):
+    """publish post after successful moderation."""
+
+    async def handle(self, cmd: ActivatePost) -> None:
+        moderator = PublicationModerator()
+        async with self._uow as operator:
+            try:
+                model = await operator.storage.get_post_by_uid(cmd.pub_id)
+                if model is None or model.author_id != cmd.author_id:
+                    raise ModerationError(f"No post {cmd.pub_id} for author.")
+                upd_model = await moderator.activate_publication(model)
+                await operator.storage.update_state(upd_model)
+                await operator.commit()
+            except Exception as err:
+                await operator.rollback()
+                h_logger.error(err)
+                raise HandlerError from err
+        for _ in range(moderator.events):
+            self._uow.fetch_event(moderator.dump_event())
+        return None
+
+
+class AddToFeedHandler(BaseCmdHandler):
+    """put published post with preview to ranked feed."""
+
+    async def handle(self, event: PostPublished) -> None:
+        async with self._uow as operator:
+            items = await operator.storage.get_all_post_content(event.pub_id)
+        header = next(
+                (c.body for c in items if c._role == ContentRoles.HEADER),
+                "",
+                )
+        preview = ranker.preview(
+                event.pub_id,
+                event.author_id,
+                event.title,
+                header,
+                )
+        try:
+            redis = get_async_cache_engine()
+            await redis.feed_add(
+                    event.pub_id,
+                    preview,
+                    ranker.gain(feed_setup.FEED_W_PUBLISH),
+                    feed_setup.FEED_MAX_LEN,
+                    )
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError(err)
+        return None
+
+
+class PostStatHandler(BaseCmdHandler):
+    """write-behind counters for likes, dislikes and watches.
+    Votes are idempotent per user, watches count unique viewers
+    only (hll); feed score follows applied deltas (dislikes are
+    counted but don`t move score). Votes for unknown or not
+    published posts are rejected (no keys, no stat rows for them)."""
+
+    async def _votable(self, pub_id: str) -> bool:
+        redis = get_async_cache_engine()
+        if await redis.feed_listed(pub_id):
+            return True
+        async with self._uow as operator:
+            post = await operator.storage.get_post_by_uid(pub_id)
+        return post is not None and post.state == PostStatus.PUBLISHED
+
+    async def handle(
+            self,
+            cmd: LikeThisPost | DislikeThisPost | WatchPost,
+            ) -> None:
+        redis = get_async_cache_engine()
+        try:
+            if isinstance(cmd, (LikeThisPost, DislikeThisPost)):
+                if not await self._votable(cmd.uid):
+                    raise ModerationError(f"No post {cmd.uid} to vote.")
+            match cmd:
+                case LikeThisPost():
+                    deltas = await redis.stat_vote(
+                            cmd.uid,
+                            cmd.produser,
+                            STAT_LIKE,
+                            )
+                case DislikeThisPost():
+                    deltas = await redis.stat_vote(
+                            cmd.uid,
+                            cmd.produser,
+                            STAT_DISLIKE,
+                            )
+                case WatchPost():
+                    new = await redis.view_add(
+                            cmd.uid,
+                            cmd.viewer,
+                            views.day(),
+                            views.bucket_ttl,
+                            )
+                    deltas = {"watches": int(new)}
+                case _:
+                    return None
+            for counter, delta in deltas.items():
+                if delta == 0:
+                    continue
+                weight = 0.0
+                if delta > 0 and counter == "likes":
+                    weight = feed_setup.FEED_W_LIKE
+                elif delta > 0 and counter == "watches":
+                    weight = feed_setup.FEED_W_VIEW
+                await redis.feed_bump(
+                        cmd.uid,
+                        counter,
+                        delta,
+                        ranker.gain(weight),
+                        )
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError(err)
+        return None
+
+
+class CreateCommentHandler(BaseCmdHandler):
+    """save comment as MODERATION, queue it for moderation batch.
+    Answer is allowed on published comment of the same post only,
+    thread path and depth are set here (not on read)."""
+
+    async def handle(self, cmd: CommentPost) -> None:
+        if not 0 < len(cmd.body) <= comment_setup.COMMENT_MAX_LEN:
+            raise HandlerError(f"Invalid comment size: {len(cmd.body)}.")
+        comment = BlogComment(
+                uid=cmd.uid,
+                pub_id=cmd.pub_id,
+                author_id=cmd.author_id,
+                creation_dt=ctime(),
+                body=cmd.body,
+                parent_id=cmd.parent_id,
+                )
+        async with self._uow as operator:
+            storage = operator.storage
+            try:
+                state = await storage.post_state(cmd.pub_id)
+                if state != PostStatus.PUBLISHED:
+                    raise ModerationError(f"No post {cmd.pub_id} to comment.")
+                parent = None
+                if cmd.parent_id is not None:
+                    parent = await storage.get_comment(cmd.parent_id)
+                    if (
+                            parent is None
+                            or parent.pub_id != cmd.pub_id
+                            or parent.state != CommentStatus.PUBLISHED
+                            ):
+                        raise ModerationError(
+                                f"No comment {cmd.parent_id} to answer.",
+                                )
+                comment.place(parent, comment_setup.COMMENT_MAX_DEPTH)
+                comment.moderate(self._uow.fetch_event)
+                await storage.add_comment(comment)
+                await operator.commit()
+            except Exception as err:
+                await operator.rollback()
+                h_logger.error(err)
+                raise HandlerError from err
+        return None
+
+
+class EnqueueCommentHandler(BaseCmdHandler):
+    """comment waits in cache queue for CommentBatcher."""
+
+    async def handle(self, cmd: StartCommentModeration) -> None:
+        try:
+            redis = get_async_cache_engine()
+            await redis.comment_enqueue(cmd.uid, cmd.pub_id, cmd.body)
+        except Exception as err:
+            h_logger.error(err)
+            raise HandlerError(err)
+        return None
+
+
+class SetCommentResultsHandler(BaseCmdHandler):
+    """apply batch of verdicts: states and comments counters
+    of posts change in one transaction. Repeated verdicts
+    are skipped: state is updated only where comment is still
+    on moderation and counters take only really changed rows
+    (concurrent callbacks of the same batch count once)."""
+
+    async def handle(self, cmd: SetCommentResults) -> None:
+        verdicts = {r["uid"]: r["state"] for r in cmd.results}
+        done: list = []
+        moderated: list[BlogComment] = []
+        async with self._uow as operator:
+            storage = operator.storage
+            try:
+                found = await storage.get_comments_by_ids(list(verdicts))
+                for comment in found:
+                    if comment.state != CommentStatus.MODERATION:
+                        continue
+                    if verdicts[comment.uid] == ModerationRes.ACCEPTED:
+                        comment.accept(done.append)
+                    else:
+                        comment.decline(done.append)
+                    moderated.append(comment)
+                counts = await storage.set_states(moderated)
+                await storage.add_comment_counts(counts)
+                await operator.commit()
+            except Exception as err:
+                await operator.rollback()
+                h_logger.error(err)
+                raise HandlerError from err
+        h_logger.debug(f"{len(done)} comments moderated")
+        return None
@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import Any
+from typing import Optional
 
 from base_tools.base_content import ContentTypes
 from base_tools.base_types import Command, Event
+from base_tools.base_moderation import MCRVerdict
 from .content_types import TextContent
 
 
@@ -23,8 +25,11 @@ class SetModerationResult(Command):
 
 
 class CheckModerationResult(Command):
-    """check results stored in cache after moderation."""
+    """check results stored in cache after moderation.
+    verdict -> returned by cache after result was applied."""
     pub_id: str
+    verdict: MCRVerdict = MCRVerdict.PENDING
+    reports: list[str] = []
 
 
 class ModerationFailed(Event):
@@ -49,10 +54,12 @@ class CommentDeleted(Event):
 class StartCommentModeration(Command):
     """send current comment to moderation.
     pub_id: publication id;
-    uid: unique comment id.
+    uid: unique comment id;
+    body: comment text (goes to moderation batch).
     """
     pub_id: str
     uid: str
+    body: str = ""
 
 
 class CommentPublished(Event):
@@ -131,6 +138,7 @@ class RegisterMCR(Command):
     skey: str
     obj: str
     blocks: dict
+    exp_sec: int = 3600
 
 
 class UpdateMCR(Command):
@@ -149,6 +157,12 @@ class DeleteMCR(Command):
 class LockContent(Command):
     """lock moderated content on editing."""
     content: list[dict]
+    pub_id: str = ""
+
+
+class DropPostCache(Command):
+    """invalidate cached editor payload after post changed."""
+    pub_id: str
 
 
 class ModerateContent(Command):
@@ -158,3 +172,57 @@ class ModerateContent(Command):
     uid: str
     mcode: str
     pub_id: str
+
+
+class ModeratePublication(Command):
+    """send all content-blocks of publication to moderation
+    in one task.
+    :blocks: {mcode: content id in DB}."""
+    pub_id: str
+    blocks: dict[str, str]
+
+
+class ActivatePost(Command):
+    """publish accepted post."""
+    pub_id: str
+    author_id: str
+
+
+class LikeThisPost(Command):
+    """:produser: user who liked."""
+    uid: str
+    produser: str
+
+
+class DislikeThisPost(Command):
+    uid: str
+    produser: str
+
+
+class WatchPost(Command):
+    """post was opened.
+    :viewer: user id or guest digest (unique viewers)."""
+    uid: str
+    viewer: str
+
+
+class SetModerationResults(Command):
+    """fix batch of block results in MCR.
+    :results: [{"mcode": .., "state": .., "report": ..}, ]."""
+    mcr_id: str
+    results: list[dict[str, str]]
+
+
+class CommentPost(Command):
+    """new comment (parent_id -> answer on comment)."""
+    uid: str
+    pub_id: str
+    author_id: str
+    body: str
+    parent_id: Optional[str] = None
+
+
+class SetCommentResults(Command):
+    """verdicts of comment moderation batch.
+    :results: [{"uid": .., "state": .., "report": ..}, ]."""
+    results: list[dict[str, str]]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -32,3 +33,43 @@ class SetContentCheckResult(BaseModel):
     mcode: str
     state: str
     report: str
+
+
+class FetchContentBatch(BaseModel):
+    """fetch bodies of all moderated blocks.
+    blocks -> {mcode: content uid}."""
+    pub_id: str
+    blocks: dict[str, str]
+
+
+class ContentCheckResult(BaseModel):
+    """moderation result for one content block."""
+    mcode: str
+    state: str
+    report: str
+
+
+class SetContentCheckResults(BaseModel):
+    """set moderation results for all blocks of publication."""
+    mcr_id: str
+    results: list[ContentCheckResult]
+
+
+class NewCommentRequest(BaseModel):
+    """comment post or answer on comment (parent_id)."""
+    body: str
+    parent_id: Optional[str] = None
+
+
+class CommentCheckResult(BaseModel):
+    """moderation result for one comment."""
+    uid: str
+    state: str
+    report: str
+
+
+class SetCommentCheckResults(BaseModel):
+    """set moderation results for batch of comments.
+    batch -> secret token given to worker with the batch."""
+    batch: str
+    results: list[CommentCheckResult]
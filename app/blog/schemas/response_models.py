@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Any
 from typing import List
 from typing import TypeVar
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -66,8 +67,43 @@ class PublicationCreated(BaseModel):
 class PublicatedPost(BaseModel):
     pub_id: str
     author_id: str
-    my_grade: str  # LIKE / DISLIKE
+    my_grade: str  # like / dislike, "" -> no grade or guest
     tags: list[str] = []
     pub_dt: datetime
     content: PublicatedContent
     stat: PublicationStat
+
+
+class PostsPage(BaseModel):
+    """keyset page. next_cursor is None on last page."""
+    items: list[PublicatedPost]
+    next_cursor: Optional[str] = None
+
+
+class CommentItem(BaseModel):
+    uid: str
+    author_id: str
+    parent_id: Optional[str] = None
+    depth: int = 0
+    body: str
+    pub_dt: datetime
+
+
+class CommentsPage(BaseModel):
+    """keyset page of comments, oldest first.
+    total is denormalized counter (no COUNT(*) on read)."""
+    items: list[CommentItem]
+    next_cursor: Optional[str] = None
+    total: int = 0
+
+
+class FeedPreview(BaseModel):
+    """compact post preview on main page."""
+    pub_id: str
+    author_id: str
+    title: str
+    excerpt: str
+    pub_dt: datetime
+    likes: int = 0
+    dislikes: int = 0
+    watches: int = 0
@@ -1,19 +1,23 @@
+import math
+import time
 from collections import deque
+from hashlib import blake2b
 from typing import TypeVar
 from typing import TypeAlias
 from typing import cast
 from typing import Optional
 from typing import Callable
-from datetime import datetime
+from typing import Any
+from datetime import datetime, timedelta, timezone
 
 from base_tools.exceptions import ModerationError, PublicationError
 from base_tools.base_content import BasePublication, ContentTypes
 from base_tools.base_moderation import _ContentBlock, ModerationControlRecord
-from base_tools.base_moderation import generate_mcode
+from base_tools.base_moderation import generate_mcode, MCRVerdict
 from base_tools.actions import ModerationRes
 from base_tools.base_types import SysMsgT
 from .messages import ModerationFailed, ModerationDoneSuccess, LockContent
-from .messages import ModerateContent, RegisterMCR, DeleteMCR, UpdateMCR
+from .messages import ModeratePublication, RegisterMCR, DeleteMCR, UpdateMCR
 from .content_types import TextBlock
 from base_tools.actions import JSONFmt
 
@@ -82,6 +86,26 @@ class PublicationModerator:
             self._events.append(upd)
         return None
 
+    async def set_moderation_verdict(
+            self,
+            pub_id: str,
+            verdict: MCRVerdict,
+            reports: list[str],
+            ) -> None:
+        """parse verdict returned by cache-side MCR.
+        Terminal verdict comes once, so events are raised once."""
+        match verdict:
+            case MCRVerdict.ACCEPTED:
+                self._events.append(ModerationDoneSuccess(pub_id=pub_id))
+            case MCRVerdict.REJECTED:
+                self._events.append(
+                    ModerationFailed(pub_id=pub_id, reasons=reports),
+                    )
+            case _:
+                return None
+        self._events.append(DeleteMCR(pub_id=pub_id))
+        return None
+
     async def set_mcr(
             self,
             mcode: str,
@@ -119,9 +143,11 @@ class PublicationModerator:
                 skey=mcr.pub_id,
                 obj=mcr.to_json(),
                 blocks=mcr.blocks,
+                exp_sec=mcr.exp_after_sec,
                 )
         to_lock = LockContent(
                 content=[{"c_uid": k.uid, "lock": 1} for k in self._blocks],
+                pub_id=pub_id,
                 )
         for c in (cmd, to_lock):
             self._events.append(c)
@@ -132,7 +158,9 @@ class PublicationModerator:
             pub_id: str,
             blocks: dict[str, ContentTypes],
             ) -> None:
-        """create ContentBlocks from blocks = {uid: kind}."""
+        """create ContentBlocks from blocks = {uid: kind}.
+        All blocks go to moderation in one batch."""
+        to_moderate: dict[str, str] = {}
         for b_uid, kind in blocks.items():
             match kind:
                 case ContentTypes.TEXT:
@@ -142,14 +170,13 @@ class PublicationModerator:
                             pub_id=pub_id,
                         )
                     self._blocks.append(block)
-                    cmd = ModerateContent(
-                            uid=b_uid,
-                            mcode=block.mcode,
-                            pub_id=pub_id,
-                            )
-                    self._events.append(cmd)
+                    to_moderate[block.mcode] = b_uid
                 case _:
                     pass
+        if to_moderate:
+            self._events.append(
+                ModeratePublication(pub_id=pub_id, blocks=to_moderate),
+                )
         return None
 
     async def set_on_moderation(
@@ -177,6 +204,17 @@ class PublicationModerator:
         except PublicationError as err:
             raise ModerationError(err)
 
+    async def activate_publication(
+            self,
+            model: PubCV,
+            ) -> PubVT:
+        """Model raised PostPublished. Return Model back."""
+        try:
+            model.activate(self._grab_events())
+            return cast(PubVT, model)
+        except PublicationError as err:
+            raise ModerationError(err)
+
     async def reject_publication(
             self,
             model: PubCV,
@@ -191,3 +229,98 @@ class PublicationModerator:
             return cast(PubVT, model)
         except PublicationError as err:
             raise ModerationError(err)
+
+
+class FeedRanker:
+    """time-decayed popularity kept in log-space:
+    score = log(sum(w * e^((t - epoch) / tau))).
+    Each event adds log(w) + (t - epoch) / tau, so old
+    scores never need re-decay and never overflow."""
+
+    def __init__(
+            self,
+            tau_sec: float,
+            epoch: int,
+            *,
+            excerpt_len: int = 160,
+            ) -> None:
+        self._tau = tau_sec
+        self._epoch = epoch
+        self._excerpt_len = excerpt_len
+
+    def gain(
+            self,
+            weight: float,
+            *,
+            at: Optional[float] = None,
+            ) -> Optional[float]:
+        """None -> event doesn`t move score (zero weight)."""
+        if weight <= 0:
+            return None
+        ts = time.time() if at is None else at
+        return math.log(weight) + (ts - self._epoch) / self._tau
+
+    def preview(
+            self,
+            pub_id: str,
+            author_id: str,
+            title: str,
+            header: str,
+            ) -> dict[str, Any]:
+        """compact preview record stored beside score."""
+        excerpt = header[:self._excerpt_len]
+        if len(header) > self._excerpt_len:
+            excerpt = excerpt.rstrip() + "..."
+        return {
+            "pub_id": pub_id,
+            "author_id": author_id,
+            "title": title,
+            "excerpt": excerpt,
+            "pub_dt": datetime.utcnow().isoformat(),
+            "likes": 0,
+            "dislikes": 0,
+            "watches": 0,
+            }
+
+
+class ViewCounter:
+    """unique viewers of post in cache HyperLogLog: constant
+    memory per post (<= 12kB), ~0.8% error. Optional per-day
+    (utc) buckets are merged on read for windowed counts."""
+
+    DAY_SEC: int = 86400
+
+    def __init__(self, *, daily: bool, keep_days: int) -> None:
+        self._daily = daily
+        self._keep_days = keep_days
+
+    @property
+    def keep_days(self) -> int:
+        return self._keep_days if self._daily else 0
+
+    @property
+    def bucket_ttl(self) -> int:
+        """0 -> no day buckets."""
+        return self.keep_days * self.DAY_SEC
+
+    @staticmethod
+    def viewer(uid: Optional[str], host: str, agent: str) -> str:
+        """user id or digest of guest address + agent."""
+        if uid:
+            return f"u:{uid}"
+        digest = blake2b(f"{host}|{agent}".encode(), digest_size=8)
+        return f"g:{digest.hexdigest()}"
+
+    @staticmethod
+    def day(at: Optional[float] = None) -> str:
+        ts = time.time() if at is None else at
+        return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d")
+
+    def window(self, days: int, at: Optional[float] = None) -> list[str]:
+        """day buckets of last days (today included)."""
+        ts = time.time() if at is None else at
+        today = datetime.fromtimestamp(ts, timezone.utc)
+        return [
+            (today - timedelta(days=d)).strftime("%Y%m%d")
+            for d in range(min(days, self.keep_days))
+            ]
@@ -0,0 +1,47 @@
+from db.base_uow import UOWFactory
+from cache import get_async_cache_engine
+from base_tools.periodic import PeriodicWorker
+
+
+__all__ = (
+        "StatFlusher",
+        )
+
+
+class StatFlusher(PeriodicWorker):
+    """write-behind for post counters: move pending deltas
+    from cache to db every period_sec. Dirty posts are popped
+    atomically, so several app processes can flush at once."""
+
+    _report: str = "flushed counters of {} posts"
+
+    def __init__(
+            self,
+            uow: UOWFactory,
+            *,
+            period_sec: float,
+            batch: int,
+            ) -> None:
+        super().__init__(period_sec=period_sec)
+        self._uow_fct = uow
+        self._batch = batch
+
+    async def drain(self) -> int:
+        """flush all pending deltas, return flushed posts count.
+        Failed batch is returned to cache."""
+        redis = get_async_cache_engine()
+        flushed = 0
+        while True:
+            taken = await redis.stat_take(self._batch)
+            if not taken:
+                return flushed
+            try:
+                async with self._uow_fct() as operator:
+                    await operator.storage.add_deltas(taken)
+                    await operator.commit()
+            except Exception:
+                await redis.stat_restore(taken)
+                raise
+            flushed += len(taken)
+            if len(taken) < self._batch:
+                return flushed
@@ -23,6 +23,10 @@ from base_tools.sys_messages import (
         )
 
 
+# width of one path segment (comment uid size)
+COMMENT_PATH_SEG: int = 16
+
+
 h_logger = logging.getLogger(__name__)
 h_logger.setLevel(logging.DEBUG)
 str_handler = logging.StreamHandler()
@@ -123,7 +127,13 @@ class BlogPost(BasePublication):
         if self._state == self._fsm.ACCEPTED:
             self._state = self._fsm.PUBLISHED
             if act_dt_interval is None:
-                callback(PostPublished(pub_id=self.uid))
+                callback(
+                    PostPublished(
+                        pub_id=self.uid,
+                        author_id=self.author_id,
+                        title=self.title,
+                        ),
+                    )
             else:
                 callback(
                     ActivateLater(pub_id=self.uid, delay_dt=act_dt_interval),
@@ -133,7 +143,8 @@ class BlogPost(BasePublication):
 
 
 class BlogComment(BasePublication):
-    """not copied to repo."""
+    """comment on post, parent_id set -> answer on comment.
+    Mapped by CommentsRepository."""
 
     _fsm: CommentStatus = CommentStatus
 
@@ -144,6 +155,8 @@ class BlogComment(BasePublication):
             author_id: str,
             creation_dt: IntervalT,
             *,
+            body: str = "",
+            parent_id: Optional[str] = None,
             state: Optional[CommentStatus] = None,
             ) -> None:
         """set model from ORM model."""
@@ -152,6 +165,25 @@ class BlogComment(BasePublication):
         self.pub_id = pub_id
         self.author_id = author_id
         self.creation_dt = creation_dt
+        self.body = body
+        self.parent_id = parent_id
+        self.path = uid
+        self.depth = 0
+
+    def place(self, parent: Optional["BlogComment"], max_depth: int) -> None:
+        """set thread path and depth under parent. Answers deeper
+        than max_depth become siblings of parent (parent_id kept)."""
+        if len(self.uid) != COMMENT_PATH_SEG:
+            raise PublicationError(f"Invalid comment uid: {self.uid}.")
+        if parent is None:
+            self.path, self.depth = self.uid, 0
+            return None
+        if parent.depth + 1 < max_depth:
+            self.path, self.depth = parent.path + self.uid, parent.depth + 1
+            return None
+        self.path = parent.path[:-COMMENT_PATH_SEG] + self.uid
+        self.depth = parent.depth
+        return None
 
     def remove(self, callback: Callable[[SysMsgT], None]) -> None:
         """remove current publication."""
@@ -160,6 +192,7 @@ class BlogComment(BasePublication):
             callback(
                     CommentDeleted(pub_id=self.pub_id, uid=self.uid),
                 )
+            return None
         raise Exception("Can`t remove comment")
 
     def moderate(self, callback: Callable[[SysMsgT], None]) -> None:
@@ -167,7 +200,11 @@ class BlogComment(BasePublication):
         if self._state == self._fsm.DRAFT:
             self._state = self._fsm.MODERATION
             callback(
-                    StartCommentModeration(pub_id=self.pub_id, uid=self.uid),
+                    StartCommentModeration(
+                        pub_id=self.pub_id,
+                        uid=self.uid,
+                        body=self.body,
+                        ),
                 )
             return None
         raise Exception(f"Can`t moderate comment with state: {self._state}")
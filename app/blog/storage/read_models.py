@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from base_tools.base_content import ContentRoles, PostStatus
+
+
+__all__ = (
+        "ContentView",
+        "PostView",
+        )
+
+
+@dataclass(frozen=True)
+class ContentView:
+    """read-only content row (same attrs set_schema reads)."""
+    uid: str
+    body: str
+    locked: int
+    _kind: str
+    _role: str
+
+
+@dataclass
+class PostView:
+    """publication with all content and counters,
+    loaded by one joined query."""
+    uid: str
+    author_id: str
+    title: str
+    creation_dt: datetime
+    state: PostStatus
+    likes: int = 0
+    dislikes: int = 0
+    watches: int = 0
+    comments: int = 0
+    content: list[ContentView] = field(default_factory=list)
+
+    def by_role(self, role: ContentRoles) -> Optional[ContentView]:
+        for c in self.content:
+            if c._role == role:
+                return c
+        return None
+
+    def by_uid(self) -> dict[str, ContentView]:
+        return {c.uid: c for c in self.content}
@@ -1,18 +1,32 @@
 import logging
 from typing import TypeVar
 from typing import Type
+from typing import Any
+from typing import Optional
 
 from sqlalchemy import Table
-from sqlalchemy import update, select
+from sqlalchemy import update, select, insert, func, tuple_, and_
+from sqlalchemy.sql import Select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.sql.expression import bindparam
 
 from db.base_repositories import BaseRepository, RepoState
-from base_tools.base_content import PostStatus
-from .models import BlogPost
+from base_tools.base_content import PostStatus, ContentRoles
+from base_tools.base_content import CommentStatus
+from base_tools.pagination import Cursor
+from db.stat_tables import publication_stats
+from base_tools.base_types import _PublicationStatistic
+from db.comment_tables import comments as comments_table
+from .models import BlogPost, BlogComment
+from .read_models import PostView, ContentView
 from ..content_types import TextContent
 
 
 StatusT = TypeVar("StatusT", PostStatus, str)
+# upper bound of subtree range: above any symbol of comment uid
+PATH_END: str = "~"
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +37,15 @@ str_handler.setFormatter(formatter)
 logger.addHandler(str_handler)
 
 
+def _upsert_insert(session: Any, table: Table) -> Any:
+    """insert with on_conflict_do_update of session dialect."""
+    match session.bind.dialect.name:
+        case "sqlite":
+            return sqlite.insert(table)
+        case _:
+            return postgresql.insert(table)
+
+
 class PostsRepository(BaseRepository):
 
     _model: Type[BlogPost] = BlogPost
@@ -49,7 +72,7 @@ class PostsRepository(BaseRepository):
             .values(_state=model.state)
             .execution_options(syncronize_session=False)
             )
-        self._session.execute(upd_state)
+        await self._execute(upd_state)
         return None
 
     async def update_title(self, pub_id: str, title: str) -> None:
@@ -60,7 +83,7 @@ class PostsRepository(BaseRepository):
             .values(title=title)
             .execution_options(syncronize_session=False)
             )
-        self._session.execute(upd_title)
+        await self._execute(upd_title)
         return None
 
     async def get_post_by_uid(self, pub_id: str) -> BlogPost:
@@ -69,33 +92,171 @@ class PostsRepository(BaseRepository):
                 select(BlogPost)
                 .where(BlogPost.uid == pub_id)
                 )
-        return self._session.execute(post).scalar()
+        return (await self._execute(post)).scalar()
 
-    async def get_all_posts_by_author(self, auth_id: str) -> list[BlogPost]:
+    async def get_post_with_content(self, pub_id: str) -> Optional[PostView]:
+        """post + all its content + counters in one joined query
+        (one connection, one round-trip). None -> no post."""
         self._check_session_attached()
-        posts = (
-            select(BlogPost)
-            .where(BlogPost.author_id == auth_id)
+        stat = publication_stats.c
+        post = (
+            select(
+                BlogPost.uid,
+                BlogPost.author_id,
+                BlogPost.title,
+                BlogPost.creation_dt,
+                BlogPost._state,
+                func.coalesce(stat.likes, 0).label("likes"),
+                func.coalesce(stat.dislikes, 0).label("dislikes"),
+                func.coalesce(stat.watches, 0).label("watches"),
+                func.coalesce(stat.comments, 0).label("comments"),
+                TextContent.uid.label("c_uid"),
+                TextContent.body,
+                TextContent.locked,
+                TextContent._kind,
+                TextContent._role,
+                )
+            .outerjoin(TextContent, TextContent.pub_id == BlogPost.uid)
+            .outerjoin(
+                publication_stats,
+                publication_stats.c.pub_id == BlogPost.uid,
+                )
+            .where(BlogPost.uid == pub_id)
+            .order_by(TextContent.creation_dt)
+            )
+        rows = (await self._execute(post)).all()
+        if not rows:
+            return None
+        head = rows[0]
+        return PostView(
+                uid=head.uid,
+                author_id=head.author_id,
+                title=head.title,
+                creation_dt=head.creation_dt,
+                state=PostStatus(int(head._state)),
+                likes=head.likes,
+                dislikes=head.dislikes,
+                watches=head.watches,
+                comments=head.comments,
+                content=[
+                    ContentView(
+                        uid=r.c_uid,
+                        body=r.body,
+                        locked=r.locked,
+                        _kind=r._kind,
+                        _role=r._role,
+                        )
+                    for r in rows if r.c_uid is not None
+                    ],
+                )
+
+    @staticmethod
+    def _keyset(
+            stmt: Select,
+            after: Optional[Cursor],
+            limit: Optional[int],
+            ) -> Select:
+        """newest first, page starts right after cursor.
+        Served by ix_publications_author_*_dt_uid (db.indexes)."""
+        if after is not None:
+            stmt = stmt.where(
+                    tuple_(BlogPost.creation_dt, BlogPost.uid)
+                    < tuple_(after.creation_dt, after.uid),
+                    )
+        stmt = stmt.order_by(BlogPost.creation_dt.desc(), BlogPost.uid.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    async def get_all_posts_by_author(
+            self,
+            auth_id: str,
+            *,
+            limit: Optional[int] = None,
+            after: Optional[Cursor] = None,
+            ) -> list[BlogPost]:
+        self._check_session_attached()
+        posts = self._keyset(
+            select(BlogPost).where(BlogPost.author_id == auth_id),
+            after,
+            limit,
             )
         # scalars -> we will get python classes.
-        posts_items = self._session.execute(posts).scalars().all()
+        posts_items = (await self._execute(posts)).scalars().all()
         return posts_items
 
     async def get_posts_by_author_with_state(
             self,
             author_id: str,
             state: str,
+            *,
+            limit: Optional[int] = None,
+            after: Optional[Cursor] = None,
             ) -> list[BlogPost]:
-        """return all author`s posts by wished state."""
+        """return author`s posts by wished state (page if limit set)."""
         self._check_session_attached()
-        posts = (
+        posts = self._keyset(
             select(BlogPost)
-            .where(BlogPost.author_id == author_id, BlogPost._state == state)
+            .where(BlogPost.author_id == author_id, BlogPost._state == state),
+            after,
+            limit,
             )
         # scalars -> we will get python classes.
-        posts_items = self._session.execute(posts).scalars().all()
+        posts_items = (await self._execute(posts)).scalars().all()
         return posts_items
 
+    async def get_published_page(
+            self,
+            author_id: str,
+            *,
+            limit: int,
+            after: Optional[Cursor] = None,
+            ) -> list[Row]:
+        """page of published posts with header, body and counters
+        in one joined query (plain rows, no ORM objects)."""
+        self._check_session_attached()
+        header = aliased(TextContent)
+        body = aliased(TextContent)
+        stat = publication_stats.c
+        posts = self._keyset(
+            select(
+                BlogPost.uid,
+                BlogPost.author_id,
+                BlogPost.creation_dt,
+                header.body.label("header"),
+                body.body.label("body"),
+                func.coalesce(stat.likes, 0).label("likes"),
+                func.coalesce(stat.dislikes, 0).label("dislikes"),
+                func.coalesce(stat.watches, 0).label("watches"),
+                func.coalesce(stat.comments, 0).label("comments"),
+                )
+            .outerjoin(
+                header,
+                and_(
+                    header.pub_id == BlogPost.uid,
+                    header._role == ContentRoles.HEADER.value,
+                    ),
+                )
+            .outerjoin(
+                body,
+                and_(
+                    body.pub_id == BlogPost.uid,
+                    body._role == ContentRoles.BODY.value,
+                    ),
+                )
+            .outerjoin(
+                publication_stats,
+                publication_stats.c.pub_id == BlogPost.uid,
+                )
+            .where(
+                BlogPost.author_id == author_id,
+                BlogPost._state == PostStatus.PUBLISHED,
+                ),
+            after,
+            limit,
+            )
+        return (await self._execute(posts)).all()
+
 
 class ContentRepository(BaseRepository):
 
@@ -115,11 +276,45 @@ class ContentRepository(BaseRepository):
         self._session.add(content)
         return None
 
-    async def create_many_content_trans(self, cont: list[TextContent]) -> None:
+    async def bulk_insert(self, cont: list[TextContent]) -> None:
+        """all rows in one multi-row INSERT (no per-object flush)."""
         self._check_session_attached()
-        self._session.begin()
-        for content in cont:
-            self._session.add(content)
+        if not cont:
+            return None
+        await self._begin()
+        rows = insert(TextContent).values([
+            {
+                "uid": c.uid,
+                "pub_id": c.pub_id,
+                "creation_dt": c.creation_dt,
+                "body": c.body,
+                "locked": c.locked,
+                "_kind": c._kind,
+                "_role": c._role,
+                }
+            for c in cont
+            ])
+        await self._execute(rows)
+        return None
+
+    async def create_post_with_content(
+            self,
+            post: BlogPost,
+            cont: list[TextContent],
+            ) -> None:
+        """new post and its content in current transaction:
+        one INSERT for post, one multi-row INSERT for content."""
+        self._check_session_attached()
+        await self._begin()
+        new_post = insert(BlogPost).values(
+                uid=post.uid,
+                author_id=post.author_id,
+                title=post.title,
+                creation_dt=post.creation_dt,
+                _state=post.state,
+                )
+        await self._execute(new_post)
+        await self.bulk_insert(cont)
         return None
 
     async def get_content_by_id(self, content_uid: str) -> TextContent:
@@ -128,31 +323,47 @@ class ContentRepository(BaseRepository):
                 select(TextContent)
                 .where(TextContent.uid == content_uid)
                 )
-        return self._session.execute(content).scalar()
+        return (await self._execute(content)).scalar()
+
+    async def get_post_content_by_ids(
+            self,
+            pub_id: str,
+            content_uids: list[str],
+            ) -> list[TextContent]:
+        """load selected content of one post in one query."""
+        self._check_session_attached()
+        content = (
+                select(TextContent)
+                .where(
+                    TextContent.pub_id == pub_id,
+                    TextContent.uid.in_(content_uids),
+                    )
+                )
+        return (await self._execute(content)).scalars().all()
 
     async def lock(self, to_lock: dict) -> None:
         """lock content for editing after moderation started."""
         self._check_session_attached()
-        self._session.begin()
+        await self._begin()
         locked = (
                 update(TextContent)
                 .where(TextContent.uid == bindparam("c_uid"))
                 .values(locked=bindparam("lock"))
                 )
-        self._session.execute(locked, to_lock)
+        await self._execute(locked, to_lock)
         logger.debug(locked)
         return None
 
     async def release_lock(self, to_unlock: dict) -> None:
         """release lock in need to rollback content to draft."""
         self._check_session_attached()
-        self._session.begin()
+        await self._begin()
         unlocked = (
                 update(TextContent)
                 .where(TextContent.uid == bindparam("c_uid"))
                 .values(locked=bindparam("unlock"))
                 )
-        self._session.execute(unlocked, to_unlock)
+        await self._execute(unlocked, to_unlock)
         logger.debug(unlocked)
         return None
 
@@ -162,13 +373,15 @@ class ContentRepository(BaseRepository):
             update(TextContent)
             .where(
                 TextContent.uid == uid,
+                # cache is dropped by pub_id, so it has to be the owner
+                TextContent.pub_id == pub_id,
                 TextContent.locked == 0,
                 )
             .values(body=body)
             .execution_options(syncronize_session=False)
             )
         logger.debug(upd_body)
-        self._session.execute(upd_body)
+        await self._execute(upd_body)
         return None
 
     async def get_all_post_content(self, pub_id: str) -> list[TextContent]:
@@ -177,5 +390,244 @@ class ContentRepository(BaseRepository):
                 select(TextContent)
                 .where(TextContent.pub_id == pub_id)
                 )
-        content_items = self._session.execute(all_content).scalars().all()
+        content_items = (await self._execute(all_content)).scalars().all()
         return content_items
+
+
+class StatsRepository(BaseRepository):
+    """persisted part of post counters."""
+
+    _model: Type[_PublicationStatistic] = _PublicationStatistic
+    _state: RepoState = RepoState.NOTSET
+    _counters: tuple[str, ...] = ("likes", "dislikes", "watches")
+
+    def __init__(
+            self,
+            table: Table,
+            *,
+            run_test: bool = False,
+            ) -> None:
+        super().__init__(table, run_test=run_test)
+        self._table = table
+
+    def _insert(self) -> Any:
+        return _upsert_insert(self._session, self._table)
+
+    async def add_deltas(self, deltas: dict[str, dict[str, int]]) -> None:
+        """upsert counters += deltas for batch of posts (executemany).
+        Sorted by pub_id, so concurrent flushers lock rows in one order."""
+        self._check_session_attached()
+        if not deltas:
+            return None
+        await self._begin()
+        rows = [
+            {"pub_id": pub_id, **{c: d.get(c, 0) for c in self._counters}}
+            for pub_id, d in sorted(deltas.items())
+            ]
+        ins = self._insert()
+        upsert = ins.on_conflict_do_update(
+                index_elements=["pub_id"],
+                set_={
+                    **{
+                        c: self._table.c[c] + ins.excluded[c]
+                        for c in self._counters
+                        },
+                    "upd_dt": func.now(),
+                    },
+                )
+        await self._execute(upsert, rows)
+        return None
+
+    async def get_stat(self, pub_id: str) -> Optional[_PublicationStatistic]:
+        self._check_session_attached()
+        stat = (
+                select(_PublicationStatistic)
+                .where(_PublicationStatistic.pub_id == pub_id)
+                )
+        return (await self._execute(stat)).scalar()
+
+
+class CommentsRepository(BaseRepository):
+    """threaded comments + denormalized comments counter
+    (publication_stats.comments), changed in one transaction."""
+
+    _model: Type[BlogComment] = BlogComment
+    _state: RepoState = RepoState.NOTSET
+
+    def __init__(
+            self,
+            table: Table,
+            *,
+            run_test: bool = False,
+            ) -> None:
+        super().__init__(table, run_test=run_test)
+
+    async def add_comment(self, comment: BlogComment) -> None:
+        self._check_session_attached()
+        self._session.add(comment)
+        return None
+
+    async def post_state(self, pub_id: str) -> Optional[PostStatus]:
+        self._check_session_attached()
+        state = (
+                select(BlogPost._state)
+                .where(BlogPost.uid == pub_id)
+                )
+        found = (await self._execute(state)).scalar()
+        return None if found is None else PostStatus(int(found))
+
+    async def get_comment(self, uid: str) -> Optional[BlogComment]:
+        self._check_session_attached()
+        comment = (
+                select(BlogComment)
+                .where(BlogComment.uid == uid)
+                )
+        return (await self._execute(comment)).scalar()
+
+    async def get_comments_by_ids(self, uids: list[str]) -> list[BlogComment]:
+        self._check_session_attached()
+        found = (
+                select(BlogComment)
+                .where(BlogComment.uid.in_(uids))
+                )
+        return (await self._execute(found)).scalars().all()
+
+    async def get_comments_page(
+            self,
+            pub_id: str,
+            *,
+            limit: int,
+            after: Optional[Cursor] = None,
+            ) -> list[BlogComment]:
+        """published comments, oldest first, page starts right
+        after cursor. Served by ix_comments_pub_state_dt_uid."""
+        self._check_session_attached()
+        page = (
+                select(BlogComment)
+                .where(
+                    BlogComment.pub_id == pub_id,
+                    BlogComment._state == CommentStatus.PUBLISHED,
+                    )
+                )
+        if after is not None:
+            page = page.where(
+                    tuple_(BlogComment.creation_dt, BlogComment.uid)
+                    > tuple_(after.creation_dt, after.uid),
+                    )
+        page = (
+                page
+                .order_by(BlogComment.creation_dt, BlogComment.uid)
+                .limit(limit)
+                )
+        return (await self._execute(page)).scalars().all()
+
+    async def get_thread(
+            self,
+            pub_id: str,
+            *,
+            limit: int,
+            after: Optional[str] = None,
+            ) -> list[BlogComment]:
+        """published comments of post in thread order,
+        page starts right after path. Served by ix_comments_pub_path."""
+        self._check_session_attached()
+        thread = (
+                select(BlogComment)
+                .where(
+                    BlogComment.pub_id == pub_id,
+                    BlogComment._state == CommentStatus.PUBLISHED,
+                    )
+                )
+        if after is not None:
+            thread = thread.where(BlogComment.path > after)
+        thread = thread.order_by(BlogComment.path).limit(limit)
+        return (await self._execute(thread)).scalars().all()
+
+    async def get_replies(
+            self,
+            pub_id: str,
+            path: str,
+            *,
+            limit: int,
+            max_depth: Optional[int] = None,
+            ) -> list[BlogComment]:
+        """first published answers under comment with path, in thread
+        order: one range scan (path, path + PATH_END)."""
+        self._check_session_attached()
+        replies = (
+                select(BlogComment)
+                .where(
+                    BlogComment.pub_id == pub_id,
+                    BlogComment.path > path,
+                    BlogComment.path < path + PATH_END,
+                    BlogComment._state == CommentStatus.PUBLISHED,
+                    )
+                )
+        if max_depth is not None:
+            replies = replies.where(BlogComment.depth <= max_depth)
+        replies = replies.order_by(BlogComment.path).limit(limit)
+        return (await self._execute(replies)).scalars().all()
+
+    async def set_states(self, found: list[BlogComment]) -> dict[str, int]:
+        """write states of moderated comments, one conditional update
+        per (post, state). Only rows still on moderation change, so
+        concurrent callbacks of one batch can`t apply it twice.
+        Return published comments per pub_id (rows really changed).
+        Models are expunged, so flush won`t update them one by one."""
+        self._check_session_attached()
+        if not found:
+            return {}
+        await self._begin()
+        groups: dict[tuple[str, int], list[str]] = {}
+        for comment in found:
+            self._session.expunge(comment)
+            key = (comment.pub_id, int(comment.state))
+            groups.setdefault(key, []).append(comment.uid)
+        published: dict[str, int] = {}
+        for (pub_id, state), uids in sorted(groups.items()):
+            upd_state = (
+                    update(comments_table)
+                    .where(
+                        comments_table.c.uid.in_(uids),
+                        comments_table.c._state == CommentStatus.MODERATION,
+                        )
+                    .values(_state=state)
+                    )
+            res = await self._execute(upd_state)
+            if state == CommentStatus.PUBLISHED and res.rowcount:
+                published[pub_id] = res.rowcount
+        return published
+
+    async def add_comment_counts(self, counts: dict[str, int]) -> None:
+        """publication_stats.comments += n per post (no COUNT(*)
+        on read path). Sorted by pub_id like StatsRepository."""
+        self._check_session_attached()
+        if not counts:
+            return None
+        await self._begin()
+        ins = _upsert_insert(self._session, publication_stats)
+        upsert = ins.on_conflict_do_update(
+                index_elements=["pub_id"],
+                set_={
+                    "comments": (
+                        publication_stats.c.comments + ins.excluded.comments
+                        ),
+                    "upd_dt": func.now(),
+                    },
+                )
+        await self._execute(
+                upsert,
+                [
+                    {"pub_id": pub_id, "comments": n}
+                    for pub_id, n in sorted(counts.items())
+                    ],
+                )
+        return None
+
+    async def get_comments_count(self, pub_id: str) -> int:
+        self._check_session_attached()
+        count = (
+                select(publication_stats.c.comments)
+                .where(publication_stats.c.pub_id == pub_id)
+                )
+        return (await self._execute(count)).scalar() or 0
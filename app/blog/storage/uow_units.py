@@ -26,13 +26,10 @@ class ModerationUOW(BaseUOW):
                 exc_type is not None
                 and self._state is type(self)._work_state.TRANSACTION
                 ):
-            self._curr_ses.rollback()
-            self._state = type(self)._work_state.ROLLEDBACK
+            await self.rollback()
             # needed logging
         else:
-            if self._state is type(self)._work_state.TRANSACTION:
-                self._curr_ses.commit()
-                self._state = type(self)._work_state.COMMITED
+            await self.commit()
         return await super().__aexit__(
                 exc_type,
                 exc_value,
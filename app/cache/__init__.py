@@ -1,4 +1,5 @@
 from .redis_cache import CacheSession, CacheEngine
+from .redis_cache import AsyncCacheSession, AsyncCacheEngine
 from settings import CacheSettings
 
 
@@ -9,7 +10,19 @@ Cache = CacheSession(
         db=setup.DEFDBNO,
         decode=setup.RESP_DEC,
         )
+AsyncCache = AsyncCacheSession(
+        host=setup.CHOST,
+        port=setup.CPORT,
+        db=setup.DEFDBNO,
+        decode=setup.RESP_DEC,
+        max_connections=setup.CPOOL_SZ,
+        health_check_sec=setup.CHEALTH_SEC,
+        )
 
 
 def get_cache_engine() -> CacheEngine:
     return Cache.connect()
+
+
+def get_async_cache_engine() -> AsyncCacheEngine:
+    return AsyncCache.connect()
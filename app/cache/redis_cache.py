@@ -1,4 +1,6 @@
 import redis
+import redis.asyncio as aioredis
+import json
 import logging
 import weakref
 from typing import Generic
@@ -15,7 +17,8 @@ from enum import Enum
 from abc import ABC, abstractmethod
 
 from settings import CacheSettings
-from base_tools.actions import JSONFmt
+from base_tools.actions import JSONFmt, ModerationRes
+from base_tools.base_moderation import MCRVerdict
 
 
 AnyItemT = TypeVar("AnyItemT", bound=Any)
@@ -33,6 +36,201 @@ logger.addHandler(handler)
 
 
 setup = CacheSettings()
+MCR_FIELD: str = "mcr"
+
+# MCR native hash layout. ":" never appears in mcodes.
+MCR_PENDING: str = ":pending"
+MCR_ACCEPTED: str = ":accepted"
+MCR_REJECTED: str = ":rejected"
+MCR_DONE: str = ":done"
+MCR_REPORTS: str = "{}:reports"
+# {mcode: body} for moderation worker, removed by worker.
+HANDOFF_KEY: str = "{}:handoff"
+
+# apply one block result (mirror of ModerationControlRecord
+# set_moderation_result / finished / done_success) atomically.
+# KEYS[1] -> mcr hkey, KEYS[2] -> reports list.
+# ARGV -> mcode, state, report, accepted value, not_set value.
+APPLY_MCR_RESULT_LUA: str = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'missing', {}}
+end
+local curr = redis.call('HGET', KEYS[1], ARGV[1])
+if not curr then
+    return {'unknown', {}}
+end
+if curr ~= ARGV[5] then
+    return {'duplicate', {}}
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('RPUSH', KEYS[2], ARGV[3])
+local ttl = redis.call('TTL', KEYS[1])
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+if ARGV[2] == ARGV[4] then
+    redis.call('HINCRBY', KEYS[1], ':accepted', 1)
+else
+    redis.call('HINCRBY', KEYS[1], ':rejected', 1)
+end
+if redis.call('HINCRBY', KEYS[1], ':pending', -1) > 0 then
+    return {'pending', {}}
+end
+if redis.call('HSETNX', KEYS[1], ':done', 1) == 0 then
+    return {'duplicate', {}}
+end
+local reports = redis.call('LRANGE', KEYS[2], 0, -1)
+if tonumber(redis.call('HGET', KEYS[1], ':rejected')) == 0 then
+    return {'accepted', reports}
+end
+return {'rejected', reports}
+"""
+
+# assembled editor payload (PublicationCreated json) by pub_id.
+POST_CACHE: str = "post:{}:edit"
+# bumped on every drop; reader writes payload only if version
+# wasn`t changed while it read db (no stale payload after drop).
+POST_CACHE_VER: str = "post:{}:ver"
+
+# KEYS[1] -> payload key, KEYS[2] -> version key.
+# ARGV -> version seen before db read, payload, ttl.
+POST_CACHE_SET_LUA: str = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# ranked feed: zset of pub_id -> log-space decayed score,
+# preview hash per pub_id (title, author, excerpt, counters).
+FEED_KEY: str = "feed:rank"
+FEED_PREVIEW: str = "feed:preview:{}"
+
+# KEYS[1] -> feed zset, KEYS[2] -> preview hash.
+# ARGV -> pub_id, score, max feed len, preview key prefix,
+# preview fields (k1, v1, k2, v2, ...).
+FEED_ADD_LUA: str = """
+redis.call('HSET', KEYS[2], unpack(ARGV, 5))
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+local extra = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[3])
+if extra > 0 then
+    local dropped = redis.call('ZRANGE', KEYS[1], 0, extra - 1)
+    for _, pub_id in ipairs(dropped) do
+        redis.call('DEL', ARGV[4] .. pub_id)
+    end
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, extra - 1)
+end
+return extra
+"""
+
+# KEYS[1] -> feed zset, KEYS[2] -> preview hash.
+# ARGV -> pub_id, counter field, delta, gain ('' -> counter only).
+# score = log(sum(w * e^(t / tau))), merged as logaddexp.
+FEED_BUMP_LUA: str = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return false
+end
+redis.call('HINCRBY', KEYS[2], ARGV[2], ARGV[3])
+if ARGV[4] == '' then
+    return redis.call('ZSCORE', KEYS[1], ARGV[1])
+end
+local add = tonumber(ARGV[4])
+local cur = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+local new = add
+if cur then
+    local hi, lo = math.max(cur, add), math.min(cur, add)
+    new = hi + math.log(1 + math.exp(lo - hi))
+end
+redis.call('ZADD', KEYS[1], tostring(new), ARGV[1])
+return tostring(new)
+"""
+
+# write-behind post counters.
+STAT_GRADES: str = "stat:{}:grades"  # user_id -> like / dislike
+STAT_DELTA: str = "stat:{}:delta"  # pending counters deltas
+STAT_DIRTY: str = "stat:dirty"  # pub_ids with pending deltas
+STAT_LIKE: str = "like"
+STAT_DISLIKE: str = "dislike"
+
+# KEYS[1] -> grades hash, KEYS[2] -> delta hash, KEYS[3] -> dirty set.
+# ARGV -> user_id, grade ('' -> revoke), pub_id.
+# return {likes delta, dislikes delta}, {0, 0} on repeated vote.
+STAT_VOTE_LUA: str = """
+local old = redis.call('HGET', KEYS[1], ARGV[1]) or ''
+if old == ARGV[2] then
+    return {0, 0}
+end
+local dl, dd = 0, 0
+if old == 'like' then dl = -1 elseif old == 'dislike' then dd = -1 end
+if ARGV[2] == 'like' then
+    dl = dl + 1
+elseif ARGV[2] == 'dislike' then
+    dd = dd + 1
+end
+if ARGV[2] == '' then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+if dl ~= 0 then redis.call('HINCRBY', KEYS[2], 'likes', dl) end
+if dd ~= 0 then redis.call('HINCRBY', KEYS[2], 'dislikes', dd) end
+redis.call('SADD', KEYS[3], ARGV[3])
+return {dl, dd}
+"""
+
+# KEYS[1] -> dirty set. ARGV -> batch size, delta key prefix, suffix.
+# pop dirty pub_ids and take their deltas: {pub_id, {k, v, ..}, ..}.
+STAT_TAKE_LUA: str = """
+local ids = redis.call('SPOP', KEYS[1], ARGV[1])
+local out = {}
+for _, pub_id in ipairs(ids) do
+    local key = ARGV[2] .. pub_id .. ARGV[3]
+    table.insert(out, pub_id)
+    table.insert(out, redis.call('HGETALL', key))
+    redis.call('DEL', key)
+end
+return out
+"""
+
+
+# unique viewers (HyperLogLog): all time + per-day (utc) buckets.
+VIEW_HLL: str = "views:{}"
+VIEW_DAY_HLL: str = "views:{}:{}"  # pub_id, yyyymmdd
+
+# KEYS[1] -> post hll, KEYS[2] -> day hll, KEYS[3] -> delta hash,
+# KEYS[4] -> dirty set. ARGV -> viewer, pub_id, day ttl (0 -> no day).
+# return 1 if viewer is new (watches delta + 1), else 0.
+VIEW_ADD_LUA: str = """
+local new = redis.call('PFADD', KEYS[1], ARGV[1])
+local ttl = tonumber(ARGV[3])
+if ttl > 0 then
+    redis.call('PFADD', KEYS[2], ARGV[1])
+    redis.call('EXPIRE', KEYS[2], ttl)
+end
+if new == 1 then
+    redis.call('HINCRBY', KEYS[3], 'watches', 1)
+    redis.call('SADD', KEYS[4], ARGV[2])
+end
+return new
+"""
+
+# comments waiting for moderation batch (list of json).
+COMMENT_QUEUE: str = "comments:moderation"
+# uids of batch sent to worker, keyed by secret batch token;
+# callback is accepted only for these uids.
+COMMENT_BATCH: str = "comments:batch:{}"
+# author notifications waiting for send_emails batch (list of json).
+NOTIFY_QUEUE: str = "notify:email"
+
+
+def _decode(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def is_block_mcode(field: str) -> bool:
+    """False for service fields sharing MCR hash with mcodes."""
+    return field != MCR_FIELD and not field.startswith(":")
 
 
 class CacheSessionExpired(Exception):
@@ -224,13 +422,555 @@ class CacheEngine(AbstractCacheEngine):
     def del_ht_obj(self, hkey: str) -> None:
         """del object from hash table."""
         self._conn_alive()
-        keys = []
         try:
-            keys = self._conn.hkeys(hkey)
+            self._conn.delete(hkey)
         except redis.exceptions.ResponseError as err:
             logger.error(err)
             raise Exception(err)
-        pipe = self._conn.pipeline()
-        for k in keys:
-            pipe.hdel(hkey, k)
-        pipe.execute()
+
+
+class AsyncCacheSession(AbstractCacheSession):
+    """keep one process-wide connection pool per host:port/db.
+    Pool checks connection health, so engine never pings itself."""
+
+    _map: ClassVar[MMap[str, aioredis.ConnectionPool]] = {}
+
+    @classmethod
+    def reconfigure(
+            cls: Type[S],
+            host: str,
+            port: int,
+            db: CacheDB,
+            *,
+            decode: bool = False,
+            ) -> "AsyncCacheSession":
+        return cls(host, port, db, decode=decode)
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            db: CacheDB,
+            *,
+            decode: bool = False,
+            max_connections: int = setup.CPOOL_SZ,
+            health_check_sec: int = setup.CHEALTH_SEC,
+            ) -> None:
+        self._host = host
+        self._port = port
+        self._db = db
+        self._decode = decode
+        self._max_conn = max_connections
+        self._health_sec = health_check_sec
+
+    def __repr__(self) -> str:
+        return (
+            f"{self._host}:{self._port}/{self._db}.decode={self._decode}\n"
+            )
+
+    def _get_pool(self) -> aioredis.ConnectionPool:
+        key = self.__repr__()
+        pool = type(self)._map.get(key, None)
+        if pool is None:
+            pool = aioredis.ConnectionPool(
+                    host=self._host,
+                    port=self._port,
+                    db=self._db,
+                    decode_responses=self._decode,
+                    max_connections=self._max_conn,
+                    health_check_interval=self._health_sec,
+                    )
+            type(self)._map[key] = pool
+        return pool
+
+    def connect(self) -> "AsyncCacheEngine":
+        """return engine on shared pool (no network IO here)."""
+        conn = aioredis.Redis(connection_pool=self._get_pool())
+        return AsyncCacheEngine(conn)
+
+    @classmethod
+    async def disconnect(cls) -> None:
+        """close all pools on app shutdown."""
+        while cls._map:
+            _, pool = cls._map.popitem()
+            await pool.disconnect()
+
+
+class AsyncCacheEngine(AbstractCacheEngine):
+    """asyncio engine with the same surface as CacheEngine."""
+
+    def __init__(self, conn: aioredis.Redis) -> None:
+        self._conn = conn
+        self._apply_result = conn.register_script(APPLY_MCR_RESULT_LUA)
+        self._feed_add = conn.register_script(FEED_ADD_LUA)
+        self._feed_bump = conn.register_script(FEED_BUMP_LUA)
+        self._stat_vote = conn.register_script(STAT_VOTE_LUA)
+        self._stat_take = conn.register_script(STAT_TAKE_LUA)
+        self._view_add = conn.register_script(VIEW_ADD_LUA)
+        self._post_cache_set = conn.register_script(POST_CACHE_SET_LUA)
+
+    async def close(self) -> None:
+        """return connections to pool, pool stays alive."""
+        await self._conn.close(close_connection_pool=False)
+
+    async def set_temp_obj(self, key: str, obj: JSONFmt, exp_sec: int) -> None:
+        await self._conn.setex(key, exp_sec, obj)
+
+    async def get_temp_obj(self, key: str) -> Optional[JSONFmt]:
+        return await self._conn.get(key)
+
+    async def del_temp_obj(self, key: str) -> None:
+        await self._conn.delete(key)
+
+    async def get_post_cache(self, pub_id: str) -> tuple[Optional[str], str]:
+        """(editor payload or None, version) in one trip."""
+        payload, version = await self._conn.mget(
+                POST_CACHE.format(pub_id),
+                POST_CACHE_VER.format(pub_id),
+                )
+        return _decode(payload), _decode(version) or "0"
+
+    async def set_post_cache(
+            self,
+            pub_id: str,
+            version: str,
+            payload: str,
+            exp_sec: int,
+            ) -> bool:
+        """save payload if it wasn`t dropped after version was read."""
+        keys = [POST_CACHE.format(pub_id), POST_CACHE_VER.format(pub_id)]
+        done = await self._post_cache_set(
+                keys=keys,
+                args=[version, payload, exp_sec],
+                )
+        return bool(done)
+
+    async def drop_post_cache(self, pub_id: str) -> None:
+        """drop payload and bump version (reads in flight won`t save).
+        Version outlives any payload written before the drop."""
+        ver_key = POST_CACHE_VER.format(pub_id)
+        async with self._conn.pipeline(transaction=True) as pipe:
+            pipe.incr(ver_key)
+            pipe.expire(ver_key, setup.POST_CACHE_SEC)
+            pipe.delete(POST_CACHE.format(pub_id))
+            await pipe.execute()
+
+    async def set_ht_obj(self, hkey: str, payload: dict) -> None:
+        """save system-obj -> ModerationControlBlock to Cache."""
+        try:
+            await self._conn.hset(hkey, mapping=payload)
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def get_ht_obj(self, hkey: str) -> Optional[dict]:
+        """get serializer mcr-obj."""
+        return await self._conn.hgetall(hkey)
+
+    async def set_ht_field(self, hkey: str, field: str, payload: Any) -> None:
+        try:
+            await self._conn.hset(hkey, key=field, value=payload)
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def del_ht_obj(self, hkey: str) -> None:
+        """del object from hash table."""
+        try:
+            await self._conn.delete(hkey)
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def register_mcr(
+            self,
+            hkey: str,
+            mcr: JSONFmt,
+            blocks: dict[str, str],
+            exp_sec: int,
+            ) -> None:
+        """save MCR with native counters (one trip)."""
+        payload = {
+                MCR_FIELD: mcr,
+                MCR_PENDING: len(blocks),
+                MCR_ACCEPTED: 0,
+                MCR_REJECTED: 0,
+                **blocks,
+                }
+        reports = MCR_REPORTS.format(hkey)
+        try:
+            async with self._conn.pipeline(transaction=True) as pipe:
+                pipe.delete(hkey, reports)
+                pipe.hset(hkey, mapping=payload)
+                pipe.expire(hkey, exp_sec)
+                await pipe.execute()
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def apply_mcr_result(
+            self,
+            hkey: str,
+            mcode: str,
+            state: str,
+            report: str,
+            ) -> tuple[MCRVerdict, list[str]]:
+        """set block result server-side and return (verdict, reports).
+        Terminal verdict is returned only to one caller."""
+        try:
+            verdict, reports = await self._apply_result(
+                    keys=[hkey, MCR_REPORTS.format(hkey)],
+                    args=[
+                        mcode,
+                        state,
+                        report,
+                        ModerationRes.ACCEPTED.value,
+                        ModerationRes.NOT_SET.value,
+                        ],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        if isinstance(verdict, bytes):
+            verdict = verdict.decode()
+            reports = [r.decode() for r in reports]
+        return MCRVerdict(verdict), reports
+
+    async def apply_mcr_results(
+            self,
+            hkey: str,
+            results: list[tuple[str, str, str]],
+            ) -> list[tuple[MCRVerdict, list[str]]]:
+        """apply batch of (mcode, state, report) in one trip.
+        Each result runs the same script, so verdicts stay atomic."""
+        keys = [hkey, MCR_REPORTS.format(hkey)]
+        try:
+            async with self._conn.pipeline(transaction=False) as pipe:
+                for mcode, state, report in results:
+                    await self._apply_result(
+                            keys=keys,
+                            args=[
+                                mcode,
+                                state,
+                                report,
+                                ModerationRes.ACCEPTED.value,
+                                ModerationRes.NOT_SET.value,
+                                ],
+                            client=pipe,
+                            )
+                replies = await pipe.execute()
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        verdicts = []
+        for verdict, reports in replies:
+            if isinstance(verdict, bytes):
+                verdict = verdict.decode()
+                reports = [r.decode() for r in reports]
+            verdicts.append((MCRVerdict(verdict), reports))
+        return verdicts
+
+    async def mcode_registered(self, hkey: str, mcode: str) -> bool:
+        """check external mcode on registration.
+        Service fields of MCR hash are not mcodes."""
+        if not is_block_mcode(mcode):
+            return False
+        return bool(await self._conn.hexists(hkey, mcode))
+
+    async def mcodes_registered(self, hkey: str, mcodes: list[str]) -> bool:
+        """check all external mcodes on registration (one trip)."""
+        if not mcodes or not all(is_block_mcode(m) for m in mcodes):
+            return False
+        states = await self._conn.hmget(hkey, mcodes)
+        return all(st is not None for st in states)
+
+    async def set_handoff(
+            self,
+            key: str,
+            bodies: dict[str, str],
+            exp_sec: int,
+            ) -> None:
+        """save content bodies for worker (one trip)."""
+        try:
+            async with self._conn.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=bodies)
+                pipe.expire(key, exp_sec)
+                await pipe.execute()
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def del_mcr(self, hkey: str) -> None:
+        """remove MCR with all block reports atomically."""
+        try:
+            await self._conn.delete(hkey, MCR_REPORTS.format(hkey))
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def feed_add(
+            self,
+            pub_id: str,
+            preview: dict[str, Any],
+            score: float,
+            max_len: int,
+            ) -> None:
+        """put post to ranked feed, drop lowest above max_len."""
+        fields = [v for kv in preview.items() for v in kv]
+        try:
+            await self._feed_add(
+                    keys=[FEED_KEY, FEED_PREVIEW.format(pub_id)],
+                    args=[
+                        pub_id,
+                        repr(score),
+                        max_len,
+                        FEED_PREVIEW.format(""),
+                        *fields,
+                        ],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+
+    async def feed_bump(
+            self,
+            pub_id: str,
+            counter: str,
+            delta: int,
+            gain: Optional[float],
+            ) -> Optional[float]:
+        """incr preview counter and merge gain into score.
+        None -> post isn`t in feed."""
+        try:
+            score = await self._feed_bump(
+                    keys=[FEED_KEY, FEED_PREVIEW.format(pub_id)],
+                    args=[
+                        pub_id,
+                        counter,
+                        delta,
+                        "" if gain is None else repr(gain),
+                        ],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        return None if score is None else float(score)
+
+    async def feed_page(self, start: int, count: int) -> list[dict]:
+        """top posts with previews: one ZREVRANGE + one pipeline."""
+        pub_ids = await self._conn.zrevrange(
+                FEED_KEY,
+                start,
+                start + count - 1,
+                )
+        if not pub_ids:
+            return []
+        async with self._conn.pipeline(transaction=False) as pipe:
+            for pub_id in pub_ids:
+                if isinstance(pub_id, bytes):
+                    pub_id = pub_id.decode()
+                pipe.hgetall(FEED_PREVIEW.format(pub_id))
+            previews = await pipe.execute()
+        # preview can be dropped between two trips
+        return [
+            {_decode(k): _decode(v) for k, v in p.items()}
+            for p in previews if p
+            ]
+
+    async def feed_listed(self, pub_id: str) -> bool:
+        """post has preview in feed (published, not evicted)."""
+        return bool(await self._conn.exists(FEED_PREVIEW.format(pub_id)))
+
+    async def stat_vote(
+            self,
+            pub_id: str,
+            user_id: str,
+            grade: str,
+            ) -> dict[str, int]:
+        """set user grade (like / dislike / '' -> revoke).
+        Return applied counters deltas, repeated vote is no-op."""
+        try:
+            dl, dd = await self._stat_vote(
+                    keys=[
+                        STAT_GRADES.format(pub_id),
+                        STAT_DELTA.format(pub_id),
+                        STAT_DIRTY,
+                        ],
+                    args=[user_id, grade, pub_id],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        return {"likes": int(dl), "dislikes": int(dd)}
+
+    async def stat_incr(self, pub_id: str, counter: str, delta: int) -> None:
+        async with self._conn.pipeline(transaction=True) as pipe:
+            pipe.hincrby(STAT_DELTA.format(pub_id), counter, delta)
+            pipe.sadd(STAT_DIRTY, pub_id)
+            await pipe.execute()
+
+    async def stat_grade(self, pub_id: str, user_id: str) -> str:
+        return _decode(
+                await self._conn.hget(STAT_GRADES.format(pub_id), user_id),
+                ) or ""
+
+    async def stat_grade_many(
+            self,
+            pub_ids: list[str],
+            user_id: str,
+            ) -> list[str]:
+        """user grades for page of posts (one trip)."""
+        async with self._conn.pipeline(transaction=False) as pipe:
+            for pub_id in pub_ids:
+                pipe.hget(STAT_GRADES.format(pub_id), user_id)
+            grades = await pipe.execute()
+        return [_decode(g) or "" for g in grades]
+
+    async def stat_pending(self, pub_id: str) -> dict[str, int]:
+        """deltas not flushed yet."""
+        delta = await self._conn.hgetall(STAT_DELTA.format(pub_id))
+        return {_decode(k): int(v) for k, v in delta.items()}
+
+    async def stat_pending_many(
+            self,
+            pub_ids: list[str],
+            ) -> list[dict[str, int]]:
+        """deltas not flushed yet for page of posts (one trip)."""
+        async with self._conn.pipeline(transaction=False) as pipe:
+            for pub_id in pub_ids:
+                pipe.hgetall(STAT_DELTA.format(pub_id))
+            deltas = await pipe.execute()
+        return [{_decode(k): int(v) for k, v in d.items()} for d in deltas]
+
+    async def stat_take(self, count: int) -> dict[str, dict[str, int]]:
+        """pop up to count dirty posts with their deltas (one trip)."""
+        prefix, suffix = STAT_DELTA.split("{}")
+        try:
+            raw = await self._stat_take(
+                    keys=[STAT_DIRTY],
+                    args=[count, prefix, suffix],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        taken: dict[str, dict[str, int]] = {}
+        for pub_id, flat in zip(raw[::2], raw[1::2]):
+            taken[_decode(pub_id)] = {
+                _decode(k): int(v) for k, v in zip(flat[::2], flat[1::2])
+                }
+        return taken
+
+    async def stat_restore(self, deltas: dict[str, dict[str, int]]) -> None:
+        """put back deltas which weren`t flushed."""
+        async with self._conn.pipeline(transaction=True) as pipe:
+            for pub_id, delta in deltas.items():
+                for counter, value in delta.items():
+                    pipe.hincrby(STAT_DELTA.format(pub_id), counter, value)
+                pipe.sadd(STAT_DIRTY, pub_id)
+            await pipe.execute()
+
+    async def view_add(
+            self,
+            pub_id: str,
+            viewer: str,
+            day: str,
+            day_ttl: int,
+            ) -> bool:
+        """count viewer in post hll (and day bucket).
+        True -> new viewer, pending watches delta incremented."""
+        try:
+            new = await self._view_add(
+                    keys=[
+                        VIEW_HLL.format(pub_id),
+                        VIEW_DAY_HLL.format(pub_id, day),
+                        STAT_DELTA.format(pub_id),
+                        STAT_DIRTY,
+                        ],
+                    args=[viewer, pub_id, day_ttl],
+                    )
+        except redis.exceptions.ResponseError as err:
+            logger.error(err)
+            raise Exception(err)
+        return bool(int(new))
+
+    async def view_count(self, pub_id: str) -> int:
+        """approximate unique viewers of post."""
+        return int(await self._conn.pfcount(VIEW_HLL.format(pub_id)))
+
+    async def view_count_many(self, pub_ids: list[str]) -> list[int]:
+        """unique viewers for page of posts (one trip)."""
+        async with self._conn.pipeline(transaction=False) as pipe:
+            for pub_id in pub_ids:
+                pipe.pfcount(VIEW_HLL.format(pub_id))
+            counts = await pipe.execute()
+        return [int(c) for c in counts]
+
+    async def view_window(self, pub_id: str, days: list[str]) -> int:
+        """unique viewers over day buckets (merged by PFCOUNT)."""
+        if not days:
+            return 0
+        keys = [VIEW_DAY_HLL.format(pub_id, d) for d in days]
+        return int(await self._conn.pfcount(*keys))
+
+    async def comment_enqueue(self, uid: str, pub_id: str, body: str) -> None:
+        item = json.dumps({"uid": uid, "pub_id": pub_id, "body": body})
+        await self._conn.rpush(COMMENT_QUEUE, item)
+
+    async def comment_take(self, count: int) -> list[dict[str, str]]:
+        """pop up to count oldest queued comments."""
+        items = await self._conn.lpop(COMMENT_QUEUE, count)
+        return [json.loads(_decode(i)) for i in items or []]
+
+    async def comment_restore(self, items: list[dict[str, str]]) -> None:
+        """return not sent batch to queue head (order kept)."""
+        if items:
+            await self._conn.lpush(
+                    COMMENT_QUEUE,
+                    *(json.dumps(i) for i in reversed(items)),
+                    )
+
+    async def comment_queue_len(self) -> int:
+        return await self._conn.llen(COMMENT_QUEUE)
+
+    async def comment_batch_open(
+            self,
+            token: str,
+            uids: list[str],
+            exp_sec: int,
+            ) -> None:
+        key = COMMENT_BATCH.format(token)
+        async with self._conn.pipeline(transaction=True) as pipe:
+            pipe.sadd(key, *uids)
+            pipe.expire(key, exp_sec)
+            await pipe.execute()
+
+    async def comment_batch_uids(self, token: str) -> set[str]:
+        """uids of open batch, empty -> unknown or expired token."""
+        uids = await self._conn.smembers(COMMENT_BATCH.format(token))
+        return {_decode(u) for u in uids}
+
+    async def comment_batch_close(self, token: str) -> None:
+        await self._conn.delete(COMMENT_BATCH.format(token))
+
+    async def notify_enqueue(
+            self,
+            sender: str,
+            recv: str,
+            payload: str,
+            ) -> None:
+        item = json.dumps([sender, recv, payload])
+        await self._conn.rpush(NOTIFY_QUEUE, item)
+
+    async def notify_take(self, count: int) -> list[list[str]]:
+        """pop up to count oldest queued emails -> [sender, recv, payload]."""
+        items = await self._conn.lpop(NOTIFY_QUEUE, count)
+        return [json.loads(_decode(i)) for i in items or []]
+
+    async def notify_restore(self, items: list[list[str]]) -> None:
+        """return not sent batch to queue head (order kept)."""
+        if items:
+            await self._conn.lpush(
+                    NOTIFY_QUEUE,
+                    *(json.dumps(i) for i in reversed(items)),
+                    )
@@ -1,13 +1,24 @@
 from blog.storage.uow_units import ModerationUOW
 from blog.storage.repositories import PostsRepository
 from blog.storage.repositories import ContentRepository
+from blog.storage.repositories import StatsRepository
+from blog.storage.repositories import CommentsRepository
+from blog.stat_flusher import StatFlusher
+from blog.comment_batcher import CommentBatcher
+from authors.notify_batcher import NotifyBatcher
 from authors.storage.repositories import AuthorsRepository
 from authors.storage.authors_uow import AuthorsUOW
 from db.sessions import Session
+from db.base_uow import UOWFactory
 from db.tables import publications
 from db.tables import content
 from db.tables import authors
-from base_tools.bus import MsgBus
+from db.stat_tables import publication_stats
+from db.comment_tables import comments
+from db.indexes import HOT_INDEXES  # noqa: F401 (registers on metadata)
+from base_tools.bus import MsgBus, DispatchMode
+from settings import BusSettings, StatSettings, CommentSettings
+from settings import NotifySettings
 
 from blog.messages import (
         CreateNewPost,
@@ -19,19 +30,30 @@ from blog.messages import (
         AddToCache,
         StartModeration,
         ModerateContent,
+        ModeratePublication,
         ModerationFailed,
         ModerationDoneSuccess,
         SetModerationResult,
+        SetModerationResults,
         RegisterMCR,
         UpdateMCR,
         DeleteMCR,
         CheckModerationResult,
         LockContent,
+        ActivatePost,
+        LikeThisPost,
+        DislikeThisPost,
+        WatchPost,
+        DropPostCache,
+        CommentPost,
+        StartCommentModeration,
+        SetCommentResults,
         )
 from base_tools.sys_messages import (
         NotifyAuthor,
         PostAccepted,
         PostRejected,
+        PostPublished,
         )
 from blog.handlers import (
         CreateNewPostHandler,
@@ -43,14 +65,23 @@ from blog.handlers import (
         AddToCacheHandler,
         BeginPostModerationHandler,
         SendToModerationHandler,
+        SendPublicationToModerationHandler,
         StartModerationNotifyHandler,
         ModerationFailedHandler,
         ModerationSuccessHandler,
         SetPostModerationResHandler,
         RegisterMCRHandler,
         SetResultToCacheHandler,
+        SetResultsToCacheHandler,
         UpdateMCRHandler,
         DeleteMCRHandler,
+        ActivatePostHandler,
+        AddToFeedHandler,
+        PostStatHandler,
+        DropPostCacheHandler,
+        CreateCommentHandler,
+        EnqueueCommentHandler,
+        SetCommentResultsHandler,
         )
 from authors.messages import (
         RegisterNewAuthor,
@@ -70,10 +101,19 @@ __all__ = (
         "mod_uow",
         "cont_uow",
         "authors_uow",
+        "stat_uow",
+        "stat_flusher",
+        "comment_uow",
+        "comment_batcher",
+        "notify_batcher",
         )
 
 
 Bus = MsgBus
+bus_settings = BusSettings()
+stat_settings = StatSettings()
+comment_settings = CommentSettings()
+notify_settings = NotifySettings()
 
 
 async def get_bus() -> MsgBus:
@@ -83,18 +123,45 @@ async def get_bus() -> MsgBus:
         raise Exception("BootstrapError")
 
 
-# init Repo
-repo = PostsRepository(publications, run_test=True)
-cont_repo = ContentRepository(content, run_test=True)
-authors_repo = AuthorsRepository(authors, run_test=True)
-
-# init UOW
-mod_uow = ModerationUOW(repo, Session)
-cont_uow = ModerationUOW(cont_repo, Session)
-authors_uow = AuthorsUOW(authors_repo, Session)
+# init UOW factories -> fresh uow for each request / bus message
+mod_uow = UOWFactory(
+        ModerationUOW,
+        PostsRepository,
+        publications,
+        Session,
+        run_test=True,
+        )
+cont_uow = UOWFactory(
+        ModerationUOW,
+        ContentRepository,
+        content,
+        Session,
+        run_test=True,
+        )
+authors_uow = UOWFactory(
+        AuthorsUOW,
+        AuthorsRepository,
+        authors,
+        Session,
+        run_test=True,
+        )
+stat_uow = UOWFactory(
+        ModerationUOW,
+        StatsRepository,
+        publication_stats,
+        Session,
+        run_test=True,
+        )
+comment_uow = UOWFactory(
+        ModerationUOW,
+        CommentsRepository,
+        comments,
+        Session,
+        run_test=True,
+        )
 
 # set handlers
-creator = CreateNewPostHandler(mod_uow)
+creator = CreateNewPostHandler(cont_uow)
 header_creator = AddHeaderForPostHandler(cont_uow)
 body_creator = AddBodyForPostHandler(cont_uow)
 saver = SaveAllContentHandler(cont_uow)
@@ -103,6 +170,7 @@ body_upd = UpdateBodyHandler(cont_uow)
 cachekeeper = AddToCacheHandler(mod_uow)
 mod_starter = BeginPostModerationHandler(mod_uow)
 mod_sender = SendToModerationHandler(cont_uow)
+pub_mod_sender = SendPublicationToModerationHandler(cont_uow)
 mod_st_info = StartModerationNotifyHandler(cont_uow)
 mod_success = ModerationSuccessHandler(mod_uow)
 mod_failed = ModerationFailedHandler(mod_uow)
@@ -110,9 +178,31 @@ mod_res_setter = SetPostModerationResHandler(cont_uow)
 
 # set to cache
 cache_saver = SetResultToCacheHandler(cont_uow)
+batch_cache_saver = SetResultsToCacheHandler(cont_uow)
 mcr_regr = RegisterMCRHandler(cont_uow)
 upd_mcr = UpdateMCRHandler(cont_uow)
 del_mcr = DeleteMCRHandler(cont_uow)
+post_cache_drop = DropPostCacheHandler(cont_uow)
+
+# ranked feed
+activator = ActivatePostHandler(mod_uow)
+feed_adder = AddToFeedHandler(cont_uow)
+post_stat = PostStatHandler(mod_uow)
+stat_flusher = StatFlusher(
+        stat_uow,
+        period_sec=stat_settings.STAT_FLUSH_SEC,
+        batch=stat_settings.STAT_FLUSH_BATCH,
+        )
+
+# comments
+commentator = CreateCommentHandler(comment_uow)
+comment_queue = EnqueueCommentHandler(comment_uow)
+comment_res_setter = SetCommentResultsHandler(comment_uow)
+comment_batcher = CommentBatcher(
+        period_sec=comment_settings.COMMENT_BATCH_WAIT_SEC,
+        batch=comment_settings.COMMENT_BATCH,
+        token_ttl_sec=comment_settings.COMMENT_BATCH_TTL_SEC,
+        )
 
 # users ctx
 authrs_reg = CreateNewAuthorHandler(authors_uow)
@@ -120,6 +210,10 @@ au_activator = ActivateAuthorHandler(authors_uow)
 post_acc = PostAcceptedHandler(authors_uow)
 post_rej = PostRejectedHandler(authors_uow)
 notify = NotifyAuthorsHandler(authors_uow)
+notify_batcher = NotifyBatcher(
+        period_sec=notify_settings.NOTIFY_BATCH_WAIT_SEC,
+        batch=notify_settings.NOTIFY_BATCH,
+        )
 
 # setup Bus
 Bus.subscribe(CreateNewPost, creator)
@@ -131,14 +225,25 @@ Bus.subscribe(UpdateBody, body_upd)
 Bus.subscribe(AddToCache, cachekeeper)
 Bus.subscribe(StartModeration, mod_starter)
 Bus.subscribe(ModerateContent, mod_sender)
+Bus.subscribe(ModeratePublication, pub_mod_sender)
 Bus.subscribe(LockContent, mod_st_info)
 Bus.subscribe(ModerationDoneSuccess, mod_success)
 Bus.subscribe(ModerationFailed, mod_failed)
 Bus.subscribe(CheckModerationResult, mod_res_setter)
 Bus.subscribe(SetModerationResult, cache_saver)
+Bus.subscribe(SetModerationResults, batch_cache_saver)
 Bus.subscribe(RegisterMCR, mcr_regr)
 Bus.subscribe(UpdateMCR, upd_mcr)
 Bus.subscribe(DeleteMCR, del_mcr)
+Bus.subscribe(DropPostCache, post_cache_drop)
+Bus.subscribe(ActivatePost, activator)
+Bus.subscribe(PostPublished, feed_adder)
+Bus.subscribe(LikeThisPost, post_stat)
+Bus.subscribe(DislikeThisPost, post_stat)
+Bus.subscribe(WatchPost, post_stat)
+Bus.subscribe(CommentPost, commentator)
+Bus.subscribe(StartCommentModeration, comment_queue)
+Bus.subscribe(SetCommentResults, comment_res_setter)
 
 # setup Bus (next ctx -> users)
 Bus.subscribe(RegisterNewAuthor, authrs_reg)
@@ -146,3 +251,15 @@ Bus.subscribe(ActivateAuthor, au_activator)
 Bus.subscribe(PostAccepted, post_acc)
 Bus.subscribe(PostRejected, post_rej)
 Bus.subscribe(NotifyAuthor, notify)
+
+# dispatch mode (opt-in fan-out)
+if bus_settings.BUS_FANOUT:
+    Bus.set_dispatch_mode(
+            DispatchMode.FANOUT,
+            limit=bus_settings.BUS_MAX_CONCURRENCY,
+            )
+# MCR have to be in cache before workers ask for content
+Bus.add_ordering(RegisterMCR, ModerateContent)
+Bus.add_ordering(RegisterMCR, ModeratePublication)
+# handoff reads bodies, so content is locked (no edits) before
+Bus.add_ordering(LockContent, ModeratePublication)
@@ -5,6 +5,7 @@ from typing import Any
 from typing import Type
 from typing import Optional
 from enum import Enum
+from inspect import isawaitable
 
 from base_tools.exceptions import RepositoryError
 from sqlalchemy import Table
@@ -100,3 +101,22 @@ class BaseRepository(Repository):
         if not self._attached:
             raise RepositoryError("Session wasn`t attached to repository.")
         return None
+
+    async def _execute(self, stmt: Any, params: Optional[Any] = None) -> Any:
+        """execute statement on sync Session or AsyncSession."""
+        if params is None:
+            res = self._session.execute(stmt)
+        else:
+            res = self._session.execute(stmt, params)
+        if isawaitable(res):
+            res = await res
+        return res
+
+    async def _begin(self) -> None:
+        """begin transaction if session hasn`t one yet."""
+        if self._session.in_transaction():
+            return None
+        trans = self._session.begin()
+        if isawaitable(trans):
+            await trans
+        return None
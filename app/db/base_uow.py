@@ -3,7 +3,12 @@ from typing import Generator
 from typing import TypeVar
 from typing import Generic
 from typing import Any
+from typing import Type
+from typing import Union
+from typing import Optional
+from typing import Callable
 from asyncio import create_task
+from inspect import isawaitable
 from typing import Protocol
 from enum import Enum
 
@@ -95,10 +100,17 @@ class BaseUOW(UOWProto):
         self._state = type(self)._work_state.TRANSACTION
         return self
 
+    async def _run_on_session(self, method: str) -> None:
+        """call session method, await it if session is AsyncSession."""
+        res = getattr(self._curr_ses, method)()
+        if isawaitable(res):
+            await res
+        return None
+
     async def __aexit__(self, *args) -> None:
         self._repository.detach_session()
         if self._curr_ses and hasattr(self._curr_ses, "close"):
-            self._curr_ses.close()
+            await self._run_on_session("close")
         self._state = type(self)._work_state.READY
         return None
 
@@ -122,7 +134,7 @@ class BaseUOW(UOWProto):
                 hasattr(self._curr_ses, "commit")
                 and self._state is type(self)._work_state.TRANSACTION
                 ):
-            self._curr_ses.commit()
+            await self._run_on_session("commit")
             self._state = type(self)._work_state.COMMITED
         return None
 
@@ -131,11 +143,40 @@ class BaseUOW(UOWProto):
                 hasattr(self._curr_ses, "rollback")
                 and self._state is type(self)._work_state.TRANSACTION
                 ):
-            self._curr_ses.rollback()
+            await self._run_on_session("rollback")
             self._state = type(self)._work_state.ROLLEDBACK
         return None
 
 
+class UOWFactory:
+    """build fresh uow (with own repository, session and
+    events) on each call. Use it as FastAPI dependency too."""
+
+    def __init__(
+            self,
+            uow_type: Type[BaseUOW],
+            repo_type: Type[Any],
+            table: Any,
+            session: Callable[[], Session],
+            **repo_kwargs: Any,
+            ) -> None:
+        self._uow_type = uow_type
+        self._repo_type = repo_type
+        self._table = table
+        self._ses_fct = session
+        self._repo_kwargs = repo_kwargs
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({self._uow_type.__name__}, "
+            f"{self._repo_type.__name__})"
+            )
+
+    def __call__(self) -> BaseUOW:
+        repo = self._repo_type(self._table, **self._repo_kwargs)
+        return self._uow_type(repo, self._ses_fct)
+
+
 class Handler(ABC, Generic[UOWProtoT]):
     """Handler interface."""
 
@@ -152,10 +193,20 @@ class Handler(ABC, Generic[UOWProtoT]):
 
 class BaseCmdHandler(Handler):
 
-    def __init__(self, uow: UOWProto) -> None:
+    def __init__(self, uow: Union[UOWProto, UOWFactory]) -> None:
+        self._uow_fct: Optional[UOWFactory] = None
+        if isinstance(uow, UOWFactory):
+            self._uow_fct = uow
+            uow = uow()
         self._uow: UOWProto[Repository, Session] = uow
         self._task = create_task
 
+    def scoped(self) -> "BaseCmdHandler":
+        """return handler bound to fresh uow if built from factory."""
+        if self._uow_fct is None:
+            return self
+        return type(self)(self._uow_fct)
+
     @property
     def events(self) -> Generator:
         """redirect events upper."""
@@ -0,0 +1,35 @@
+from sqlalchemy import Table, Column, String, Text, Integer, DateTime
+
+from db.tables import metadata
+
+
+__all__ = (
+        "comments",
+        "COMMENT_PATH_LEN",
+        )
+
+
+COMMENT_PATH_LEN: int = 512
+# byte order for path: prefix range == subtree in any db locale
+_path_type = String(COMMENT_PATH_LEN).with_variant(
+        String(COMMENT_PATH_LEN, collation="C"),
+        "postgresql",
+        )
+
+
+# threaded comments (parent_id -> answer on comment).
+# path -> uids from root to comment, fixed width, so order by path
+# is thread display order (answers after parent, siblings by time).
+comments = Table(
+        "comments",
+        metadata,
+        Column("uid", String(32), primary_key=True),
+        Column("pub_id", String(32), nullable=False),
+        Column("parent_id", String(32), nullable=True),
+        Column("author_id", String(32), nullable=False),
+        Column("body", Text, nullable=False),
+        Column("creation_dt", DateTime, nullable=False),
+        Column("_state", Integer, nullable=False),
+        Column("path", _path_type, nullable=False),
+        Column("depth", Integer, nullable=False, server_default="0"),
+        )
@@ -0,0 +1,64 @@
+from sqlalchemy import Index
+
+from db.tables import publications
+from db.tables import content
+from db.tables import authors
+from db.comment_tables import comments
+
+
+__all__ = (
+        "HOT_INDEXES",
+        )
+
+
+# indexes for predicates used on every request.
+# Declared on metadata, so autogenerate and bootstrap_db see them,
+# created on prod by migrations (CONCURRENTLY).
+HOT_INDEXES = (
+        # post + content loader, content by ids, header/body joins
+        Index(
+            "ix_content_pub_id_role",
+            content.c.pub_id,
+            content.c._role,
+            ),
+        # update_body -> uid + locked == 0 without heap check of lock
+        Index(
+            "ix_content_uid_locked",
+            content.c.uid,
+            postgresql_include=["locked"],
+            ),
+        # author`s posts, keyset (creation_dt, uid) desc
+        Index(
+            "ix_publications_author_dt_uid",
+            publications.c.author_id,
+            publications.c.creation_dt.desc(),
+            publications.c.uid.desc(),
+            ),
+        # author`s posts by state (drafts, published page), keyset
+        Index(
+            "ix_publications_author_state_dt_uid",
+            publications.c.author_id,
+            publications.c._state,
+            publications.c.creation_dt.desc(),
+            publications.c.uid.desc(),
+            ),
+        # login on every auth request
+        Index(
+            "ix_authors_login",
+            authors.c.login,
+            ),
+        # comments page of post, keyset (creation_dt, uid) asc
+        Index(
+            "ix_comments_pub_state_dt_uid",
+            comments.c.pub_id,
+            comments.c._state,
+            comments.c.creation_dt,
+            comments.c.uid,
+            ),
+        # whole thread / subtree of comment by one range scan on path
+        Index(
+            "ix_comments_pub_path",
+            comments.c.pub_id,
+            comments.c.path,
+            ),
+        )
@@ -1,4 +1,5 @@
 from enum import Enum
+from inspect import isawaitable
 from typing import AsyncGenerator
 from typing import Optional
 from typing import Any
@@ -15,26 +16,59 @@ __all__ = (
         "bootstrap_db",
         "engine",
         "get_db_session",
+        "build_engine",
+        "build_session_factory",
         )
 
 
 db_settings = TestDBSettings()
 
 
-engine = create_engine(
-        db_settings.get_db_url(),
-        echo_pool=db_settings.TEST_ECHO_POOL,
-        pool_pre_ping=db_settings.TEST_POOL_PREPING,
-        pool_size=db_settings.TEST_POOL_SZ,
-        max_overflow=db_settings.TEST_POOL_OWF,
-        pool_recycle=db_settings.TEST_POOL_RECL,
-    )
-
-
-Session = sessionmaker(
+def build_engine(settings: TestDBSettings, *, use_async: bool) -> Any:
+    """build AsyncEngine (asyncio ext) or sync Engine."""
+    pool_opts = {
+        "echo_pool": settings.TEST_ECHO_POOL,
+        "pool_pre_ping": settings.TEST_POOL_PREPING,
+        "pool_size": settings.TEST_POOL_SZ,
+        "max_overflow": settings.TEST_POOL_OWF,
+        "pool_recycle": settings.TEST_POOL_RECL,
+        }
+    if use_async:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        return create_async_engine(
+                settings.get_db_url(driver=settings.TEST_ASYNC_DRIVER),
+                **pool_opts,
+                )
+    return create_engine(settings.get_db_url(), **pool_opts)
+
+
+def build_session_factory(
+        engine: Any,
+        settings: TestDBSettings,
+        *,
+        use_async: bool,
+        ) -> sessionmaker:
+    if use_async:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        # no lazy IO after commit in async mode
+        return sessionmaker(
+                engine,
+                class_=AsyncSession,
+                autoflush=settings.TEST_AUTOFL,
+                expire_on_commit=False,
+                )
+    return sessionmaker(
+            engine,
+            autocommit=settings.TEST_AUTOCM,
+            autoflush=settings.TEST_AUTOFL,
+            )
+
+
+engine = build_engine(db_settings, use_async=db_settings.TEST_DB_ASYNC)
+Session = build_session_factory(
         engine,
-        autocommit=db_settings.TEST_AUTOCM,
-        autoflush=db_settings.TEST_AUTOFL,
+        db_settings,
+        use_async=db_settings.TEST_DB_ASYNC,
         )
 
 
@@ -48,7 +82,9 @@ async def get_db_session() -> AsyncGenerator:
         session: Session = Session()
         yield session
     finally:
-        await session.close()
+        closed = session.close()
+        if isawaitable(closed):
+            await closed
 
 
 async def bootstrap_db(
@@ -58,6 +94,13 @@ async def bootstrap_db(
         mode: DbBootstrapModes = DbBootstrapModes.TEST_REBUILD,
         run_test: bool = False,
         ) -> Optional[dict[str, list]]:
+    if hasattr(engine, "sync_engine"):
+        # AsyncEngine -> run DDL through sync bridge
+        async with engine.begin() as conn:
+            if mode == mode.TEST_REBUILD:
+                await conn.run_sync(meta.drop_all)
+            await conn.run_sync(meta.create_all)
+        return None
     if mode == mode.TEST_REBUILD:
         meta.drop_all(engine)
     meta.create_all(engine)
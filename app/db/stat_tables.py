@@ -0,0 +1,28 @@
+from sqlalchemy import Table, Column, String, BigInteger, DateTime, func
+
+from db.tables import metadata
+
+
+__all__ = (
+        "publication_stats",
+        )
+
+
+# persisted part of write-behind counters (pending part lives in cache).
+publication_stats = Table(
+        "publication_stats",
+        metadata,
+        Column("pub_id", String(32), primary_key=True),
+        Column("likes", BigInteger, nullable=False, server_default="0"),
+        Column("dislikes", BigInteger, nullable=False, server_default="0"),
+        Column("watches", BigInteger, nullable=False, server_default="0"),
+        # published comments, kept by comments repo in comment transaction
+        Column("comments", BigInteger, nullable=False, server_default="0"),
+        Column(
+            "upd_dt",
+            DateTime,
+            nullable=False,
+            server_default=func.now(),
+            onupdate=func.now(),
+            ),
+        )
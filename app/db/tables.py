@@ -0,0 +1,54 @@
+from sqlalchemy import MetaData, Table, Column
+from sqlalchemy import String, Text, Integer, DateTime
+
+
+__all__ = (
+        "metadata",
+        "publications",
+        "content",
+        "authors",
+        )
+
+
+# shared by all app tables (stats, comments, indexes attach here).
+metadata = MetaData()
+
+
+# posts, _state -> PostStatus.
+publications = Table(
+        "publications",
+        metadata,
+        Column("uid", String(32), primary_key=True),
+        Column("author_id", String(32), nullable=False),
+        Column("title", String(256), nullable=False, server_default=""),
+        Column("creation_dt", DateTime, nullable=False),
+        Column("_state", Integer, nullable=False, server_default="0"),
+        )
+
+
+# post content blocks, _kind -> ContentTypes, _role -> ContentRoles.
+# locked == 1 while block is on moderation (no edits).
+content = Table(
+        "content",
+        metadata,
+        Column("uid", String(32), primary_key=True),
+        Column("pub_id", String(32), nullable=False),
+        Column("creation_dt", DateTime, nullable=False),
+        Column("body", Text, nullable=True),
+        Column("locked", Integer, nullable=False, server_default="0"),
+        Column("_kind", String(16), nullable=False),
+        Column("_role", String(16), nullable=False),
+        )
+
+
+# _state -> Author_FSM, _role -> Roles.
+authors = Table(
+        "authors",
+        metadata,
+        Column("uid", String(32), primary_key=True),
+        Column("login", String(64), nullable=False),
+        Column("email", String(128), nullable=False),
+        Column("_hpasswd", String(256), nullable=False),
+        Column("_state", String(16), nullable=False),
+        Column("_role", Integer, nullable=False, server_default="0"),
+        )
@@ -3,4 +3,16 @@
 source blogenv/bin/activate
 redis-server redis.conf
 cd app
-celery -A tasks.tasks:celery_app worker -l INFO -Q notification,moderation
+celery -A tasks.tasks:celery_app worker -l INFO -Q moderation -n moderation@%h &
+# notification mode: one process keeps smtp session, app sends emails
+# in send_emails batches; SMTP_PREFETCH is shell env (not .env setting)
+celery -A tasks.tasks:celery_app worker -l INFO -Q notification -n notification@%h \
+    -c 1 --prefetch-multiplier "${SMTP_PREFETCH:-64}" &
+# stop both on signal; if one worker exits, stop the other and exit
+# with its code, so supervisor / container restarts the pair
+trap 'kill $(jobs -p) 2>/dev/null' INT TERM
+wait -n
+status=$?
+kill $(jobs -p) 2>/dev/null
+wait
+exit $status
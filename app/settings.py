@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,6 +20,8 @@ class TestSettings(BaseSettings):
 class TestDBSettings(BaseSettings):
     TEST_DIALECT: str = ""
     TEST_DB_DRIVER: str = ""
+    TEST_ASYNC_DRIVER: str = "asyncpg"
+    TEST_DB_ASYNC: bool = True
     TEST_LOGIN: str = ""
     TEST_PASSWD: str = ""
     TEST_HOST: str = ""
@@ -37,10 +41,10 @@ class TestDBSettings(BaseSettings):
             extra="ignore",  # compability with 1.x
             )
 
-    def get_db_url(self) -> str:
+    def get_db_url(self, *, driver: Optional[str] = None) -> str:
         return self.TEST_DB_URL.format(
                 self.TEST_DIALECT,
-                self.TEST_DB_DRIVER,
+                driver or self.TEST_DB_DRIVER,
                 self.TEST_LOGIN,
                 self.TEST_PASSWD,
                 self.TEST_HOST,
@@ -55,6 +59,140 @@ class CacheSettings(BaseSettings):
     CPORT: int = 6381
     DEFDBNO: int = 0
     RESP_DEC: bool = False
+    CPOOL_SZ: int = 64
+    CHEALTH_SEC: int = 30
+    POST_CACHE_SEC: int = 600
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class BusSettings(BaseSettings):
+    """message bus dispatch preset."""
+    BUS_FANOUT: bool = False
+    BUS_MAX_CONCURRENCY: int = 16
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class HandoffSettings(BaseSettings):
+    """content hand-off to moderation workers."""
+    HANDOFF_ENABLED: bool = True
+    HANDOFF_INLINE_MAX: int = 32768  # bytes, larger -> via redis key
+    HANDOFF_TTL_SEC: int = 600
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class FeedSettings(BaseSettings):
+    """ranked home feed preset."""
+    FEED_TAU_SEC: float = 45000.0  # score e-folds every tau seconds
+    FEED_EPOCH: int = 1672531200  # 2023-01-01 UTC, scores relative to it
+    FEED_W_PUBLISH: float = 1.0
+    FEED_W_LIKE: float = 1.0
+    FEED_W_VIEW: float = 0.1
+    FEED_MAX_LEN: int = 10000
+    FEED_EXCERPT_LEN: int = 160
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class StatSettings(BaseSettings):
+    """write-behind post counters."""
+    STAT_FLUSH_SEC: float = 5.0
+    STAT_FLUSH_BATCH: int = 500
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class ViewSettings(BaseSettings):
+    """unique viewers (HyperLogLog per post)."""
+    VIEW_DAILY: bool = True  # per-day buckets for windowed counts
+    VIEW_KEEP_DAYS: int = 30  # bucket ttl -> max window
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class PostSettings(BaseSettings):
+    """new post creation preset."""
+    POST_FAST_CREATE: bool = True  # False -> step by step pipeline
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class CryptSettings(BaseSettings):
+    """passwd hashing pool preset."""
+    CRYPT_POOL: str = "process"  # os_crypt backend holds GIL -> process
+    CRYPT_WORKERS: int = 2
+    CRYPT_MAX_QUEUE: int = 64  # calls in flight, more -> 503
+    CRYPT_ROUNDS: int = 0  # 0 -> passlib default for scheme
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class TokenCacheSettings(BaseSettings):
+    """verified jwt cache preset."""
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SEC: float = 300.0  # capped by token exp
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class CommentSettings(BaseSettings):
+    """comments + moderation micro-batching preset."""
+    COMMENT_MAX_LEN: int = 2000
+    COMMENT_MAX_DEPTH: int = 8  # thread levels, deeper answers are flattened
+    COMMENT_BATCH: int = 50  # comments per moderation task
+    COMMENT_BATCH_WAIT_SEC: float = 1.0  # max wait of queued comment
+    COMMENT_BATCH_TTL_SEC: int = 3600  # callback token lifetime (retries)
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class NotifySettings(BaseSettings):
+    """author emails micro-batching preset."""
+    NOTIFY_BATCH: int = 50  # emails per send_emails task
+    NOTIFY_BATCH_WAIT_SEC: float = 2.0  # max wait of queued email
+    model_config = SettingsConfigDict(
+            env_file=".env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class PageSettings(BaseSettings):
+    """keyset pagination preset."""
+    PAGE_SIZE: int = 20
+    PAGE_MAX_SIZE: int = 100
     model_config = SettingsConfigDict(
             env_file=".env",
             env_file_encoding="utf-8",
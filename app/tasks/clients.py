@@ -0,0 +1,131 @@
+import logging
+from enum import Enum
+from typing import Optional
+from typing import Any
+
+import httpx
+import redis
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from .settings import HTTPClientSettings, HandoffCacheSettings
+
+
+__all__ = (
+        "ClientKind",
+        "get_client",
+        "get_redis",
+        "init_clients",
+        "close_clients",
+        )
+
+
+settings = HTTPClientSettings()
+cache_setup = HandoffCacheSettings()
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+str_handler = logging.StreamHandler()
+formatter = logging.Formatter("%(name)s %(levelname)s %(message)s")
+str_handler.setFormatter(formatter)
+logger.addHandler(str_handler)
+
+
+class ClientKind(str, Enum):
+    """API -> own api loopback, MODERATION -> moderation service."""
+    API: str = "api"
+    MODERATION: str = "moderation"
+
+
+_TIMEOUTS: dict[ClientKind, float] = {
+        ClientKind.API: 2.0,
+        ClientKind.MODERATION: 10.0,
+        }
+_clients: dict[ClientKind, httpx.Client] = {}
+_redis: dict[str, redis.Redis] = {}
+
+
+def _http2_available() -> bool:
+    if not settings.http_http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def on_request_hook(request: httpx.Request) -> None:
+    """event hook on httpx-request."""
+    logger.debug(
+            f"REQ_URL: {request.url}\n "
+            )
+
+
+def on_response_hook(responce: httpx.Response) -> None:
+    """log responce."""
+    logger.debug(
+            f"REQ_URL: {responce.url}\n "
+            f"REQ_HEAD:\n\t{responce.headers}\n"
+            f"RESP_REQ: {responce.request}\n"
+            f"RESP_ST_CODE: {responce.status_code}\n"
+            )
+
+
+def _build_client(kind: ClientKind) -> httpx.Client:
+    limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+            )
+    return httpx.Client(
+            timeout=_TIMEOUTS[kind],
+            limits=limits,
+            http2=_http2_available(),
+            event_hooks={
+                "request": [on_request_hook],
+                "response": [on_response_hook],
+                },
+            follow_redirects=True,
+            )
+
+
+def get_client(kind: ClientKind) -> httpx.Client:
+    """return pooled client. Built lazily if worker signals
+    wasn`t sent (solo pool, eager mode)."""
+    client: Optional[httpx.Client] = _clients.get(kind, None)
+    if client is None or client.is_closed:
+        client = _build_client(kind)
+        _clients[kind] = client
+    return client
+
+
+def get_redis() -> redis.Redis:
+    """return pooled redis client for handed-off content."""
+    conn: Optional[redis.Redis] = _redis.get("handoff", None)
+    if conn is None:
+        conn = redis.Redis(
+                host=cache_setup.chost,
+                port=cache_setup.cport,
+                db=cache_setup.defdbno,
+                decode_responses=True,
+                )
+        _redis["handoff"] = conn
+    return conn
+
+
+@worker_process_init.connect
+def init_clients(**kwargs: Any) -> None:
+    """open pools once per worker process (after fork)."""
+    for kind in ClientKind:
+        get_client(kind)
+    logger.debug(f"http pools ready: {list(_clients)}")
+
+
+@worker_process_shutdown.connect
+def close_clients(**kwargs: Any) -> None:
+    while _clients:
+        _, client = _clients.popitem()
+        client.close()
+    while _redis:
+        _, conn = _redis.popitem()
+        conn.close()
@@ -1,8 +1,14 @@
 import smtplib
 import logging
+import threading
+import time
 from typing import TypeVar
+from typing import Optional
+from typing import Any
 from email.message import EmailMessage
 
+from celery.signals import worker_process_shutdown
+
 from .tasks import celery_app as app
 from .settings import SMTPSettings
 
@@ -11,6 +17,7 @@ settings = SMTPSettings()
 
 
 LOGIN: str = "r5railmodels@gmail.com"
+SUBJECT: str = "Test celery."
 
 T = TypeVar("T")
 
@@ -23,21 +30,165 @@ str_handler.setFormatter(formatter)
 smtp_logger.addHandler(str_handler)
 
 
+def conn_lost(err: BaseException) -> bool:
+    """connection lost -> reconnect and resend once.
+    SMTPException is OSError too, but smtp replies (refused
+    recipient, data error, ...) are not cured by reconnect."""
+    if isinstance(err, smtplib.SMTPServerDisconnected):
+        return True
+    return (
+            isinstance(err, OSError)
+            and not isinstance(err, smtplib.SMTPException)
+            )
+
+
+class SMTPSender:
+    """persistent authenticated smtp session (one per worker process).
+    Session is checked with NOOP after idle and reopened on failure.
+    Calls are serialized by lock (threads / gevent pools share it)."""
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            login: str = "",
+            passwd: str = "",
+            *,
+            use_ssl: bool = True,
+            timeout: float = 10.0,
+            idle_sec: float = 60.0,
+            ) -> None:
+        self._host = host
+        self._port = port
+        self._login = login
+        self._passwd = passwd
+        self._use_ssl = use_ssl
+        self._timeout = timeout
+        self._idle_sec = idle_sec
+        self._conn: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.RLock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_t = smtplib.SMTP_SSL if self._use_ssl else smtplib.SMTP
+        conn = smtp_t(self._host, self._port, timeout=self._timeout)
+        if self._login:
+            conn.login(self._login, self._passwd)
+        smtp_logger.debug(f"smtp session opened: {self._host}:{self._port}")
+        return conn
+
+    def _alive(self) -> bool:
+        if self._conn is None:
+            return False
+        if time.monotonic() - self._last_used < self._idle_sec:
+            return True
+        try:
+            return self._conn.noop()[0] == 250
+        except OSError as err:
+            if not conn_lost(err):
+                raise
+            return False
+
+    def _session(self) -> smtplib.SMTP:
+        if not self._alive():
+            self.close()
+            self._conn = self._connect()
+        return self._conn
+
+    def send(self, msg: EmailMessage) -> None:
+        """send over current session, reconnect once if it was lost."""
+        with self._lock:
+            try:
+                self._session().send_message(msg)
+            except OSError as err:
+                if not conn_lost(err):
+                    raise
+                smtp_logger.warning(f"smtp session lost: {err}, reconnecting")
+                self.close()
+                self._session().send_message(msg)
+            self._last_used = time.monotonic()
+
+    def send_many(self, msgs: list[EmailMessage]) -> list[int]:
+        """send batch in one session. Return indexes of failed msgs."""
+        failed: list[int] = []
+        with self._lock:  # batch is not interleaved with other sends
+            for idx, msg in enumerate(msgs):
+                try:
+                    self.send(msg)
+                except (smtplib.SMTPException, OSError) as err:
+                    smtp_logger.error(err)
+                    failed.append(idx)
+        return failed
+
+    def close(self) -> None:
+        with self._lock:
+            conn, self._conn = self._conn, None
+            if conn is None:
+                return None
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+
+
+sender = SMTPSender(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.SMTP_LOGIN,
+        settings.SMTP_PASSWD,
+        use_ssl=settings.SMTP_SSL,
+        timeout=settings.SMTP_TIMEOUT,
+        idle_sec=settings.SMTP_IDLE_SEC,
+        )
+
+
+@worker_process_shutdown.connect
+def close_smtp(**kwargs: Any) -> None:
+    sender.close()
+
+
+def build_message(sender_addr: str, recv: str, payload: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg.set_content(payload)
+    msg["Subject"] = SUBJECT
+    msg["From"] = sender_addr
+    msg["To"] = recv
+    return msg
+
+
 @app.task(
         bind=True,
         queue="notification",
         retry_kwargs={"max_retries": 1},
         )
-def send_email(self: T, sender: str, recv: str, payload: str) -> None:
-    msg = EmailMessage()
-    msg.set_content(payload)
-    msg["Subject"] = "Test celery."
-    msg["From"] = sender
-    msg["To"] = recv
-    with smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT) as mail_srv:
-        mail_srv.login(settings.SMTP_LOGIN, settings.SMTP_PASSWD)
+def send_email(self: T, sender_addr: str, recv: str, payload: str) -> None:
+    try:
+        sender.send(build_message(sender_addr, recv, payload))
+    except Exception as err:
+        smtp_logger.error(err)
+        raise self.retry(exc=err, countdown=2)
+
+
+@app.task(
+        bind=True,
+        queue="notification",
+        retry_kwargs={"max_retries": 1},
+        )
+def send_emails(self: T, messages: list[list[str]]) -> None:
+    """send [[sender, recv, payload], ] in one smtp session.
+    Only failed messages are retried."""
+    failed: list[list[str]] = []
+    for start in range(0, len(messages), settings.SMTP_BATCH_SZ):
+        batch = messages[start:start + settings.SMTP_BATCH_SZ]
         try:
-            mail_srv.send_message(msg)
+            idxs = sender.send_many([build_message(*m) for m in batch])
         except Exception as err:
             smtp_logger.error(err)
-            raise self.retry(exc=err, contdown=2)
+            idxs = list(range(len(batch)))
+        failed.extend(batch[i] for i in idxs)
+    if failed:
+        raise self.retry(
+                args=(failed, ),
+                exc=smtplib.SMTPException(f"{len(failed)} not sent"),
+                countdown=2,
+                )
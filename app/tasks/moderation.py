@@ -1,17 +1,21 @@
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import TypeVar
 from typing import NewType
 from typing import Final
 from typing import Any
+from typing import Optional
 from dataclasses import dataclass
 
 import httpx
 import celery
+import redis
 
 from .tasks import celery_app
 from .settings import ModerationAPISettings
+from .clients import ClientKind, get_client, get_redis
 from base_tools.actions import ModerationRes
 from base_tools.exceptions import (
         BodyFetchingError,
@@ -22,10 +26,15 @@ from base_tools.exceptions import (
 SUCC_REP: Final[str] = "Content accepted. No problems found"
 FAIL_REP: Final[str] = "Content rejected. Reason [{}]: {} content found."
 AVAIL_ATTR: Final[str] = "available"
+BATCH_WORKERS: Final[int] = 8
 
 TaskT = TypeVar("TaskT", bound=celery.Task, contravariant=True)
 ModerationService = NewType("ModerationService", object)
 api_setup = ModerationAPISettings()
+API_URL: Final[str] = api_setup.api_url
+SERV_URL: Final[str] = api_setup.serv_url
+COMMENTS_URL: Final[str] = api_setup.comments_url
+COMMENT_SEP: Final[str] = "\n\n"
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -60,23 +69,6 @@ class TimeoutSec(float, Enum):
     LONG_RESP_TOUT: float = 10.0
 
 
-def on_request_hook(request: httpx.Request) -> None:
-    """event hook on httpx-request."""
-    logger.debug(
-            f"REQ_URL: {request.url}\n "
-            )
-
-
-def on_response_hook(responce: httpx.Response) -> None:
-    """log responce."""
-    logger.debug(
-            f"REQ_URL: {responce.url}\n "
-            f"REQ_HEAD:\n\t{responce.headers}\n"
-            f"RESP_REQ: {responce.request}\n"
-            f"RESP_ST_CODE: {responce.status_code}\n"
-            )
-
-
 def _build_ml_moderation_report(
         mod_resp: dict[str, Any],
         border: float,
@@ -114,29 +106,22 @@ def build_moderation_report(
 def fetch_content(self: TaskT, mcode: str, cont_id: str, pub_id: str) -> None:
     """test impl with httpx."""
     params = {"rkey": mcode, "c_uid": cont_id, "pub_id": pub_id}
-    addr_url = "http://localhost:8000/main/moderation/posts"
-    with httpx.Client(
-            timeout=TimeoutSec.DEF_TOUT,
-            event_hooks={
-                "request": [on_request_hook],
-                "response": [on_request_hook],
-                },
-            ) as client:
-        try:
-            responce = client.get(addr_url, params=params)
-            responce.raise_for_status()
-        except httpx.HTTPError as err:  # it`s a base error class
-            logger.error(
-                f"API raised: {err.response.status_code} "
-                f"on url: {err.request.url}. Exact error: {err}\n"
+    client = get_client(ClientKind.API)
+    try:
+        responce = client.get(API_URL, params=params)
+        responce.raise_for_status()
+    except httpx.HTTPError as err:  # it`s a base error class
+        logger.error(
+            f"API raised: {err.response.status_code} "
+            f"on url: {err.request.url}. Exact error: {err}\n"
+            )
+        if err.response.status_code == 404:
+            raise BodyFetchingError(
+                f"Maybe error in url: {err.request.url}"
                 )
-            if err.response.status_code == 404:
-                raise BodyFetchingError(
-                    f"Maybe error in url: {err.request.url}"
-                    )
-            raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
-        moderate_text_ml.apply_async((responce.json(), mcode, pub_id))
-        # moderate_mock.apply_async((responce.json(), mcode, pub_id))
+        raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
+    moderate_text_ml.apply_async((responce.json(), mcode, pub_id))
+    # moderate_mock.apply_async((responce.json(), mcode, pub_id))
 
 
 @celery_app.task(bind=True, retry_kwargs={"max_retries": 3})
@@ -150,7 +135,6 @@ def moderate_mock(self: TaskT, data: dict, mcode: str, pub_id: str) -> None:
 @celery_app.task(bind=True, retry_kwargs={"max_retries": 3})
 def moderate_text_ml(self: TaskT, data: dict, mcode: str, pub_id: str) -> None:
     """mock moderation process."""
-    serv_url = "https://api.sightengine.com/1.0/text/check.json"
     req = {
         "text": data[mcode],
         "mode": "ml",
@@ -158,31 +142,25 @@ def moderate_text_ml(self: TaskT, data: dict, mcode: str, pub_id: str) -> None:
         "api_user": api_setup.api_user,
         "api_secret": api_setup.api_secret,
     }
-    with httpx.Client(
-            timeout=TimeoutSec.DEF_TOUT,
-            event_hooks={
-                "request": [on_request_hook],
-                "response": [on_request_hook],
-                },
-            ) as client:
-        try:
-            resp = client.post(serv_url, data=req)
-            resp.raise_for_status()
-        except httpx.ConnectTimeout as err:
-            logger.error(err)
-            raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
-        except httpx.NetworkError as err:
-            msg = (
-                f"ERR: code = {err.response.status_code}, "
-                f"url = {err.request.url}, exact error: {err}\n."
-                )
-            logger.error(msg)
-            raise InvalidCredentials(msg)
-        mod_resp = json.loads(resp.text)
-        report = build_moderation_report(ModerationMode.ML, mod_resp)
-        send_moderation_result.apply_async(
-            (report.report, mcode, pub_id, report.state),
+    client = get_client(ClientKind.MODERATION)
+    try:
+        resp = client.post(SERV_URL, data=req)
+        resp.raise_for_status()
+    except httpx.ConnectTimeout as err:
+        logger.error(err)
+        raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
+    except httpx.NetworkError as err:
+        msg = (
+            f"ERR: code = {err.response.status_code}, "
+            f"url = {err.request.url}, exact error: {err}\n."
             )
+        logger.error(msg)
+        raise InvalidCredentials(msg)
+    mod_resp = json.loads(resp.text)
+    report = build_moderation_report(ModerationMode.ML, mod_resp)
+    send_moderation_result.apply_async(
+        (report.report, mcode, pub_id, report.state),
+        )
 
 
 @celery_app.task(bind=True, retry_kwargs={"max_retries": 1})
@@ -194,31 +172,202 @@ def send_moderation_result(
         state: str,
         ) -> None:
     """send moderation result to service."""
-    url = "http://localhost:8000/main/moderation/posts/set"
-    with httpx.Client(
-            timeout=TimeoutSec.DEF_TOUT,
-            event_hooks={
-                "request": [on_request_hook],
-                "response": [on_request_hook],
-                },
-            follow_redirects=True,
-            ) as client:
-        try:
-            data = {
-                    "mcr_id": pub_id,
-                    "mcode": mcode,
-                    "state": state,
-                    "report": report,
-                    }
-            resp = client.post(url, json=data)
-            resp.raise_for_status()
-        except httpx.HTTPError as err:
-            logger.error(
-                f"API raised: {err.response.status_code} "
-                f"on url: {err.request.url}"
+    client = get_client(ClientKind.API)
+    try:
+        data = {
+                "mcr_id": pub_id,
+                "mcode": mcode,
+                "state": state,
+                "report": report,
+                }
+        resp = client.post(f"{API_URL}/set", json=data)
+        resp.raise_for_status()
+    except httpx.HTTPError as err:
+        logger.error(
+            f"API raised: {err.response.status_code} "
+            f"on url: {err.request.url}"
+            )
+        if err.response.status_code == 404:
+            raise BodyFetchingError(
+                f"Maybe error in url: {err.request.url}"
                 )
-            if err.response.status_code == 404:
-                raise BodyFetchingError(
-                    f"Maybe error in url: {err.request.url}"
+        raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
+
+
+def _fetch_bodies(
+        client: httpx.Client,
+        pub_id: str,
+        blocks: dict[str, str],
+        ) -> dict[str, str]:
+    """get {mcode: body} for all blocks in one request."""
+    resp = client.post(
+            f"{API_URL}/batch",
+            json={"pub_id": pub_id, "blocks": blocks},
+            )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _take_bodies(key: str, blocks: dict[str, str]) -> Optional[dict[str, str]]:
+    """read bodies handed off via redis. None -> key expired."""
+    try:
+        bodies = get_redis().hgetall(key)
+    except redis.RedisError as err:
+        logger.error(err)
+        return None
+    if not all(m in bodies for m in blocks):
+        return None
+    return bodies
+
+
+def _moderate_text(client: httpx.Client, text: str) -> _IntModReport:
+    req = {
+        "text": text,
+        "mode": "ml",
+        "lang": "en",
+        "api_user": api_setup.api_user,
+        "api_secret": api_setup.api_secret,
+    }
+    resp = client.post(SERV_URL, data=req)
+    resp.raise_for_status()
+    return build_moderation_report(ModerationMode.ML, resp.json())
+
+
+def _send_results(
+        client: httpx.Client,
+        pub_id: str,
+        reports: dict[str, _IntModReport],
+        ) -> None:
+    """report all verdicts back in one callback."""
+    data = {
+        "mcr_id": pub_id,
+        "results": [
+            {"mcode": m, "state": r.state, "report": r.report}
+            for m, r in reports.items()
+            ],
+        }
+    resp = client.post(f"{API_URL}/set/batch", json=data)
+    resp.raise_for_status()
+
+
+@celery_app.task(bind=True, retry_kwargs={"max_retries": 3})
+def moderate_publication(
+        self: TaskT,
+        pub_id: str,
+        blocks: dict[str, str],
+        bodies: Optional[dict[str, str]] = None,
+        bodies_key: Optional[str] = None,
+        ) -> None:
+    """moderate all blocks of publication in one task.
+    blocks -> {mcode: content uid}. Bodies come inline (bodies)
+    or via redis (bodies_key), API is asked only as fallback."""
+    api = get_client(ClientKind.API)
+    moderation = get_client(ClientKind.MODERATION)
+    try:
+        if bodies is None and bodies_key is not None:
+            bodies = _take_bodies(bodies_key, blocks)
+        if bodies is None:
+            bodies = _fetch_bodies(api, pub_id, blocks)
+        mcodes = list(bodies)
+        with ThreadPoolExecutor(
+                max_workers=min(BATCH_WORKERS, len(mcodes) or 1),
+                ) as pool:
+            results = pool.map(
+                    lambda m: _moderate_text(moderation, bodies[m]),
+                    mcodes,
                     )
-            raise self.retry(exc=err, contdown=TimeUnit.MINUTE)
+            reports = dict(zip(mcodes, results))
+        _send_results(api, pub_id, reports)
+    except httpx.HTTPStatusError as err:
+        logger.error(
+            f"API raised: {err.response.status_code} "
+            f"on url: {err.request.url}. Exact error: {err}\n"
+            )
+        if err.response.status_code in (403, 404):
+            raise BodyFetchingError(
+                f"Maybe error in url: {err.request.url}"
+                )
+        raise self.retry(exc=err, countdown=TimeUnit.MINUTE)
+    except httpx.TransportError as err:
+        logger.error(err)
+        raise self.retry(exc=err, countdown=TimeUnit.MINUTE)
+    if bodies_key is not None:
+        try:
+            get_redis().delete(bodies_key)
+        except redis.RedisError as err:
+            logger.error(err)  # expires anyway
+
+
+def _comment_packs(
+        comments: list[list[str]],
+        max_len: int,
+        ) -> list[list[list[str]]]:
+    """group short comments so that one call checks max_len symbols."""
+    packs: list[list[list[str]]] = []
+    pack: list[list[str]] = []
+    size = 0
+    for item in comments:
+        if pack and size + len(item[1]) > max_len:
+            packs.append(pack)
+            pack, size = [], 0
+        pack.append(item)
+        size += len(item[1]) + len(COMMENT_SEP)
+    if pack:
+        packs.append(pack)
+    return packs
+
+
+def _moderate_pack(
+        client: httpx.Client,
+        pack: list[list[str]],
+        verdicts: dict[str, _IntModReport],
+        ) -> None:
+    """one call for whole pack; rejected pack is split in halves
+    until guilty comments are found (clean halves cost one call)."""
+    report = _moderate_text(client, COMMENT_SEP.join(b for _, b in pack))
+    if report.state == ModerationRes.ACCEPTED or len(pack) == 1:
+        for uid, _ in pack:
+            verdicts[uid] = report
+        return None
+    mid = len(pack) // 2
+    _moderate_pack(client, pack[:mid], verdicts)
+    _moderate_pack(client, pack[mid:], verdicts)
+
+
+@celery_app.task(bind=True, retry_kwargs={"max_retries": 3})
+def moderate_comments(
+        self: TaskT,
+        comments: list[list[str]],
+        batch: str,
+        ) -> None:
+    """moderate batch of comments -> [[uid, body], ...]
+    with few service calls, report verdicts in one callback.
+    batch -> secret token of batch, callback is checked by it."""
+    api = get_client(ClientKind.API)
+    moderation = get_client(ClientKind.MODERATION)
+    verdicts: dict[str, _IntModReport] = {}
+    try:
+        for pack in _comment_packs(comments, api_setup.comment_pack_max):
+            _moderate_pack(moderation, pack, verdicts)
+        data = {
+            "batch": batch,
+            "results": [
+                {"uid": u, "state": r.state, "report": r.report}
+                for u, r in verdicts.items()
+                ],
+            }
+        resp = api.post(f"{COMMENTS_URL}/set", json=data)
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as err:
+        logger.error(
+            f"API raised: {err.response.status_code} "
+            f"on url: {err.request.url}. Exact error: {err}\n"
+            )
+        if err.response.status_code in (403, 404):
+            raise BodyFetchingError(
+                f"Maybe error in url: {err.request.url}"
+                )
+        raise self.retry(exc=err, countdown=TimeUnit.MINUTE)
+    except httpx.TransportError as err:
+        logger.error(err)
+        raise self.retry(exc=err, countdown=TimeUnit.MINUTE)
@@ -7,6 +7,10 @@ class SMTPSettings(BaseSettings):
     SMTP_HOST: str = ""
     SMTP_PORT: int = 465
     SMTP_LOGIN: str = ""
+    SMTP_SSL: bool = True
+    SMTP_TIMEOUT: float = 10.0
+    SMTP_IDLE_SEC: float = 60.0  # NOOP-check session idle longer than this
+    SMTP_BATCH_SZ: int = 50
     model_config = SettingsConfigDict(
             env_file="../.env",
             env_file_encoding="utf-8",
@@ -19,6 +23,35 @@ class ModerationAPISettings(BaseSettings):
     api_user: str = ""
     api_secret: str = ""
     border_coeff: float = 0.3
+    serv_url: str = "https://api.sightengine.com/1.0/text/check.json"
+    api_url: str = "http://localhost:8000/main/moderation/posts"
+    comments_url: str = "http://localhost:8000/main/moderation/comments"
+    comment_pack_max: int = 4000  # symbols of comments in one call
+    model_config = SettingsConfigDict(
+            env_file="../.env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class HTTPClientSettings(BaseSettings):
+    """worker-lifetime http pools."""
+    http_max_connections: int = 32
+    http_max_keepalive: int = 16
+    http_keepalive_expiry: float = 30.0
+    http_http2: bool = True
+    model_config = SettingsConfigDict(
+            env_file="../.env",
+            env_file_encoding="utf-8",
+            extra="ignore",  # compability with 1.x
+            )
+
+
+class HandoffCacheSettings(BaseSettings):
+    """redis with handed-off content (same env as api cache)."""
+    chost: str = "localhost"
+    cport: int = 6381
+    defdbno: int = 0
     model_config = SettingsConfigDict(
             env_file="../.env",
             env_file_encoding="utf-8",
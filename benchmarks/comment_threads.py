@@ -0,0 +1,229 @@
+"""read of big comment threads: materialized path range scan vs
+recursive CTE on parent_id vs one query per thread level.
+
+Seeds one post with --comments comments (random answers, flattened
+at COMMENT_MAX_DEPTH) in scratch schema of TEST_* postgres, then
+reads whole thread and top --top answers under random comments.
+Schema is dropped after run.
+
+    python benchmarks/comment_threads.py --comments 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from settings import TestDBSettings, CommentSettings  # noqa: E402
+from db.tables import metadata  # noqa: E402
+from db.comment_tables import comments  # noqa: E402
+from db.indexes import HOT_INDEXES  # noqa: E402, F401
+from base_tools.base_content import CommentStatus  # noqa: E402
+from base_tools.base_moderation import generate_mcode  # noqa: E402
+from blog.storage.models import BlogComment  # noqa: E402
+from blog.storage.repositories import CommentsRepository  # noqa: E402
+
+
+SCHEMA = "thread_bench"
+PUB_ID = "bench_post"
+CHUNK = 5000
+
+CTE_THREAD = """
+WITH RECURSIVE tree AS (
+    SELECT uid, body, ARRAY[creation_dt::text || uid] AS ord
+    FROM comments
+    WHERE pub_id = :pub_id AND parent_id IS NULL AND _state = :state
+    UNION ALL
+    SELECT c.uid, c.body, tree.ord || (c.creation_dt::text || c.uid)
+    FROM comments c JOIN tree ON c.parent_id = tree.uid
+    WHERE c._state = :state
+)
+SELECT uid, body FROM tree ORDER BY ord LIMIT :limit
+"""
+CTE_REPLIES = """
+WITH RECURSIVE tree AS (
+    SELECT uid, body, ARRAY[creation_dt::text || uid] AS ord
+    FROM comments WHERE parent_id = :uid AND _state = :state
+    UNION ALL
+    SELECT c.uid, c.body, tree.ord || (c.creation_dt::text || c.uid)
+    FROM comments c JOIN tree ON c.parent_id = tree.uid
+    WHERE c._state = :state
+)
+SELECT uid, body FROM tree ORDER BY ord LIMIT :limit
+"""
+LEVEL = """
+SELECT uid, parent_id, body, creation_dt FROM comments
+WHERE parent_id = ANY(:parents) AND _state = :state
+"""
+
+
+def seed(engine, count: int, max_depth: int) -> list[BlogComment]:
+    rnd = random.Random(7)
+    now = datetime.now()
+    thread: list[BlogComment] = []
+    for _ in range(count):
+        parent = rnd.choice(thread) if thread and rnd.random() < 0.8 else None
+        comment = BlogComment(
+                uid=generate_mcode(symblos_cnt=16, sortable=True),
+                pub_id=PUB_ID,
+                author_id="a",
+                creation_dt=now,
+                body="comment " * 8,
+                parent_id=parent.uid if parent else None,
+                )
+        comment.place(parent, max_depth)
+        thread.append(comment)
+    rows = [
+        {
+            "uid": c.uid, "pub_id": c.pub_id, "parent_id": c.parent_id,
+            "author_id": c.author_id, "body": c.body,
+            "creation_dt": c.creation_dt, "path": c.path, "depth": c.depth,
+            "_state": CommentStatus.PUBLISHED,
+            }
+        for c in thread
+        ]
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        metadata.create_all(conn, tables=[comments])
+        for start in range(0, len(rows), CHUNK):
+            conn.execute(comments.insert(), rows[start:start + CHUNK])
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+                text("ANALYZE"),
+                )
+    return thread
+
+
+def per_level(session: Session, root: Optional[str], limit: int) -> int:
+    """query per level, thread order restored in python."""
+    state = int(CommentStatus.PUBLISHED)
+    if root is None:
+        level = session.execute(
+                text(
+                    "SELECT uid, parent_id, body, creation_dt FROM comments "
+                    "WHERE pub_id = :pub_id AND parent_id IS NULL "
+                    "AND _state = :state"
+                    ),
+                {"pub_id": PUB_ID, "state": state},
+                ).all()
+    else:
+        level = session.execute(
+                text(LEVEL), {"parents": [root], "state": state},
+                ).all()
+    children: dict = {}
+    tops = sorted(level, key=lambda r: (r.creation_dt, r.uid))
+    while level:
+        parents = [r.uid for r in level]
+        level = session.execute(
+                text(LEVEL), {"parents": parents, "state": state},
+                ).all()
+        for r in level:
+            children.setdefault(r.parent_id, []).append(r)
+    out: list = []
+    stack = list(reversed(tops))
+    while stack and len(out) < limit:
+        node = stack.pop()
+        out.append(node)
+        kids = sorted(
+                children.get(node.uid, []),
+                key=lambda r: (r.creation_dt, r.uid),
+                )
+        stack.extend(reversed(kids))
+    return len(out)
+
+
+def _time(
+        fn: Callable[[BlogComment], int],
+        roots: list[BlogComment],
+        ) -> tuple[float, float, int]:
+    lat = []
+    got = 0
+    for root in roots:
+        start = time.perf_counter()
+        got = fn(root)
+        lat.append(time.perf_counter() - start)
+    return statistics.fmean(lat) * 1000, statistics.median(lat) * 1000, got
+
+
+def run(args: argparse.Namespace) -> None:
+    settings = TestDBSettings()
+    engine = create_engine(
+            settings.get_db_url(),
+            connect_args={"options": f"-csearch_path={SCHEMA}"},
+            )
+    repo = CommentsRepository(comments)  # maps BlogComment
+    max_depth = CommentSettings().COMMENT_MAX_DEPTH
+    state = int(CommentStatus.PUBLISHED)
+    try:
+        thread = seed(engine, args.comments, max_depth)
+        depth = max(c.depth for c in thread)
+        print(f"comments={len(thread)} max depth={depth}")
+        # same comments for every reply case
+        roots = random.Random(11).sample(thread, args.repeat)
+        with Session(engine) as session:
+            repo.attach_session(session)
+
+            def path_thread(_: BlogComment) -> int:
+                return len(asyncio.run(
+                    repo.get_thread(PUB_ID, limit=args.comments),
+                    ))
+
+            def cte_thread(_: BlogComment) -> int:
+                return len(session.execute(
+                    text(CTE_THREAD),
+                    {"pub_id": PUB_ID, "state": state,
+                     "limit": args.comments},
+                    ).all())
+
+            def path_replies(root: BlogComment) -> int:
+                return len(asyncio.run(
+                    repo.get_replies(PUB_ID, root.path, limit=args.top),
+                    ))
+
+            def cte_replies(root: BlogComment) -> int:
+                return len(session.execute(
+                    text(CTE_REPLIES),
+                    {"uid": root.uid, "state": state, "limit": args.top},
+                    ).all())
+
+            cases = {
+                "thread  path range": path_thread,
+                "thread  recursive cte": cte_thread,
+                "thread  query per level": (
+                    lambda _: per_level(session, None, args.comments)
+                    ),
+                f"top {args.top} path range": path_replies,
+                f"top {args.top} recursive cte": cte_replies,
+                f"top {args.top} query per level": (
+                    lambda root: per_level(session, root.uid, args.top)
+                    ),
+                }
+            for name, fn in cases.items():
+                mean, p50, got = _time(fn, roots)
+                session.expunge_all()
+                print(f"{name:<28} mean={mean:8.2f} ms p50={p50:8.2f} ms "
+                      f"rows={got}")
+            repo.detach_session()
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--comments", type=int, default=10000)
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args())
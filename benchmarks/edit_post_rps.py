@@ -0,0 +1,65 @@
+"""requests/sec on GET /main/{user_id}/edit/{pub_id}.
+
+Run the API once with TEST_DB_ASYNC=False (sync psycopg2 session) and
+once with TEST_DB_ASYNC=True (asyncpg + AsyncSession), then compare:
+
+    python benchmarks/edit_post_rps.py --token <jwt> --user-id <uid> \\
+        --pub-id <pub_id> --clients 64 --duration 20
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def _client(
+        client: httpx.AsyncClient,
+        url: str,
+        deadline: float,
+        stat: dict[str, int],
+        ) -> None:
+    while time.perf_counter() < deadline:
+        resp = await client.get(url)
+        if resp.status_code == 200:
+            stat["ok"] += 1
+        else:
+            stat["err"] += 1
+
+
+async def run(args: argparse.Namespace) -> None:
+    url = f"/main/{args.user_id}/edit/{args.pub_id}"
+    headers = {"Authorization": f"Bearer {args.token}"}
+    stat = {"ok": 0, "err": 0}
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(
+            base_url=args.base_url,
+            headers=headers,
+            limits=limits,
+            timeout=10.0,
+            ) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                _client(client, url, deadline, stat)
+                for _ in range(args.clients)
+                )
+            )
+        elapsed = time.perf_counter() - start
+    print(
+        f"clients={args.clients} duration={elapsed:.1f}s "
+        f"ok={stat['ok']} err={stat['err']} "
+        f"rps={stat['ok'] / elapsed:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--pub-id", required=True)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
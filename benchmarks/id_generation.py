@@ -0,0 +1,51 @@
+"""codes/sec: old generate_mcode (random.choice per symbol) vs
+buffered CSPRNG pool (base_tools.ids), plain and time-sortable.
+
+    python benchmarks/id_generation.py --count 200000
+"""
+import argparse
+import os
+import sys
+import time
+from random import choice
+from string import ascii_letters, digits
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from base_tools.base_moderation import generate_mcode  # noqa: E402
+
+
+SYMBOLS = [*ascii_letters, *digits, "-", "_"]
+
+
+def old_generate_mcode(*, symblos_cnt: int = 8) -> str:
+    return "".join([choice(SYMBOLS) for _ in range(symblos_cnt)])
+
+
+def _rate(fn, count: int, size: int, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        fn(symblos_cnt=size, **kwargs)
+    return count / (time.perf_counter() - start)
+
+
+def run(args: argparse.Namespace) -> None:
+    print(f"count={args.count}")
+    for size in args.sizes:
+        old = _rate(old_generate_mcode, args.count, size)
+        new = _rate(generate_mcode, args.count, size)
+        line = (
+            f"size={size:>3} old={old:>11.0f}/s "
+            f"pool={new:>11.0f}/s (x{new / old:.1f})"
+            )
+        if size >= 16:
+            srt = _rate(generate_mcode, args.count, size, sortable=True)
+            line += f" sortable={srt:>11.0f}/s (x{srt / old:.1f})"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32])
+    run(parser.parse_args())
@@ -0,0 +1,750 @@
+"""offline end-to-end load test. App and local stand-ins for every
+external service run in one process (no network access needed):
+
+    api         uvicorn on 127.0.0.1:<free port>
+    db          sqlite file via aiosqlite (or --db-url, async driver)
+    cache       fakeredis (or --redis-url)
+    celery      in-process worker on memory broker (solo / threads)
+    moderation  stub of sightengine text/check.json (--mod-latency)
+    smtp        sink for notification emails
+
+Every virtual user registers, logs in, activates account, then for
+each post: create -> read draft -> edit header / body -> publish ->
+wait for moderation callback (polls activate) -> comments -> reads.
+Latency per endpoint is collected on client and on server side
+(the latter includes worker callbacks), p50 / p95 / p99 and
+throughput are printed, --out saves them as JSON.
+
+Tables are dropped and rebuilt on startup (test mode of app), so
+--db-url has to point to a scratch database.
+
+    python benchmarks/load_harness.py --users 20 --posts 3
+    python benchmarks/load_harness.py --mod-latency 0.3 --reject 0.1 \\
+            --worker-pool threads --out load.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import platform
+import random
+import secrets
+import socket
+import socketserver
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import uvicorn
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+HOST = "127.0.0.1"
+STUB_PATH = "/1.0/text/check.json"
+MARKER = "loadtest-flagged"  # text with marker is rejected by stub
+CLASSES = ("sexual", "discriminatory", "insulting", "violent", "toxic")
+WORDS = (
+    "engine", "async", "queue", "cache", "index", "latency", "stream",
+    "worker", "batch", "cursor", "schema", "pool", "event", "bus",
+    )
+# module engine of db.sessions is built from TEST_* env on import,
+# it is never used by harness (stores are rebound), but has to build.
+DB_PLACEHOLDER_ENV = {
+    "TEST_DIALECT": "postgresql",
+    "TEST_DB_DRIVER": "psycopg2",
+    "TEST_ECHO_POOL": "debug",
+    }
+# endpoint names (server side) of worker callbacks
+POSTS_CALLBACK = "set_moderation_results"
+COMMENTS_CALLBACK = "set_comments_moderation_results"
+
+
+class StubStats:
+    """thread-safe hit counters of stand-in services."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+
+    def hit(self, name: str) -> None:
+        with self._lock:
+            self.hits[name] += 1
+
+
+class ModerationStub(BaseHTTPRequestHandler):
+    """sightengine text/check.json (ml mode) with fixed latency."""
+    protocol_version = "HTTP/1.1"  # keep-alive for worker pool
+
+    def do_POST(self) -> None:
+        size = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(size).decode())
+        if self.path != STUB_PATH:
+            self.send_error(404)
+            return None
+        text = form.get("text", [""])[0]
+        time.sleep(self.server.latency)
+        flagged = MARKER in text
+        self.server.stats.hit("moderation.rejected" if flagged
+                              else "moderation.accepted")
+        score = 0.9 if flagged else 0.01
+        classes: dict[str, Any] = {"available": list(CLASSES)}
+        classes.update((c, score) for c in CLASSES)
+        body = json.dumps({
+            "status": "success",
+            "moderation_classes": classes,
+            }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return None
+
+    def log_message(self, *args: Any) -> None:
+        return None
+
+
+class SMTPSink(socketserver.StreamRequestHandler):
+    """accept any mail without auth and tls, count messages."""
+
+    def _reply(self, code: int, text: str) -> None:
+        self.wfile.write(f"{code} {text}\r\n".encode())
+
+    def handle(self) -> None:
+        self._reply(220, "sink ready")
+        in_data = False
+        while line := self.rfile.readline():
+            if in_data:
+                if line.rstrip(b"\r\n") == b".":
+                    in_data = False
+                    self.server.stats.hit("smtp.messages")
+                    self._reply(250, "queued")
+                continue
+            cmd = line[:4].upper()
+            if cmd == b"DATA":
+                in_data = True
+                self._reply(354, "end data with <CR><LF>.<CR><LF>")
+            elif cmd == b"QUIT":
+                self._reply(221, "bye")
+                return None
+            else:  # EHLO / HELO / MAIL / RCPT / NOOP / RSET
+                self._reply(250, "ok")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ServerTimer:
+    """ASGI middleware: latency per endpoint as seen by app."""
+
+    def __init__(self, app: Any, samples: dict[str, list]) -> None:
+        self.app = app
+        self.samples = samples
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [0]
+
+        async def _send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # router puts matched endpoint into the same scope
+            endpoint = scope.get("endpoint")
+            name = getattr(endpoint, "__name__", scope["path"])
+            self.samples[name].append(
+                    (time.perf_counter() - start, status[0] < 500),
+                    )
+
+
+class Recorder:
+    """client side samples: name -> [(sec, ok), ]."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.samples: dict[str, list] = defaultdict(list)
+
+    def add(self, name: str, sec: float, ok: bool) -> None:
+        self.samples[name].append((sec, ok))
+
+    async def call(
+            self,
+            name: str,
+            method: str,
+            url: str,
+            *,
+            ok: Callable[[int], bool] = lambda code: code < 400,
+            **kwargs: Any,
+            ) -> Optional[httpx.Response]:
+        """None -> transport error (counted as failed call)."""
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.add(name, time.perf_counter() - start, False)
+            return None
+        self.add(name, time.perf_counter() - start, ok(resp.status_code))
+        return resp
+
+    async def call_retrying(
+            self,
+            name: str,
+            method: str,
+            url: str,
+            *,
+            retries: int = 5,
+            **kwargs: Any,
+            ) -> Optional[httpx.Response]:
+        """retry on 503 (crypt pool sheds load) after Retry-After."""
+        for _ in range(retries):
+            resp = await self.call(name, method, url, **kwargs)
+            if resp is None or resp.status_code != 503:
+                return resp
+            await asyncio.sleep(float(resp.headers.get("Retry-After", 1)))
+        return resp
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _serve(server: socketserver.BaseServer) -> socketserver.BaseServer:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _set_env(args: argparse.Namespace, ports: dict[str, int]) -> None:
+    """point app and worker settings to local stand-ins."""
+    api = f"http://{HOST}:{ports['api']}/main/moderation"
+    os.environ.update({
+        "serv_url": f"http://{HOST}:{ports['moderation']}{STUB_PATH}",
+        "api_url": f"{api}/posts",
+        "comments_url": f"{api}/comments",
+        "SMTP_HOST": HOST,
+        "SMTP_PORT": str(ports["smtp"]),
+        "SMTP_SSL": "false",
+        "SMTP_LOGIN": "",
+        })
+    os.environ.setdefault("api_user", "load")
+    os.environ.setdefault("api_secret", "load")
+    os.environ.setdefault("crypt_alg", "HS256")
+    os.environ.setdefault("secret", secrets.token_hex(16))
+    for key, value in DB_PLACEHOLDER_ENV.items():
+        os.environ.setdefault(key, value)
+    if args.redis_url:
+        url = urlsplit(args.redis_url)
+        os.environ.update({
+            "CHOST": url.hostname or HOST,
+            "CPORT": str(url.port or 6379),
+            "DEFDBNO": url.path.strip("/") or "0",
+            })
+
+
+def _sqlite_wal(dbapi_conn: Any, record: Any) -> None:
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+def _build_engine(args: argparse.Namespace, workdir: str) -> Any:
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if args.db_url:
+        return create_async_engine(
+                args.db_url,
+                pool_size=args.db_pool,
+                max_overflow=args.db_pool // 2,
+                )
+    path = os.path.join(workdir, "load.db")
+    # NullPool (sqlite file) -> connection per session, wait on lock
+    engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            connect_args={"timeout": 30},
+            )
+    event.listen(engine.sync_engine, "connect", _sqlite_wal)
+    return engine
+
+
+def _fake_cache() -> None:
+    """api pools and worker redis share one fakeredis server."""
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit("fakeredis is not installed, pass --redis-url")
+    from redis import asyncio as aioredis
+    from cache import AsyncCache, setup
+    from cache.redis_cache import AsyncCacheSession
+    from tasks import clients
+
+    server = fakeredis.FakeServer()
+    AsyncCacheSession._map[repr(AsyncCache)] = aioredis.ConnectionPool(
+            connection_class=fakeredis.aioredis.FakeConnection,
+            server=server,
+            decode_responses=setup.RESP_DEC,
+            max_connections=setup.CPOOL_SZ,
+            )
+    clients._redis["handoff"] = fakeredis.FakeRedis(
+            server=server,
+            decode_responses=True,
+            )
+
+
+def boot(
+        args: argparse.Namespace,
+        workdir: str,
+        samples: dict[str, list],
+        ) -> tuple[Any, Any, float]:
+    """import app with env already set, rebind stores.
+    Return (asgi app, celery app, comment batch window sec)."""
+    import app as app_module
+    from config import config as cfg
+    from db.sessions import build_session_factory
+    from settings import TestDBSettings
+    from tasks.tasks import celery_app
+
+    engine = _build_engine(args, workdir)
+    session = build_session_factory(engine, TestDBSettings(), use_async=True)
+    for uow in (
+            cfg.mod_uow,
+            cfg.cont_uow,
+            cfg.authors_uow,
+            cfg.stat_uow,
+            cfg.comment_uow,
+            ):
+        uow._ses_fct = session
+    app_module.engine = engine  # startup bootstrap_db builds tables here
+    if not args.redis_url:
+        _fake_cache()
+    celery_app.conf.update(
+            broker_url="memory://",
+            result_backend="cache+memory://",
+            # virtual transport polls queues, default is 1 sec
+            broker_transport_options={"polling_interval": 0.01},
+            )
+    app_module.app.add_middleware(ServerTimer, samples=samples)
+    return (
+        app_module.app,
+        celery_app,
+        cfg.comment_settings.COMMENT_BATCH_WAIT_SEC,
+        )
+
+
+def _start_api(app: Any, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+            app,
+            host=HOST,
+            port=port,
+            log_level="warning",
+            access_log=False,
+            ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            sys.exit("api server failed to start")
+        time.sleep(0.05)
+    server.thread = thread
+    return server
+
+
+def _stop_api(server: uvicorn.Server) -> None:
+    server.should_exit = True  # runs app shutdown (flush counters)
+    server.thread.join()
+
+
+def _text(rng: random.Random, words: int, flagged: bool = False) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return f"{text} {MARKER}" if flagged else text
+
+
+def _token_sub(token: str) -> str:
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["sub"]
+
+
+async def _wait_activate(
+        rec: Recorder,
+        uid: str,
+        pub_id: str,
+        headers: dict[str, str],
+        args: argparse.Namespace,
+        ) -> bool:
+    """poll activate until moderation callback has accepted post."""
+    deadline = time.perf_counter() + args.mod_timeout
+    while time.perf_counter() < deadline:
+        resp = await rec.call(
+                "activate.poll",
+                "PATCH",
+                f"/main/{uid}/moderated/activate",
+                params={"pub_id": pub_id},
+                headers=headers,
+                ok=lambda code: code in (200, 404),
+                )
+        if resp is not None and resp.status_code == 200:
+            rec.add("activate", rec.samples["activate.poll"][-1][0], True)
+            return True
+        await asyncio.sleep(args.poll)
+    rec.add("activate", args.mod_timeout, False)
+    return False
+
+
+async def post_flow(
+        rec: Recorder,
+        uid: str,
+        headers: dict[str, str],
+        args: argparse.Namespace,
+        rng: random.Random,
+        counts: Counter,
+        ) -> None:
+    resp = await rec.call(
+            "create",
+            "POST",
+            f"/main/{uid}/new",
+            params={"title": _text(rng, 4)},
+            headers=headers,
+            ok=lambda code: code == 303,
+            )
+    if resp is None or resp.status_code != 303:
+        return None
+    pub_id = resp.headers["location"].rsplit("/", 1)[-1]
+    resp = await rec.call(
+            "edit.get",
+            "GET",
+            f"/main/{uid}/edit/{pub_id}",
+            headers=headers,
+            )
+    if resp is None or resp.status_code != 200:
+        return None
+    content = resp.json()["content"]
+    header_id, body_id = content["header"]["uid"], content["body"]["uid"]
+    flagged = rng.random() < args.reject
+    await rec.call(
+            "edit.header",
+            "PATCH",
+            f"/main/{uid}/edit/update_header",
+            json={
+                "pub_id": pub_id,
+                "header_id": header_id,
+                "payload": _text(rng, 8),
+                },
+            headers=headers,
+            )
+    await rec.call(
+            "edit.body",
+            "PATCH",
+            f"/main/{uid}/edit/update_text",
+            json={
+                "pub_id": pub_id,
+                "body_id": body_id,
+                "payload": _text(rng, args.body_words, flagged),
+                },
+            headers=headers,
+            )
+    sent = time.perf_counter()
+    resp = await rec.call(
+            "publish",
+            "PATCH",
+            f"/main/{uid}/edit/pub",
+            json={
+                "pub_id": pub_id,
+                "start_dt": datetime.utcnow().isoformat(),
+                "blocks": {header_id: "text", body_id: "text"},
+                },
+            headers=headers,
+            )
+    if resp is None or resp.status_code != 200:
+        return None
+    counts["published"] += 1
+    if flagged:
+        return None  # rejected -> only callback, nothing to activate
+    activated = await _wait_activate(rec, uid, pub_id, headers, args)
+    rec.add("moderation.roundtrip", time.perf_counter() - sent, activated)
+    if not activated:
+        return None
+    for _ in range(args.comments):
+        await rec.call(
+                "comment",
+                "POST",
+                f"/main/{pub_id}/comments",
+                json={"body": _text(rng, 12)},
+                headers=headers,
+                )
+    for _ in range(args.reads):
+        await rec.call("read", "GET", f"/main/{pub_id}", headers=headers)
+    return None
+
+
+async def user_flow(
+        rec: Recorder,
+        num: int,
+        args: argparse.Namespace,
+        counts: Counter,
+        ) -> None:
+    rng = random.Random(args.seed + num)
+    login = f"load{num}_{secrets.token_hex(3)}"
+    passwd = secrets.token_hex(8)
+    resp = await rec.call_retrying(
+            "register",
+            "POST",
+            "/users/new",
+            params={"login": login, "email": f"{login}@load.io",
+                    "passwd": passwd},
+            ok=lambda code: code == 303,
+            )
+    if resp is None or resp.status_code != 303:
+        return None
+    resp = await rec.call_retrying(
+            "login",
+            "POST",
+            "/users/token",
+            data={"username": login, "password": passwd},
+            )
+    if resp is None or resp.status_code != 200:
+        return None
+    token = resp.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    await rec.call("activate_author", "PATCH", "/users/activate",
+                   headers=headers)
+    uid = _token_sub(token)
+    for _ in range(args.posts):
+        await post_flow(rec, uid, headers, args, rng, counts)
+    return None
+
+
+async def drive(
+        args: argparse.Namespace,
+        base_url: str,
+        counts: Counter,
+        ) -> tuple[dict[str, list], float]:
+    """run all users concurrently. Return (samples, wall sec)."""
+    limits = httpx.Limits(max_connections=args.users * 2)
+    async with httpx.AsyncClient(
+            base_url=base_url,
+            limits=limits,
+            timeout=args.timeout,
+            ) as client:
+        rec = Recorder(client)
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            user_flow(rec, num, args, counts) for num in range(args.users)
+            ))
+        return rec.samples, time.perf_counter() - start
+
+
+def _wait_for(
+        done: Callable[[], bool],
+        timeout: float,
+        poll: float = 0.05,
+        ) -> bool:
+    deadline = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(poll)
+    return True
+
+
+def _settle(value: Callable[[], int], quiet: float, timeout: float) -> None:
+    """wait until value stops changing for quiet sec."""
+    deadline = time.monotonic() + timeout
+    last, since = value(), time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        now = value()
+        if now != last:
+            last, since = now, time.monotonic()
+        elif time.monotonic() - since >= quiet:
+            return None
+
+
+def summarize(samples: dict[str, list], wall: float) -> dict[str, Any]:
+    """name -> count, errors, p50 / p95 / p99 / max (sec), rps."""
+    report = {}
+    for name, items in sorted(samples.items()):
+        lat = sorted(sec for sec, _ in items)
+        if len(lat) > 1:
+            q = statistics.quantiles(lat, n=100, method="inclusive")
+            p50, p95, p99 = q[49], q[94], q[98]
+        else:
+            p50 = p95 = p99 = lat[0]
+        report[name] = {
+            "count": len(lat),
+            "errors": sum(1 for _, ok in items if not ok),
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": lat[-1],
+            "rps": len(lat) / wall,
+            }
+    return report
+
+
+def _print_table(title: str, report: dict[str, Any]) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'endpoint':<34}{'count':>7}{'err':>6}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'rps':>9}"
+        )
+    for name, r in report.items():
+        print(
+            f"{name:<34}{r['count']:>7}{r['errors']:>6}"
+            f"{r['p50'] * 1e3:>10.2f}{r['p95'] * 1e3:>10.2f}"
+            f"{r['p99'] * 1e3:>10.2f}{r['max'] * 1e3:>10.2f}"
+            f"{r['rps']:>9.1f}"
+            )
+
+
+def run(args: argparse.Namespace) -> int:
+    stats = StubStats()
+    moderation = ThreadingHTTPServer((HOST, 0), ModerationStub)
+    moderation.daemon_threads = True
+    moderation.latency, moderation.stats = args.mod_latency, stats
+    smtp = _ThreadingTCPServer((HOST, 0), SMTPSink)
+    smtp.stats = stats
+    ports = {
+        "api": _free_port(),
+        "moderation": moderation.server_address[1],
+        "smtp": smtp.server_address[1],
+        }
+    _set_env(args, ports)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)  # app loggers print per call
+    from celery.contrib.testing.worker import start_worker
+
+    server_samples: dict[str, list] = defaultdict(list)
+    counts: Counter = Counter()
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as workdir:
+        for stub in (moderation, smtp):
+            _serve(stub)
+            stack.callback(stub.shutdown)
+        app, celery_app, batch_wait = boot(args, workdir, server_samples)
+        stack.enter_context(start_worker(
+                celery_app,
+                pool=args.worker_pool,
+                concurrency=args.worker_concurrency,
+                perform_ping_check=False,
+                queues=["celery", "moderation", "notification"],
+                ))
+        api = _start_api(app, ports["api"])
+        stack.callback(_stop_api, api)
+        client_samples, wall = asyncio.run(drive(
+                args,
+                f"http://{HOST}:{ports['api']}",
+                counts,
+                ))
+        # rejected posts and comments still wait for worker callbacks
+        drain_start = time.perf_counter()
+        drained = _wait_for(
+                lambda: len(server_samples[POSTS_CALLBACK])
+                >= counts["published"],
+                args.mod_timeout,
+                )
+        _settle(
+                lambda: len(server_samples[COMMENTS_CALLBACK]),
+                quiet=batch_wait * 2 + 0.5,
+                timeout=args.mod_timeout,
+                )
+        drain = time.perf_counter() - drain_start
+    client = summarize(client_samples, wall)
+    server = summarize(
+            {k: v for k, v in server_samples.items() if v},
+            wall,
+            )
+    _print_table("client side (scenario steps)", client)
+    _print_table("server side (incl. worker callbacks)", server)
+    total = sum(r["count"] for r in client.values())
+    print(
+        f"\n{args.users} users, {counts['published']} posts published in "
+        f"{wall:.2f} s, {total / wall:.1f} req/s; "
+        f"stubs: {dict(stats.hits)}"
+        )
+    if not drained:
+        print("WARNING: not all moderation callbacks arrived in time")
+    if args.out:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "args": vars(args),
+                "wall": wall,
+                "drained": drained,
+                "drain_sec": drain,
+                },
+            "client": client,
+            "server": server,
+            "stubs": dict(stats.hits),
+            }
+        with open(args.out, "w") as out:
+            json.dump(report, out, indent=2)
+        print(f"saved: {args.out}")
+    errors = sum(r["errors"] for r in client.values())
+    return 1 if errors or not drained else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--posts", type=int, default=2, help="per user")
+    parser.add_argument("--comments", type=int, default=2, help="per post")
+    parser.add_argument("--reads", type=int, default=3, help="per post")
+    parser.add_argument("--body-words", type=int, default=200)
+    parser.add_argument(
+            "--reject",
+            type=float,
+            default=0.0,
+            help="share of posts the moderation stub rejects",
+            )
+    parser.add_argument(
+            "--mod-latency",
+            type=float,
+            default=0.05,
+            help="moderation stub latency, sec per call",
+            )
+    parser.add_argument(
+            "--mod-timeout",
+            type=float,
+            default=30.0,
+            help="max wait for moderation callback, sec",
+            )
+    parser.add_argument("--poll", type=float, default=0.05,
+                        help="activate poll period, sec")
+    parser.add_argument("--worker-pool", choices=("solo", "threads"),
+                        default="solo")
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    parser.add_argument("--db-url", help="async url of scratch db")
+    parser.add_argument("--db-pool", type=int, default=10)
+    parser.add_argument("--redis-url", help="real redis instead of fakeredis")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="http client timeout, sec")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="save report as JSON")
+    parser.add_argument("--verbose", action="store_true",
+                        help="keep app and worker logs")
+    sys.exit(run(parser.parse_args()))
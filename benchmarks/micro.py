@@ -0,0 +1,412 @@
+"""offline micro-benchmarks of hot paths on synthetic inputs
+of increasing size (no db, cache or network needed):
+
+    bus       MsgBus.handle per cascade depth (serial / fanout)
+    mcr       ModerationControlRecord to_json / from_json / done_success
+    mcode     generate_mcode (random / sortable)
+    schema    set_schema, PublicationCreated construction
+    messages  Command / Event instantiation
+
+Each case runs in --samples samples of auto-calibrated loop count
+(each sample >= --min-time sec). Results are saved as JSON; compare
+mode flags cases slower than baseline by more than --threshold:
+
+    python benchmarks/micro.py run --out bench.json
+    python benchmarks/micro.py run --only bus mcr --baseline base.json
+    python benchmarks/micro.py compare base.json bench.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Generator, NamedTuple
+
+import pydantic
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from base_tools.bus import MsgBus, DispatchMode  # noqa: E402
+from base_tools.base_types import Command  # noqa: E402
+from base_tools.base_moderation import ModerationControlRecord  # noqa: E402
+from base_tools.base_moderation import generate_mcode  # noqa: E402
+from base_tools.base_content import ContentRoles  # noqa: E402
+from base_tools.actions import ModerationRes  # noqa: E402
+from base_tools.sys_messages import PostPublished  # noqa: E402
+from blog.content_types import TextContent  # noqa: E402
+from blog.messages import CreateNewPost, WatchPost  # noqa: E402
+from blog.messages import SetModerationResults  # noqa: E402
+from blog.schemas.response_models import ContentSchema  # noqa: E402
+from blog.schemas.response_models import PublicationCreated  # noqa: E402
+from blog.schemas.response_models import set_schema  # noqa: E402
+
+
+SIZES = (1, 8, 64)
+DEPTHS = (1, 4, 16, 64)
+
+
+class Case(NamedTuple):
+    group: str
+    name: str
+    size: int  # items handled by one call (per_item = per_op / size)
+    fn: Callable[[], Any]
+    is_async: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.size}"
+
+
+class _Hop(Command):
+    """synthetic cascade message."""
+    left: int
+
+
+class _HopHandler:
+    """no-op handler, emits next hop until cascade depth is reached.
+    Scoped per message like BaseCmdHandler."""
+
+    def __init__(self) -> None:
+        self._events: deque = deque()
+
+    def scoped(self) -> "_HopHandler":
+        return _HopHandler()
+
+    @property
+    def events(self) -> Generator:
+        while self._events:
+            yield self._events.popleft()
+
+    async def handle(self, msg: _Hop) -> None:
+        if msg.left > 1:
+            self._events.append(_Hop(left=msg.left - 1))
+        return None
+
+
+def bus_cases() -> list[Case]:
+    h_map = {MsgBus.make_key(_Hop): _HopHandler()}
+    cases = []
+    for mode in DispatchMode:
+        bus = MsgBus(h_map, mode=mode)
+        for depth in DEPTHS:
+            msg = _Hop(left=depth)
+            cases.append(Case(
+                "bus",
+                f"bus.handle[{mode.name.lower()}]",
+                depth,
+                lambda b=bus, m=msg: b.handle(m),
+                True,
+                ))
+    return cases
+
+
+def _mcr(blocks: int) -> ModerationControlRecord:
+    mcr = ModerationControlRecord(
+            pub_id=generate_mcode(symblos_cnt=16),
+            act_dt=datetime.now().isoformat(),
+            exp_after_sec=600,
+            )
+    for _ in range(blocks):
+        mcode = generate_mcode(symblos_cnt=8)
+        mcr.blocks[mcode] = ModerationRes.ACCEPTED.value
+        mcr.reports.append("Content accepted. No problems found")
+    return mcr
+
+
+def mcr_cases() -> list[Case]:
+    cases = []
+    for size in SIZES:
+        mcr = _mcr(size)
+        dump = mcr.to_json()
+        cases.extend((
+            Case("mcr", "mcr.to_json", size, mcr.to_json),
+            Case(
+                "mcr",
+                "mcr.from_json",
+                size,
+                lambda d=dump: ModerationControlRecord.from_json(d),
+                ),
+            Case("mcr", "mcr.done_success", size, mcr.done_success),
+            ))
+    return cases
+
+
+def mcode_cases() -> list[Case]:
+    cases = [
+        Case(
+            "mcode",
+            "generate_mcode",
+            size,
+            lambda s=size: generate_mcode(symblos_cnt=s),
+            )
+        for size in (8, 16, 64)
+        ]
+    cases.extend(
+        Case(
+            "mcode",
+            "generate_mcode[sortable]",
+            size,
+            lambda s=size: generate_mcode(symblos_cnt=s, sortable=True),
+            )
+        for size in (16, 64)
+        )
+    return cases
+
+
+def _content(count: int) -> list[TextContent]:
+    now = datetime.now()
+    items = []
+    for n in range(count):
+        c = TextContent(uid=f"c{n}", pub_id="p", creation_dt=now, body="b")
+        c.set_role(ContentRoles.HEADER if n % 2 else ContentRoles.BODY)
+        items.append(c)
+    return items
+
+
+def schema_cases() -> list[Case]:
+    cases = []
+    for size in SIZES:
+        content = _content(size)
+        tags = [f"tag{n}" for n in range(size)]
+        cases.extend((
+            Case(
+                "schema",
+                "set_schema",
+                size,
+                lambda c=content: set_schema(ContentSchema(), c),
+                ),
+            Case(
+                "schema",
+                "PublicationCreated",
+                size,
+                lambda t=tags: PublicationCreated(
+                    uid="p",
+                    author_id="a",
+                    title="t",
+                    content=ContentSchema(tags=t),
+                    ),
+                ),
+            ))
+    return cases
+
+
+def messages_cases() -> list[Case]:
+    cases = [
+        Case(
+            "messages",
+            "Command[WatchPost]",
+            1,
+            lambda: WatchPost(uid="p", viewer="u:a"),
+            ),
+        Case(
+            "messages",
+            "Command[CreateNewPost]",
+            1,
+            lambda: CreateNewPost(uid="p", author_id="a", title="t"),
+            ),
+        Case(
+            "messages",
+            "Event[PostPublished]",
+            1,
+            lambda: PostPublished(pub_id="p", author_id="a", title="t"),
+            ),
+        ]
+    for size in SIZES:
+        results = [
+            {"mcode": f"m{n}", "state": "accepted", "report": "ok"}
+            for n in range(size)
+            ]
+        cases.append(Case(
+            "messages",
+            "Command[SetModerationResults]",
+            size,
+            lambda r=results: SetModerationResults(mcr_id="p", results=r),
+            ))
+    return cases
+
+
+GROUPS: dict[str, Callable[[], list[Case]]] = {
+    "bus": bus_cases,
+    "mcr": mcr_cases,
+    "mcode": mcode_cases,
+    "schema": schema_cases,
+    "messages": messages_cases,
+    }
+
+
+def _timed(case: Case, loops: int, loop: asyncio.AbstractEventLoop) -> float:
+    fn = case.fn
+    if not case.is_async:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - start
+
+    async def _run() -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await fn()
+        return time.perf_counter() - start
+
+    return loop.run_until_complete(_run())
+
+
+def measure(
+        case: Case,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        samples: int,
+        min_time: float,
+        ) -> dict[str, Any]:
+    """calibrate loops (warmup), then time samples; sec per call."""
+    loops = 1
+    while True:
+        spent = _timed(case, loops, loop)
+        if spent >= min_time:
+            break
+        loops *= 2 if spent * 10 < min_time else 1 + int(min_time / spent)
+    per_op = [_timed(case, loops, loop) / loops for _ in range(samples)]
+    median = statistics.median(per_op)
+    return {
+        "group": case.group,
+        "size": case.size,
+        "loops": loops,
+        "samples": per_op,
+        "min": min(per_op),
+        "median": median,
+        "mean": statistics.fmean(per_op),
+        "stdev": statistics.stdev(per_op) if samples > 1 else 0.0,
+        "per_item": median / case.size,
+        }
+
+
+def _fmt(sec: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if sec >= scale:
+            return f"{sec / scale:8.2f} {unit}"
+    return f"{sec / 1e-9:8.1f} ns"
+
+
+def run(args: argparse.Namespace) -> int:
+    groups = args.only or list(GROUPS)
+    loop = asyncio.new_event_loop()
+    results: dict[str, Any] = {}
+    try:
+        for group in groups:
+            for case in GROUPS[group]():
+                res = measure(
+                        case,
+                        loop,
+                        samples=args.samples,
+                        min_time=args.min_time,
+                        )
+                results[case.key] = res
+                print(
+                    f"{case.key:<40} median={_fmt(res['median'])} "
+                    f"per item={_fmt(res['per_item'])} "
+                    f"+-{res['stdev'] / res['median'] * 100:4.1f}%"
+                    )
+    finally:
+        loop.close()
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "pydantic": pydantic.VERSION,
+            "samples": args.samples,
+            "min_time": args.min_time,
+            },
+        "results": results,
+        }
+    if args.out:
+        with open(args.out, "w") as out:
+            json.dump(report, out, indent=2)
+        print(f"saved: {args.out}")
+    if args.baseline:
+        with open(args.baseline) as base_file:
+            base = json.load(base_file)
+        # cases of groups that were not run aren`t missing
+        base["results"] = {
+            k: v for k, v in base["results"].items() if v["group"] in groups
+            }
+        return compare_reports(base, report, args.threshold, args.stat)
+    return 0
+
+
+def compare_reports(
+        base: dict[str, Any],
+        new: dict[str, Any],
+        threshold: float,
+        stat: str,
+        ) -> int:
+    """print ratio new / base per case; 1 -> regressions found."""
+    old_res, new_res = base["results"], new["results"]
+    regressions = []
+    for key in sorted(old_res.keys() & new_res.keys()):
+        ratio = new_res[key][stat] / old_res[key][stat]
+        mark = "ok"
+        if ratio > 1 + threshold:
+            mark = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            mark = "faster"
+        print(
+            f"{key:<40} {_fmt(old_res[key][stat])} -> "
+            f"{_fmt(new_res[key][stat])} x{ratio:5.2f} {mark}"
+            )
+    for key in sorted(old_res.keys() - new_res.keys()):
+        print(f"{key:<40} missing in new run")
+    for key in sorted(new_res.keys() - old_res.keys()):
+        print(f"{key:<40} new case")
+    print(
+        f"{len(regressions)} regressions (>{threshold * 100:.0f}% "
+        f"by {stat})" if regressions else "no regressions"
+        )
+    return 1 if regressions else 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as base, open(args.new) as new:
+        return compare_reports(
+                json.load(base),
+                json.load(new),
+                args.threshold,
+                args.stat,
+                )
+
+
+def _stat_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument(
+            "--stat",
+            choices=("median", "min", "mean"),
+            default="median",
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    run_p = sub.add_parser("run")
+    run_p.add_argument("--only", nargs="+", choices=list(GROUPS))
+    run_p.add_argument("--samples", type=int, default=7)
+    run_p.add_argument("--min-time", type=float, default=0.05)
+    run_p.add_argument("--out", help="save results as JSON")
+    run_p.add_argument("--baseline", help="compare with saved results")
+    _stat_args(run_p)
+    cmp_p = sub.add_parser("compare")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("new")
+    _stat_args(cmp_p)
+    args = parser.parse_args()
+    sys.exit(run(args) if args.cmd == "run" else compare(args))
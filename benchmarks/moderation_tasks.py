@@ -0,0 +1,99 @@
+"""tasks/sec of moderation calls: client per call vs worker pool.
+
+Starts a local stub of the moderation service (sightengine-like json),
+points tasks settings (serv_url) to it and runs the same number of
+moderation calls (tasks.moderation._moderate_text, one per block of
+moderate_publication) twice, each from a thread pool:
+
+    per-call -> new httpx.Client for each call (old task behaviour)
+    pooled   -> worker pool client, tasks.clients.get_client(MODERATION)
+
+    python benchmarks/moderation_tasks.py --calls 2000 --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+RESP = json.dumps({
+    "status": "success",
+    "moderation_classes": {
+        "available": ["sexual", "discriminatory", "insulting", "violent"],
+        "sexual": 0.01,
+        "discriminatory": 0.02,
+        "insulting": 0.01,
+        "violent": 0.01,
+        },
+    }).encode()
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESP)))
+        self.end_headers()
+        self.wfile.write(RESP)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+TEXT = "some text to moderate"
+
+
+def _measure(fn, calls: int, workers: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: fn(), range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+def run(args: argparse.Namespace) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["serv_url"] = (
+        f"http://127.0.0.1:{server.server_port}/1.0/text/check.json"
+        )
+    logging.disable(logging.DEBUG)  # client hooks log every call
+    # read serv_url on import
+    from tasks.clients import ClientKind, get_client, close_clients
+    from tasks.moderation import _moderate_text
+
+    def _per_call() -> None:
+        with httpx.Client(timeout=10.0) as client:
+            _moderate_text(client, TEXT)
+
+    try:
+        per_call = _measure(_per_call, args.calls, args.workers)
+        client = get_client(ClientKind.MODERATION)
+        pooled = _measure(
+                lambda: _moderate_text(client, TEXT),
+                args.calls,
+                args.workers,
+                )
+    finally:
+        close_clients()
+        server.shutdown()
+    print(f"calls={args.calls} workers={args.workers}")
+    print(f"per-call: {per_call:.1f} tasks/sec")
+    print(f"pooled:   {pooled:.1f} tasks/sec (x{pooled / per_call:.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    run(parser.parse_args())
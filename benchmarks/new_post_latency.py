@@ -0,0 +1,80 @@
+"""latency of POST /main/{user_id}/new (post + default content).
+
+Run the API once with POST_FAST_CREATE=False (four bus hops, two
+transactions) and once with POST_FAST_CREATE=True (one transaction,
+multi-row INSERT), then compare:
+
+    python benchmarks/new_post_latency.py --token <jwt> --user-id <uid> \\
+        --requests 2000 --clients 16
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _client(
+        client: httpx.AsyncClient,
+        url: str,
+        todo: list[int],
+        lat: list[float],
+        stat: dict[str, int],
+        ) -> None:
+    while todo:
+        n = todo.pop()
+        start = time.perf_counter()
+        resp = await client.post(url, params={"title": f"bench {n}"})
+        lat.append(time.perf_counter() - start)
+        # 303 -> redirect to editor of created post
+        if resp.status_code == 303:
+            stat["ok"] += 1
+        else:
+            stat["err"] += 1
+
+
+def _pct(lat: list[float], q: float) -> float:
+    return lat[min(len(lat) - 1, int(len(lat) * q))] * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    url = f"/main/{args.user_id}/new"
+    headers = {"Authorization": f"Bearer {args.token}"}
+    stat = {"ok": 0, "err": 0}
+    lat: list[float] = []
+    todo = list(range(args.requests))
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(
+            base_url=args.base_url,
+            headers=headers,
+            limits=limits,
+            timeout=10.0,
+            follow_redirects=False,
+            ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_client(client, url, todo, lat, stat)
+              for _ in range(args.clients))
+            )
+        elapsed = time.perf_counter() - start
+    lat.sort()
+    print(
+        f"clients={args.clients} requests={len(lat)} "
+        f"ok={stat['ok']} err={stat['err']} rps={len(lat) / elapsed:.1f}"
+        )
+    print(
+        f"latency ms: mean={statistics.fmean(lat) * 1000:.2f} "
+        f"p50={_pct(lat, 0.5):.2f} p95={_pct(lat, 0.95):.2f} "
+        f"p99={_pct(lat, 0.99):.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""messages/sec of notification emails against local aiosmtpd.
+
+    per-message -> new connection + AUTH for every message (old send_email)
+    session     -> tasks.email.SMTPSender, one authenticated session
+
+Needs aiosmtpd (pip install aiosmtpd); run from repo root:
+
+    python benchmarks/notification_smtp.py --messages 500
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+import warnings
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from tasks.email import SMTPSender, build_message  # noqa: E402
+
+
+warnings.filterwarnings("ignore", message="Session.login_data")
+
+LOGIN = "bench"
+PASSWD = "bench"
+
+
+class _Sink:
+    async def handle_DATA(self, server, session, envelope) -> str:
+        return "250 OK"
+
+
+def _auth(server, session, envelope, mechanism, auth_data) -> AuthResult:
+    ok = (
+            auth_data.login == LOGIN.encode()
+            and auth_data.password == PASSWD.encode()
+            )
+    return AuthResult(success=ok)
+
+
+def _per_message(host: str, port: int, msgs: list) -> None:
+    for msg in msgs:
+        with smtplib.SMTP(host, port) as srv:
+            srv.login(LOGIN, PASSWD)
+            srv.send_message(msg)
+
+
+def _session(host: str, port: int, msgs: list) -> None:
+    sender = SMTPSender(host, port, LOGIN, PASSWD, use_ssl=False)
+    try:
+        assert not sender.send_many(msgs)
+    finally:
+        sender.close()
+
+
+def run(args: argparse.Namespace) -> None:
+    ctrl = Controller(
+            _Sink(),
+            hostname="127.0.0.1",
+            port=args.port,
+            authenticator=_auth,
+            auth_require_tls=False,
+            )
+    ctrl.start()
+    msgs = [
+        build_message("bench@localhost", f"user{i}@localhost", "moderated.")
+        for i in range(args.messages)
+        ]
+    try:
+        res = {}
+        for name, fn in (("per-message", _per_message), ("session", _session)):
+            start = time.perf_counter()
+            fn(ctrl.hostname, ctrl.port, msgs)
+            res[name] = args.messages / (time.perf_counter() - start)
+    finally:
+        ctrl.stop()
+    print(f"messages={args.messages}")
+    for name, rate in res.items():
+        print(f"{name:12} {rate:.1f} msg/sec")
+    print(f"x{res['session'] / res['per-message']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8025)
+    run(parser.parse_args())
@@ -0,0 +1,63 @@
+"""verify latency / logins per sec for sha256_crypt rounds.
+
+Pick CRYPT_ROUNDS from the table (logins rehash to it on success):
+
+    python benchmarks/passwd_rounds.py --rounds 50000 100000 535000 \\
+        --workers 2 --logins 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from authors.security import PasslibCrypt, CryptPool  # noqa: E402
+
+
+async def _measure(crypt: PasslibCrypt, hashed: str, logins: int) -> float:
+    await crypt.averify("passwd", hashed)  # warm pool
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(crypt.averify("passwd", hashed) for _ in range(logins))
+        )
+    return logins / (time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"pool={args.pool} workers={args.workers}")
+    for rounds in args.rounds:
+        crypt = PasslibCrypt(
+                pool=CryptPool(args.pool),
+                workers=args.workers,
+                max_queue=args.logins + 1,
+                rounds_cnt=rounds,
+                )
+        hashed = crypt.hash("passwd")
+        start = time.perf_counter()
+        crypt.verify("passwd", hashed)
+        one = (time.perf_counter() - start) * 1000
+        try:
+            lps = await _measure(crypt, hashed, args.logins)
+        finally:
+            crypt.close()
+        print(f"rounds={rounds:>8} verify={one:8.2f} ms logins/sec={lps:8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+            "--rounds",
+            type=int,
+            nargs="+",
+            default=[50000, 100000, 200000, 535000],
+            )
+    parser.add_argument(
+            "--pool",
+            default="process",
+            choices=["thread", "process"],
+            )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--logins", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
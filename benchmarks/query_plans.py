@@ -0,0 +1,280 @@
+"""query-plan check: every repository read/update must use an index.
+
+Seeds a scratch schema (tables + db.indexes) in the TEST_* postgres,
+runs each method of blog/authors repositories on a sync session and
+EXPLAINs every statement it sends. Any Seq Scan on an app table fails
+the check (exit code 1). Schema is dropped after run.
+
+    python benchmarks/query_plans.py --authors 500 --posts 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from settings import TestDBSettings  # noqa: E402
+from db.tables import metadata, publications, content, authors  # noqa: E402
+from db.stat_tables import publication_stats  # noqa: E402
+from db.comment_tables import comments  # noqa: E402
+from db.indexes import HOT_INDEXES  # noqa: E402, F401
+from base_tools.base_content import PostStatus, ContentRoles  # noqa: E402
+from base_tools.base_content import CommentStatus  # noqa: E402
+from base_tools.pagination import Cursor  # noqa: E402
+from blog.storage.repositories import (  # noqa: E402
+        PostsRepository,
+        ContentRepository,
+        StatsRepository,
+        CommentsRepository,
+        )
+from authors.storage.repositories import AuthorsRepository  # noqa: E402
+
+
+SCHEMA = "plan_check"
+TABLES = {
+    t.name
+    for t in (publications, content, authors, publication_stats, comments)
+    }
+CHUNK = 5000
+COMMENTS_PER_POST = 5
+
+_plans: list[Any] = []
+_capture = {"on": False}
+
+
+def _explain(conn, cursor, statement, params, context, executemany) -> None:
+    if not _capture["on"]:
+        return None
+    if executemany:
+        params = params[0]
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", params)
+    _plans.append(cursor.fetchone()[0][0]["Plan"])
+
+
+def _scans(node: dict[str, Any]) -> list[tuple[str, str]]:
+    """(node type, table) for every scan on app tables."""
+    found = []
+    if node.get("Relation Name") in TABLES:
+        found.append((node["Node Type"], node["Relation Name"]))
+    for sub in node.get("Plans", []):
+        found.extend(_scans(sub))
+    return found
+
+
+def _insert(conn, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), CHUNK):
+        conn.execute(table.insert(), rows[start:start + CHUNK])
+
+
+def seed(engine, n_authors: int, n_posts: int) -> None:
+    now = datetime.now()
+    a_rows, p_rows, c_rows, s_rows, cm_rows = [], [], [], [], []
+    for a in range(n_authors):
+        a_rows.append({
+            "uid": f"a{a}", "login": f"login{a}", "email": f"{a}@mail.io",
+            "_hpasswd": "x", "_state": "active", "_role": 0,
+            })
+        for p in range(n_posts):
+            pub_id = f"p{a}_{p}"
+            dt = now - timedelta(minutes=a * n_posts + p)
+            p_rows.append({
+                "uid": pub_id, "author_id": f"a{a}", "title": "t",
+                "creation_dt": dt, "_state": PostStatus.PUBLISHED if p % 3
+                else PostStatus.DRAFT,
+                })
+            for role in (ContentRoles.HEADER, ContentRoles.BODY):
+                c_rows.append({
+                    "uid": f"{pub_id}_{role.value}", "pub_id": pub_id,
+                    "creation_dt": dt, "body": "body " * 20, "locked": 0,
+                    "_kind": "text", "_role": role.value,
+                    })
+            s_rows.append({"pub_id": pub_id, "likes": p, "dislikes": 0,
+                           "watches": p * 3, "comments": COMMENTS_PER_POST})
+            root = f"{pub_id}_c0"
+            for c in range(COMMENTS_PER_POST):
+                uid = f"{pub_id}_c{c}"
+                cm_rows.append({
+                    "uid": uid, "pub_id": pub_id,
+                    "parent_id": root if c else None,
+                    "path": root + uid if c else root, "depth": int(c > 0),
+                    "author_id": f"a{(a + c) % n_authors}", "body": "comment",
+                    "creation_dt": dt + timedelta(seconds=c),
+                    "_state": CommentStatus.PUBLISHED if c % 4
+                    else CommentStatus.MODERATION,
+                    })
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        metadata.create_all(conn)
+        _insert(conn, authors, a_rows)
+        _insert(conn, publications, p_rows)
+        _insert(conn, content, c_rows)
+        _insert(conn, publication_stats, s_rows)
+        _insert(conn, comments, cm_rows)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+                text("ANALYZE"),
+                )
+
+
+async def _set_comment_states(repo: CommentsRepository, uid: str) -> None:
+    found = await repo.get_comments_by_ids([uid])
+    await repo.set_states(found)
+
+
+def cases(n_authors: int) -> dict[str, tuple[type, Any, Callable]]:
+    """method -> (repo type, table, call(repo))."""
+    mid = n_authors // 2
+    pub_id = f"p{mid}_1"
+    cursor = Cursor(datetime.now() - timedelta(days=1), pub_id)
+    post = SimpleNamespace(uid=pub_id, state=PostStatus.MODERATION)
+    author = SimpleNamespace(uid=f"a{mid}", state="banned")
+    return {
+        "PostsRepository.update_state": (
+            PostsRepository, publications, lambda r: r.update_state(post)),
+        "PostsRepository.update_title": (
+            PostsRepository, publications,
+            lambda r: r.update_title(pub_id, "new")),
+        "PostsRepository.get_post_by_uid": (
+            PostsRepository, publications,
+            lambda r: r.get_post_by_uid(pub_id)),
+        "PostsRepository.get_post_with_content": (
+            PostsRepository, publications,
+            lambda r: r.get_post_with_content(pub_id)),
+        "PostsRepository.get_all_posts_by_author": (
+            PostsRepository, publications,
+            lambda r: r.get_all_posts_by_author(
+                f"a{mid}", limit=21, after=cursor)),
+        "PostsRepository.get_posts_by_author_with_state": (
+            PostsRepository, publications,
+            lambda r: r.get_posts_by_author_with_state(
+                f"a{mid}", PostStatus.DRAFT, limit=21)),
+        "PostsRepository.get_published_page": (
+            PostsRepository, publications,
+            lambda r: r.get_published_page(f"a{mid}", limit=21)),
+        "ContentRepository.get_content_by_id": (
+            ContentRepository, content,
+            lambda r: r.get_content_by_id(f"{pub_id}_header")),
+        "ContentRepository.get_post_content_by_ids": (
+            ContentRepository, content,
+            lambda r: r.get_post_content_by_ids(
+                pub_id, [f"{pub_id}_header", f"{pub_id}_body"])),
+        "ContentRepository.lock": (
+            ContentRepository, content,
+            lambda r: r.lock([{"c_uid": f"{pub_id}_body", "lock": 1}])),
+        "ContentRepository.release_lock": (
+            ContentRepository, content,
+            lambda r: r.release_lock(
+                [{"c_uid": f"{pub_id}_body", "unlock": 0}])),
+        "ContentRepository.update_body": (
+            ContentRepository, content,
+            lambda r: r.update_body(f"{pub_id}_body", pub_id, "new")),
+        "ContentRepository.get_all_post_content": (
+            ContentRepository, content,
+            lambda r: r.get_all_post_content(pub_id)),
+        "StatsRepository.add_deltas": (
+            StatsRepository, publication_stats,
+            lambda r: r.add_deltas({pub_id: {"likes": 1}})),
+        "StatsRepository.get_stat": (
+            StatsRepository, publication_stats,
+            lambda r: r.get_stat(pub_id)),
+        "CommentsRepository.post_state": (
+            CommentsRepository, comments,
+            lambda r: r.post_state(pub_id)),
+        "CommentsRepository.get_comment": (
+            CommentsRepository, comments,
+            lambda r: r.get_comment(f"{pub_id}_c0")),
+        "CommentsRepository.get_comments_page": (
+            CommentsRepository, comments,
+            lambda r: r.get_comments_page(pub_id, limit=21, after=cursor)),
+        "CommentsRepository.get_thread": (
+            CommentsRepository, comments,
+            lambda r: r.get_thread(pub_id, limit=21, after=f"{pub_id}_c0")),
+        "CommentsRepository.get_replies": (
+            CommentsRepository, comments,
+            lambda r: r.get_replies(pub_id, f"{pub_id}_c0", limit=21)),
+        "CommentsRepository.set_states": (
+            CommentsRepository, comments,
+            lambda r: _set_comment_states(r, f"{pub_id}_c0")),
+        "CommentsRepository.add_comment_counts": (
+            CommentsRepository, comments,
+            lambda r: r.add_comment_counts({pub_id: 1})),
+        "CommentsRepository.get_comments_count": (
+            CommentsRepository, comments,
+            lambda r: r.get_comments_count(pub_id)),
+        "AuthorsRepository.update_author_state": (
+            AuthorsRepository, authors,
+            lambda r: r.update_author_state(author)),
+        "AuthorsRepository.update_author_passwd": (
+            AuthorsRepository, authors,
+            lambda r: r.update_author_passwd(f"a{mid}", "y")),
+        "AuthorsRepository.get_author_by_id": (
+            AuthorsRepository, authors,
+            lambda r: r.get_author_by_id(f"a{mid}")),
+        "AuthorsRepository.get_author_by_login": (
+            AuthorsRepository, authors,
+            lambda r: r.get_author_by_login(f"login{mid}")),
+        }
+
+
+def check(engine, n_authors: int, verbose: bool) -> list[str]:
+    failed = []
+    checks = cases(n_authors)
+    # map all models first, joins need every model mapped
+    repos = {t: t(table) for t, table, _ in checks.values()}
+    for name, (repo_t, _, call) in checks.items():
+        repo = repos[repo_t]
+        with Session(engine) as session:
+            repo.attach_session(session)
+            _plans.clear()
+            _capture["on"] = True
+            try:
+                asyncio.run(call(repo))  # sync session -> no real awaits
+            finally:
+                _capture["on"] = False
+                session.rollback()  # check leaves seeded data as is
+                repo.detach_session()
+        scans = [s for plan in _plans for s in _scans(plan)]
+        seq = [s for s in scans if s[0] == "Seq Scan"]
+        print(f"{'FAIL' if seq or not _plans else 'ok  '} {name}: {scans}")
+        if verbose:
+            print(json.dumps(_plans, indent=2))
+        if seq or not _plans:
+            failed.append(name)
+    return failed
+
+
+def run(args: argparse.Namespace) -> int:
+    settings = TestDBSettings()
+    engine = create_engine(
+            settings.get_db_url(),
+            connect_args={"options": f"-csearch_path={SCHEMA}"},
+            )
+    event.listen(engine, "before_cursor_execute", _explain)
+    try:
+        seed(engine, args.authors, args.posts)
+        failed = check(engine, args.authors, args.verbose)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+    print(f"{len(failed)} failed" if failed else "all index scans")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep schema")
+    sys.exit(run(parser.parse_args()))